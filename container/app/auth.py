@@ -1,7 +1,11 @@
 """CoreLink - PAM authentication and Flask-Login integration."""
 
+import os
+import pwd
 import time
 import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 import pam
 from flask_login import UserMixin
@@ -19,6 +23,82 @@ class User(UserMixin):
         self.username = username
 
 
+# ---------------------------------------------------------------------------
+# Cached user existence check (Flask-Login user_loader)
+# ---------------------------------------------------------------------------
+
+_USER_TTL = 60            # seconds to trust "user exists"
+_USER_NEGATIVE_TTL = 10   # seconds to trust "no such user"
+_USER_CACHE_MAX = 1024
+_PASSWD_PATH = "/etc/passwd"
+
+_user_lock = threading.Lock()
+_user_cache = OrderedDict()  # {username: (exists, expires_monotonic)}, oldest first
+_passwd_sig = None        # (mtime_ns, size, inode) of /etc/passwd
+
+
+def _passwd_signature():
+    try:
+        st = os.stat(_PASSWD_PATH)
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+    except OSError:
+        return None
+
+
+def user_exists(username):
+    """Return True if *username* resolves via NSS, caching the answer.
+
+    Positive results are cached for _USER_TTL and negative ones for
+    _USER_NEGATIVE_TTL.  Any change to /etc/passwd (checked with a cheap
+    stat per call) drops the whole cache, so local revocation is picked up
+    on the next request; NSS backends such as LDAP are bounded by the TTL.
+    """
+    now = time.monotonic()
+    _check_passwd()
+    with _user_lock:
+        entry = _user_cache.get(username)
+        if entry is not None and entry[1] > now:
+            return entry[0]
+
+    try:
+        pwd.getpwnam(username)
+        exists = True
+    except KeyError:
+        exists = False
+
+    ttl = _USER_TTL if exists else _USER_NEGATIVE_TTL
+    with _user_lock:
+        _user_cache.pop(username, None)
+        if len(_user_cache) >= _USER_CACHE_MAX:
+            _user_cache.popitem(last=False)
+        _user_cache[username] = (exists, now + ttl)
+    return exists
+
+
+def invalidate_user_cache(username=None):
+    """Drop cached lookups for *username*, or for everyone if None.
+
+    Called when /etc/passwd changes and when an account is known to have
+    changed (e.g. PAM just accepted a user the cache may hold as missing).
+    """
+    with _user_lock:
+        if username is None:
+            _user_cache.clear()
+        else:
+            _user_cache.pop(username, None)
+
+
+def _check_passwd():
+    """Invalidate the whole cache if the /etc/passwd signature changed."""
+    global _passwd_sig
+    sig = _passwd_signature()
+    with _user_lock:
+        if sig == _passwd_sig:
+            return
+        _passwd_sig = sig
+    invalidate_user_cache()
+
+
 # ---------------------------------------------------------------------------
 # PAM authentication
 # ---------------------------------------------------------------------------
@@ -37,37 +117,276 @@ def authenticate_pam(username, password):
 
 
 # ---------------------------------------------------------------------------
-# Simple rate-limiting  (per-IP, in-memory)
+# PAM worker pool — keeps slow PAM stacks off the event loop
 # ---------------------------------------------------------------------------
 
-_MAX_FAILURES = 5
-_COOLDOWN_SECONDS = 30
+AUTH_OK = "ok"
+AUTH_FAILED = "failed"
+AUTH_TIMEOUT = "timeout"
+AUTH_BUSY = "busy"
 
-_lock = threading.Lock()
-_failures = {}  # {ip: (count, last_failure_time)}
 
+class PamWorkerPool:
+    """Runs authenticate_pam() in real OS threads with a bounded queue.
 
-def check_rate_limit(client_ip):
-    """Return True if the client IP is allowed to attempt login."""
-    with _lock:
-        entry = _failures.get(client_ip)
-        if entry is None:
-            return True
-        count, last_time = entry
-        if count >= _MAX_FAILURES:
-            if time.time() - last_time < _COOLDOWN_SECONDS:
-                return False
-            # Cooldown expired — reset
-            del _failures[client_ip]
-        return True
-
-
-def record_failure(client_ip):
-    """Record a failed login attempt from *client_ip*."""
-    with _lock:
-        entry = _failures.get(client_ip)
+    The caller waits cooperatively: *wait* is called between polls of the
+    result, so passing the server's ``socketio.sleep`` lets eventlet keep
+    serving Socket.IO pushes while pam_faildelay or LDAP/SSSD stalls.
+    Requests beyond ``workers + max_queue`` outstanding are rejected
+    immediately instead of piling up.
+    """
+
+    POLL_INTERVAL = 0.05
+
+    def __init__(self, workers=4, max_queue=32, timeout=10.0, wait=time.sleep):
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="pam",
+        )
+        self._capacity = workers + max_queue
+        self._timeout = timeout
+        self._wait = wait
+        self._lock = threading.Lock()
+        self._pending = 0       # queued + running
+        self._running = 0
+        self._counters = {
+            AUTH_OK: 0, AUTH_FAILED: 0, AUTH_TIMEOUT: 0, AUTH_BUSY: 0,
+        }
+        self._latency_sum = 0.0
+        self._latency_max = 0.0
+        self._completed = 0
+        self.workers = workers
+        self.max_queue = max_queue
+
+    def authenticate(self, username, password):
+        """Return AUTH_OK, AUTH_FAILED, AUTH_TIMEOUT or AUTH_BUSY."""
+        with self._lock:
+            if self._pending >= self._capacity:
+                self._counters[AUTH_BUSY] += 1
+                return AUTH_BUSY
+            self._pending += 1
+
+        start = time.monotonic()
+        future = self._executor.submit(self._run, username, password)
+        deadline = start + self._timeout
+        while not future.done():
+            if time.monotonic() >= deadline:
+                # The PAM call cannot be cancelled; its thread finishes in
+                # the background and _run releases the slot.
+                with self._lock:
+                    self._counters[AUTH_TIMEOUT] += 1
+                return AUTH_TIMEOUT
+            self._wait(self.POLL_INTERVAL)
+
+        result = AUTH_OK if future.result() else AUTH_FAILED
+        elapsed = time.monotonic() - start
+        with self._lock:
+            self._counters[result] += 1
+            self._completed += 1
+            self._latency_sum += elapsed
+            self._latency_max = max(self._latency_max, elapsed)
+        return result
+
+    def _run(self, username, password):
+        with self._lock:
+            self._running += 1
+        try:
+            return authenticate_pam(username, password)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._pending -= 1
+
+    def stats(self):
+        """Return queue depth and outcome counters for monitoring."""
+        with self._lock:
+            avg = self._latency_sum / self._completed if self._completed else 0.0
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queued": self._pending - self._running,
+                "ok": self._counters[AUTH_OK],
+                "failed": self._counters[AUTH_FAILED],
+                "timeouts": self._counters[AUTH_TIMEOUT],
+                "rejected": self._counters[AUTH_BUSY],
+                "latency_avg": round(avg, 3),
+                "latency_max": round(self._latency_max, 3),
+            }
+
+
+def pool_from_env(wait=time.sleep):
+    """Build a PamWorkerPool sized from CORELINK_PAM_* environment variables."""
+    return PamWorkerPool(
+        workers=int(os.environ.get("CORELINK_PAM_WORKERS", "4")),
+        max_queue=int(os.environ.get("CORELINK_PAM_QUEUE", "32")),
+        timeout=float(os.environ.get("CORELINK_PAM_TIMEOUT", "10")),
+        wait=wait,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Login rate limiting  (per-IP and per-user, fixed memory)
+# ---------------------------------------------------------------------------
+
+class _SlidingWindow:
+    """Failure counters per key using a two-bucket sliding window.
+
+    Each key holds ``[bucket, current, previous, blocked_until, last]``;
+    the failure count over the last *window* seconds is estimated as
+    ``current + previous * (fraction of the previous bucket still inside
+    the window)``.  Keys are kept in last-failure order, so idle entries
+    are popped from the front on every call and the table never holds more
+    than *max_keys* entries (oldest evicted first).
+
+    Expiry is deliberately lazy rather than a background sweep: popping
+    idle keys from the front costs nothing while none are due, needs no
+    extra thread or green task, and *max_keys* bounds memory even if no
+    login arrives for a long time.
+    """
+
+    def __init__(self, limit, window, cooldown, max_keys):
+        self.limit = limit
+        self.window = float(window)
+        self.cooldown = float(cooldown)
+        self.max_keys = max_keys
+        self._idle = max(2 * self.window, self.cooldown)
+        self._entries = OrderedDict()
+        self.blocked = 0
+        self.evicted = 0
+        self.expired = 0
+
+    def _expire(self, now):
+        entries = self._entries
+        while entries:
+            key, entry = next(iter(entries.items()))
+            if now - entry[4] < self._idle:
+                break
+            del entries[key]
+            self.expired += 1
+
+    def retry_after(self, key, now):
+        """Seconds until *key* may try again (0 when allowed)."""
+        self._expire(now)
+        entry = self._entries.get(key)
+        if entry is None or entry[3] <= now:
+            return 0
+        self.blocked += 1
+        return entry[3] - now
+
+    def record(self, key, now):
+        self._expire(now)
+        bucket = int(now // self.window)
+        entry = self._entries.pop(key, None)
         if entry is None:
-            _failures[client_ip] = (1, time.time())
-        else:
-            count, _ = entry
-            _failures[client_ip] = (count + 1, time.time())
+            if len(self._entries) >= self.max_keys:
+                self._entries.popitem(last=False)
+                self.evicted += 1
+            entry = [bucket, 0, 0, 0.0, now]
+        elif entry[0] != bucket:
+            entry[2] = entry[1] if entry[0] == bucket - 1 else 0
+            entry[1] = 0
+            entry[0] = bucket
+        entry[1] += 1
+        entry[4] = now
+        self._entries[key] = entry  # move to the back (most recent)
+
+        overlap = 1.0 - (now % self.window) / self.window
+        if entry[1] + entry[2] * overlap >= self.limit:
+            entry[3] = now + self.cooldown
+
+    def reset(self, key):
+        self._entries.pop(key, None)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class LoginRateLimiter:
+    """Sliding-window login throttle keyed by client IP and by username.
+
+    The per-IP limit slows a single source; the per-user limit caps
+    guessing against one account from many sources.  Only failed
+    attempts count, and a successful login clears both keys.  An IP that
+    logged in as a user within *trusted_ttl* seconds is exempt from that
+    user's block, so failures sent from rotating IPs cannot lock the
+    owner out of a known account.  Memory is bounded by *max_keys*
+    entries per table regardless of how many distinct IPs or usernames
+    an attacker cycles through.
+    """
+
+    MAX_USERNAME = 64
+
+    def __init__(self, ip_limit=5, ip_window=60, ip_cooldown=30,
+                 user_limit=10, user_window=300, user_cooldown=60,
+                 trusted_ttl=7 * 24 * 3600, max_keys=4096):
+        self._lock = threading.Lock()
+        self._ip = _SlidingWindow(ip_limit, ip_window, ip_cooldown, max_keys)
+        self._user = _SlidingWindow(user_limit, user_window, user_cooldown, max_keys)
+        self._trusted = OrderedDict()  # {(username, ip): expires}, oldest first
+        self._trusted_ttl = float(trusted_ttl)
+        self._max_keys = max_keys
+        self._failures = 0
+
+    def check(self, client_ip, username):
+        """Return 0 if a login attempt is allowed, else seconds to wait."""
+        username = username[:self.MAX_USERNAME]
+        now = time.monotonic()
+        with self._lock:
+            wait = self._ip.retry_after(client_ip, now)
+            if not self._is_trusted(username, client_ip, now):
+                wait = max(wait, self._user.retry_after(username, now))
+            return wait
+
+    def _is_trusted(self, username, client_ip, now):
+        trusted = self._trusted
+        while trusted:
+            key, expires = next(iter(trusted.items()))
+            if expires > now:
+                break
+            del trusted[key]
+        return (username, client_ip) in trusted
+
+    def record_failure(self, client_ip, username):
+        """Count a failed login against both the IP and the username."""
+        username = username[:self.MAX_USERNAME]
+        now = time.monotonic()
+        with self._lock:
+            self._failures += 1
+            self._ip.record(client_ip, now)
+            self._user.record(username, now)
+
+    def record_success(self, client_ip, username):
+        """Clear both keys and trust *client_ip* for *username*."""
+        username = username[:self.MAX_USERNAME]
+        key = (username, client_ip)
+        with self._lock:
+            self._ip.reset(client_ip)
+            self._user.reset(username)
+            self._trusted.pop(key, None)
+            if len(self._trusted) >= self._max_keys:
+                self._trusted.popitem(last=False)
+            self._trusted[key] = time.monotonic() + self._trusted_ttl
+
+    def stats(self):
+        """Return table sizes and counters for monitoring."""
+        with self._lock:
+            return {
+                "failures": self._failures,
+                "blocked_ip": self._ip.blocked,
+                "blocked_user": self._user.blocked,
+                "tracked_ips": len(self._ip),
+                "tracked_users": len(self._user),
+                "trusted": len(self._trusted),
+                "evicted": self._ip.evicted + self._user.evicted,
+                "expired": self._ip.expired + self._user.expired,
+                "max_keys": self._ip.max_keys,
+            }
+
+
+def limiter_from_env():
+    """Build a LoginRateLimiter from CORELINK_LOGIN_* environment variables."""
+    return LoginRateLimiter(
+        ip_limit=int(os.environ.get("CORELINK_LOGIN_IP_LIMIT", "5")),
+        user_limit=int(os.environ.get("CORELINK_LOGIN_USER_LIMIT", "10")),
+        max_keys=int(os.environ.get("CORELINK_LOGIN_MAX_KEYS", "4096")),
+    )
@@ -0,0 +1,88 @@
+"""CoreLink - Peer-to-peer clock offset estimation.
+
+For air-gapped LANs where pool.ntp.org is unreachable.  The timestamp
+echoes GossipNode already exchanges for RTT give the four NTP timestamps
+of a round trip:
+
+  t1  our send time          t2  peer's receive time
+  t3  peer's send time       t4  our receive time
+
+  offset = ((t2 - t1) + (t3 - t4)) / 2      (peer clock - our clock)
+
+Each peer keeps its last FILTER_SIZE samples; like NTP's clock filter the
+sample with the lowest round-trip delay is used.  The cluster consensus
+is the median of all clocks (ours counts as 0), and each node's offset
+from it is what the dashboard shows when no NTP server answered.
+"""
+
+import threading
+import time
+
+FILTER_SIZE = 8
+SAMPLE_MAX_AGE = 600.0   # seconds before a peer's samples are ignored
+
+
+def sync_offset(node):
+    """A node's clock error in seconds: NTP drift, else peer consensus."""
+    drift = node.get("ntp_drift")
+    return drift if drift is not None else node.get("clock_offset")
+
+
+def _median(values):
+    values = sorted(values)
+    mid = len(values) // 2
+    if len(values) % 2:
+        return values[mid]
+    return (values[mid - 1] + values[mid]) / 2.0
+
+
+class OffsetTable:
+    """Filtered clock offsets of peers relative to this node."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples = {}   # {node_id: [(delay, offset, at), ...]}
+
+    def update(self, node_id, t1, t2, t3, t4, delay):
+        """Add one four-timestamp sample; *delay* is the measured RTT."""
+        offset = ((t2 - t1) + (t3 - t4)) / 2.0
+        with self._lock:
+            ring = self._samples.setdefault(node_id, [])
+            ring.append((max(delay, 0.0), offset, time.time()))
+            if len(ring) > FILTER_SIZE:
+                del ring[0]
+
+    def remove(self, node_id):
+        with self._lock:
+            self._samples.pop(node_id, None)
+
+    def peers(self):
+        """Return {node_id: {"offset_ms", "delay_ms", "samples"}} (best sample)."""
+        cutoff = time.time() - SAMPLE_MAX_AGE
+        out = {}
+        with self._lock:
+            for nid, ring in self._samples.items():
+                fresh = [s for s in ring if s[2] >= cutoff]
+                if not fresh:
+                    continue
+                delay, offset, _at = min(fresh)
+                out[nid] = {
+                    "offset_ms": round(offset * 1000, 3),
+                    "delay_ms": round(delay * 1000, 3),
+                    "samples": len(fresh),
+                }
+        return out
+
+    def consensus(self, hostname):
+        """Return each node's offset from the cluster median, in seconds.
+
+        {"offset": ours or None without peers, "nodes": {node_id: offset}}
+        """
+        peers = self.peers()
+        if not peers:
+            return {"offset": None, "nodes": {}}
+        clocks = {nid: p["offset_ms"] / 1000.0 for nid, p in peers.items()}
+        clocks[hostname] = 0.0
+        median = _median(clocks.values())
+        nodes = {nid: round(c - median, 4) for nid, c in clocks.items()}
+        return {"offset": nodes[hostname], "nodes": nodes}
@@ -4,15 +4,26 @@ Uses UDP multicast heartbeats for fast dissemination and anti-entropy
 digest exchanges for convergence across up to 254 nodes on a single
 subnet.  Anti-entropy only relays self data — never cached third-party
 state — to prevent stale data oscillation after node restarts.
+
+Heartbeats and digest exchanges also echo peers' send timestamps, giving
+passive per-peer round-trip times and NTP-style clock offsets without
+extra packets.
 """
 
 import json
+import os
 import random
 import select
 import socket
 import struct
 import threading
 import time
+from collections import OrderedDict
+
+from clocksync import OffsetTable
+from latency import RttTable
+from profiling import StageTimers, TimedLock
+from telemetry import decode_telemetry
 
 MULTICAST_GROUP = "239.77.77.77"
 HEARTBEAT_INTERVAL = 5.0       # seconds between heartbeats
@@ -21,59 +32,165 @@ NODE_TIMEOUT = 20.0            # seconds before marking a node stale
 NODE_REMOVE = 60.0             # seconds before removing a node
 ANTI_ENTROPY_INTERVAL = 10.0   # seconds between anti-entropy rounds
 TTL = 1                        # multicast TTL (LAN only)
+SNAPSHOT_INTERVAL = 15.0       # seconds between cluster state checkpoints
+SNAPSHOT_VERSION = 1
+SEQ_RESUME_MARGIN = 100        # seq jump on restore (heartbeats since checkpoint)
+SYNC_JITTER = 0.3              # max reply delay for fleet-wide sync requests
+TELEMETRY_REFRESH = 6          # resend unchanged telemetry every Nth heartbeat
+ECHO_MAX = 16                  # peer timestamps echoed per heartbeat
+ECHO_MAX_AGE = 30.0            # seconds a received timestamp stays echoable
+SENT_HISTORY = 64              # own send timestamps kept for matching echoes
+RTT_SHARE_EVERY = 6            # share our RTT row every Nth heartbeat
+
+# Nosana container fields carried in heartbeats (None values are omitted)
+NOSANA_FIELDS = (
+    "container", "wallet", "status", "market", "market_name",
+    "queue_position", "queue_length", "job", "duration", "max_duration",
+    "node_api",
+)
+
+# Field types accepted when restoring a snapshot entry (None is never saved)
+_NUMBER = (int, float)
+SNAPSHOT_FIELDS = {
+    "gpus": list, "timestamp": str, "seq": int, "last_seen": _NUMBER,
+    "ip": str, "net_kbps": _NUMBER, "epoch": _NUMBER, "link_speed": _NUMBER,
+    "link_speed_max": _NUMBER, "ntp_drift": _NUMBER, "nosana": list,
+    "telemetry": dict, "label": str, "nettest_port": int,
+    "clock_offset": _NUMBER, "rtt": dict,
+}
 
 
 class GossipNode:
     """Manages cluster membership and state via gossip protocol."""
 
     def __init__(self, hostname, local_gpu_info, port=47100,
-                 link_speed=0, link_speed_max=0, ntp_drift=None):
+                 link_speed=0, link_speed_max=0, ntp_drift=None,
+                 snapshot_path=None, label=None, nettest_port=0, timers=None):
         self.hostname = hostname
+        self.label = label or None  # operator-assigned group (CORELINK_GROUP)
+        self.nettest_port = nettest_port  # TCP throughput test server (0 = none)
+        self.snapshot_path = snapshot_path
         self.local_gpu_info = local_gpu_info
         self.port = port
         self.anti_entropy_port = port + 1  # 47101
 
         self.seq = 0
-        self._lock = threading.Lock()
+        # Stage durations (heartbeat encode, receive decode/handle, lock wait)
+        self.timers = timers if timers is not None else StageTimers()
+        self._lock = TimedLock(self.timers, "gossip.lock_wait")
         self._cluster = {}  # {node_id: {gpus, timestamp, seq, last_seen, ip, net_kbps, ...}}
         self._net_kbps = 0.0  # local node's AppComm rate, set by server push loop
         self._link_speed = link_speed
         self._link_speed_max = link_speed_max
         self._ntp_drift = ntp_drift
+        self._nosana = []  # compact summary of local Nosana containers
+        self._telemetry_wire = None  # encoded local telemetry ("tm" field)
+        self._telemetry = None       # decoded form for the local view
+        self._telemetry_sent = None  # last "tm" value put in a heartbeat
+        self._wake = threading.Event()  # set to send a heartbeat early
+        self._listeners = []     # fn(node_id, node_or_None) change callbacks
+        self._last_status = {}   # {node_id: status last reported to listeners}
+        self.rtt = RttTable()    # passive per-peer RTT from echoed timestamps
+        self.clock = OffsetTable()  # peer clock offsets from the same echoes
+        self._clock_offset = None   # our offset from the cluster consensus
+        self._heard = OrderedDict()  # {node_id: [their epoch, our epoch, our mono]}
+        self._sent = OrderedDict()   # {our send epoch: monotonic time}
 
         self._mcast_send_sock = None
         self._mcast_recv_sock = None
         self._unicast_sock = None
         self._running = False
+        self._local_ip = ""  # address peers see us from (for subnet groups)
 
     # ------------------------------------------------------------------
     # Public API
     # ------------------------------------------------------------------
 
     def start(self):
-        """Start all gossip threads (call once)."""
+        """Start all gossip threads (call once).
+
+        With a *snapshot_path*, the last checkpoint is loaded first so the
+        previous fleet view is available immediately (as "unverified").
+        """
         self._running = True
+        if self.snapshot_path:
+            self._load_snapshot()
         self._setup_sockets()
 
-        for target in (
+        loops = [
             self._heartbeat_loop,
             self._receive_loop,
             self._anti_entropy_loop,
             self._reaper_loop,
-        ):
+        ]
+        if self.snapshot_path:
+            loops.append(self._snapshot_loop)
+        for target in loops:
             t = threading.Thread(target=target, daemon=True)
             t.start()
+        self._notify_self()
+
+    def add_listener(self, fn):
+        """Register fn(node_id, node) for membership and state changes.
+
+        *node* has the shape of a get_cluster_state() entry, or is None when
+        the node is removed.  Called from gossip threads (and from setters
+        for the local node) on every accepted update and status transition.
+        """
+        self._listeners.append(fn)
 
     def stop(self):
         self._running = False
+        if self.snapshot_path:
+            self.save_snapshot()
 
     def set_net_kbps(self, value):
         """Update the local node's network throughput (Kbps) for gossip."""
-        self._net_kbps = value
+        if value != self._net_kbps:
+            self._net_kbps = value
+            self._notify_self()
+
+    def set_local_info(self, gpus=None, link_speed=None, link_speed_max=None):
+        """Update late-discovered local GPU / NIC details and announce them."""
+        if gpus is not None:
+            self.local_gpu_info = gpus
+        if link_speed is not None:
+            self._link_speed = link_speed
+        if link_speed_max is not None:
+            self._link_speed_max = link_speed_max
+        self._wake.set()
+        self._notify_self()
 
     def set_ntp_drift(self, value):
         """Update the local node's NTP drift (seconds) for gossip."""
-        self._ntp_drift = value
+        if value != self._ntp_drift:
+            self._ntp_drift = value
+            self._notify_self()
+
+    def set_nosana(self, nodes):
+        """Update the local Nosana container summary for gossip.
+
+        *nodes* is the probe's node list; only NOSANA_FIELDS with non-null
+        values are kept so heartbeats stay small.
+        """
+        nosana = [
+            {k: n[k] for k in NOSANA_FIELDS if n.get(k) is not None}
+            for n in nodes
+        ]
+        if nosana != self._nosana:
+            self._nosana = nosana
+            self._notify_self()
+
+    def set_telemetry(self, wire):
+        """Update the local node's encoded resource telemetry for gossip.
+
+        Heartbeats carry it only when it changed since the last one (and
+        every TELEMETRY_REFRESH beats) so unchanged telemetry costs nothing.
+        """
+        if wire != self._telemetry_wire:
+            self._telemetry = decode_telemetry(wire) if wire else None
+            self._telemetry_wire = wire
+            self._notify_self()
 
     def get_cluster_state(self):
         """Return the current cluster state for the web UI.
@@ -83,10 +200,36 @@ class GossipNode:
         rows per GPU.
         """
         now = time.time()
-        nodes = []
+        nodes = [self._self_view()]  # self always first
+
+        with self._lock:
+            for nid in sorted(self._cluster.keys()):
+                if nid == self.hostname:
+                    continue
+                nodes.append(self._peer_view(nid, self._cluster[nid], now))
+
+        return nodes
+
+    def get_nodes(self, node_ids):
+        """Return get_cluster_state() entries for *node_ids* only (known ones).
+
+        Same order as get_cluster_state(), without building the full list.
+        """
+        now = time.time()
+        wanted = set(node_ids)
+        nodes = [self._self_view()] if self.hostname in wanted else []
+        with self._lock:
+            for nid in sorted(wanted & self._cluster.keys()):
+                if nid != self.hostname:
+                    nodes.append(self._peer_view(nid, self._cluster[nid], now))
+        return nodes
 
-        # Self always first
-        nodes.append({
+    # ------------------------------------------------------------------
+    # Node views and change notification
+    # ------------------------------------------------------------------
+
+    def _self_view(self):
+        return {
             "node_id": self.hostname,
             "gpus": self.local_gpu_info,
             "timestamp": time.strftime("%d%b%y %H:%M:%S").upper() + "utc",
@@ -96,31 +239,57 @@ class GossipNode:
             "link_speed": self._link_speed,
             "link_speed_max": self._link_speed_max,
             "ntp_drift": self._ntp_drift,
-        })
-
-        with self._lock:
-            for nid in sorted(self._cluster.keys()):
-                if nid == self.hostname:
-                    continue
-                info = self._cluster[nid]
-                age = now - info["last_seen"]
-                if age < NODE_TIMEOUT:
-                    status = "online"
-                else:
-                    status = "stale"
-                nodes.append({
-                    "node_id": nid,
-                    "gpus": info["gpus"],
-                    "timestamp": info["timestamp"],
-                    "status": status,
-                    "net_kbps": info.get("net_kbps", 0.0),
-                    "epoch": info.get("epoch", 0),
-                    "link_speed": info.get("link_speed", 0),
-                    "link_speed_max": info.get("link_speed_max", 0),
-                    "ntp_drift": info.get("ntp_drift"),
-                })
+            "nosana": self._nosana,
+            "telemetry": self._telemetry,
+            "label": self.label,
+            "ip": self._local_ip,
+            "nettest_port": self.nettest_port,
+            "clock_offset": self._clock_offset,
+        }
+
+    @staticmethod
+    def _peer_status(info, now):
+        # Checked first: restored entries keep their old last_seen, which is
+        # usually past NODE_TIMEOUT by the time we are back up
+        if info.get("unverified"):
+            return "unverified"  # restored from snapshot
+        if now - info["last_seen"] >= NODE_TIMEOUT:
+            return "stale"
+        return "online"
+
+    def _peer_view(self, nid, info, now):
+        return {
+            "node_id": nid,
+            "gpus": info["gpus"],
+            "timestamp": info["timestamp"],
+            "status": self._peer_status(info, now),
+            "net_kbps": info.get("net_kbps", 0.0),
+            "epoch": info.get("epoch", 0),
+            "link_speed": info.get("link_speed", 0),
+            "link_speed_max": info.get("link_speed_max", 0),
+            "ntp_drift": info.get("ntp_drift"),
+            "nosana": info.get("nosana", []),
+            "telemetry": info.get("telemetry"),
+            "label": info.get("label"),
+            "ip": info.get("ip", ""),
+            "nettest_port": info.get("nettest_port", 0),
+            "clock_offset": info.get("clock_offset"),
+        }
+
+    def _notify(self, nid, node):
+        if node is None:
+            self._last_status.pop(nid, None)
+        else:
+            self._last_status[nid] = node["status"]
+        for fn in self._listeners:
+            try:
+                fn(nid, node)
+            except Exception as exc:
+                print("[Gossip] listener error: %s" % exc)
 
-        return nodes
+    def _notify_self(self):
+        if self._listeners:
+            self._notify(self.hostname, self._self_view())
 
     # ------------------------------------------------------------------
     # Socket setup
@@ -165,6 +334,16 @@ class GossipNode:
         )
         self._unicast_sock.bind(("", self.anti_entropy_port))
 
+        # Source address of our multicast traffic (connect() sends nothing)
+        probe = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            probe.connect((MULTICAST_GROUP, self.port))
+            self._local_ip = probe.getsockname()[0]
+        except OSError:
+            pass
+        finally:
+            probe.close()
+
     # ------------------------------------------------------------------
     # Heartbeat — periodic multicast announcement
     # ------------------------------------------------------------------
@@ -172,6 +351,7 @@ class GossipNode:
     def _heartbeat_loop(self):
         while self._running:
             self.seq += 1
+            encode_start = time.perf_counter()
             msg = {
                 "type": "heartbeat",
                 "node_id": self.hostname,
@@ -183,9 +363,30 @@ class GossipNode:
                 "link_speed": self._link_speed,
                 "link_speed_max": self._link_speed_max,
                 "ntp_drift": self._ntp_drift,
+                "nosana": self._nosana,
             }
+            if self.label:
+                msg["label"] = self.label
+            if self.nettest_port:
+                msg["nettest_port"] = self.nettest_port
+            echo = self._take_echoes(ECHO_MAX)
+            if echo:
+                msg["echo"] = echo
+            self._clock_offset = self.clock.consensus(self.hostname)["offset"]
+            if self._clock_offset is not None:
+                msg["clock_offset"] = self._clock_offset
+            if self.seq % RTT_SHARE_EVERY == 0:
+                msg["rtt"] = self.rtt.compact()
+            self._mark_sent(msg["epoch"])
+            tm = self._telemetry_wire
+            if tm and (tm != self._telemetry_sent
+                       or self.seq % TELEMETRY_REFRESH == 0):
+                msg["tm"] = tm
+                self._telemetry_sent = tm
             try:
                 data = json.dumps(msg).encode("utf-8")
+                self.timers.record("gossip.heartbeat_encode",
+                                   time.perf_counter() - encode_start)
                 self._mcast_send_sock.sendto(
                     data, (MULTICAST_GROUP, self.port),
                 )
@@ -193,7 +394,8 @@ class GossipNode:
                 pass
 
             jitter = random.uniform(-HEARTBEAT_JITTER, HEARTBEAT_JITTER)
-            time.sleep(max(1.0, HEARTBEAT_INTERVAL + jitter))
+            self._wake.wait(max(1.0, HEARTBEAT_INTERVAL + jitter))
+            self._wake.clear()
 
     # ------------------------------------------------------------------
     # Receive loop — listen on multicast + unicast
@@ -210,13 +412,20 @@ class GossipNode:
             for sock in readable:
                 try:
                     data, addr = sock.recvfrom(65535)
+                    received = (time.time(), time.monotonic())
+                    start = time.perf_counter()
                     msg = json.loads(data.decode("utf-8"))
-                    self._handle_message(msg, addr)
+                    decoded = time.perf_counter()
+                    self._handle_message(msg, addr, received)
+                    self.timers.record("gossip.decode", decoded - start)
+                    self.timers.record("gossip.handle", time.perf_counter() - decoded)
                 except Exception:
                     pass
 
-    def _handle_message(self, msg, addr):
+    def _handle_message(self, msg, addr, received=None):
         msg_type = msg.get("type")
+        if received is not None and msg_type in ("heartbeat", "digest_req", "digest_resp"):
+            self._process_echo(msg, received)
         if msg_type == "heartbeat":
             self._process_heartbeat(msg, addr)
         elif msg_type == "digest_req":
@@ -234,10 +443,13 @@ class GossipNode:
             return
 
         seq = msg.get("seq", 0)
+        tm = msg.get("tm")
+        telemetry = decode_telemetry(tm) if isinstance(tm, str) else None
         with self._lock:
             existing = self._cluster.get(node_id)
-            if existing is None or seq > existing.get("seq", 0):
-                self._cluster[node_id] = {
+            if (existing is None or existing.get("unverified")
+                    or seq > existing.get("seq", 0)):
+                info = self._cluster[node_id] = {
                     "gpus": msg.get("gpus", []),
                     "timestamp": msg.get("timestamp", ""),
                     "seq": seq,
@@ -248,13 +460,146 @@ class GossipNode:
                     "link_speed": msg.get("link_speed", 0),
                     "link_speed_max": msg.get("link_speed_max", 0),
                     "ntp_drift": msg.get("ntp_drift"),
+                    "nosana": msg.get("nosana", []),
+                    # Heartbeats omit unchanged telemetry: keep the last one
+                    "telemetry": telemetry if telemetry is not None
+                    else existing.get("telemetry") if existing else None,
+                    "label": msg.get("label"),
+                    "nettest_port": msg.get("nettest_port", 0),
+                    "clock_offset": msg.get("clock_offset"),
+                    # Shared every RTT_SHARE_EVERY beats: keep the last one
+                    "rtt": msg["rtt"] if isinstance(msg.get("rtt"), dict)
+                    else existing.get("rtt") if existing else None,
                 }
+                # Notify under the lock so listeners see updates in order
+                if self._listeners:
+                    self._notify(node_id, self._peer_view(node_id, info, info["last_seen"]))
+
+    # ------------------------------------------------------------------
+    # Timestamp echoes — passive RTT
+    # ------------------------------------------------------------------
+    #
+    # Every heartbeat and digest message carries its send time ("epoch").
+    # A receiver remembers the peer's epoch with its own receive time and
+    # echoes them back, with how long it held them, in a later heartbeat
+    # or digest response: "echo": {peer: [their epoch, receive epoch,
+    # hold]}.  The originator matches its epoch to the monotonic clock at
+    # send time, so RTT = now - sent - hold is immune to clock steps.  The
+    # same echo yields the four NTP timestamps for a clock offset sample.
+
+    def _mark_sent(self, epoch):
+        with self._lock:
+            self._sent[epoch] = time.monotonic()
+            while len(self._sent) > SENT_HISTORY:
+                self._sent.popitem(last=False)
+
+    def _process_echo(self, msg, received):
+        node_id = msg.get("node_id")
+        sent = msg.get("epoch")
+        if not node_id or node_id == self.hostname or not isinstance(sent, (int, float)):
+            return
+        echo = msg.get("echo")
+        echo = echo.get(self.hostname) if isinstance(echo, dict) else None
+        with self._lock:
+            if isinstance(echo, list) and len(echo) >= 3:
+                mono_sent = self._sent.get(echo[0])
+                if mono_sent is not None:
+                    rtt = received[1] - mono_sent - echo[2]
+                    self.rtt.update(node_id, rtt)
+                    self.clock.update(node_id, echo[0], echo[1], sent, received[0], rtt)
+            self._heard.pop(node_id, None)
+            self._heard[node_id] = [sent, received[0], received[1]]
+
+    def _take_echoes(self, limit, node_id=None):
+        """Pop up to *limit* echo entries (oldest first), or *node_id*'s only."""
+        now = time.monotonic()
+        echo = {}
+        with self._lock:
+            if node_id is not None:
+                ids = [node_id] if node_id in self._heard else []
+            else:
+                ids = list(self._heard)[:limit]
+            for nid in ids:
+                their, ours, mono = self._heard.pop(nid)
+                if now - mono <= ECHO_MAX_AGE:
+                    echo[nid] = [their, ours, round(now - mono, 6)]
+        return echo
+
+    def clock_state(self):
+        """Return peer offsets (vs. us) and every node's consensus offset."""
+        consensus = self.clock.consensus(self.hostname)
+        return {
+            "node_id": self.hostname,
+            "offset": consensus["offset"],
+            "consensus": consensus["nodes"],
+            "peers": self.clock.peers(),
+        }
+
+    def latency_matrix(self):
+        """Return {src: {dst: {"rtt_ms", "jitter_ms"}}} for the cluster.
+
+        Our own row is live; peers' rows are the ones they last shared.
+        """
+        matrix = {self.hostname: {
+            nid: {"rtt_ms": r["rtt_ms"], "jitter_ms": r["jitter_ms"]}
+            for nid, r in self.rtt.row().items()
+        }}
+        with self._lock:
+            for nid, info in self._cluster.items():
+                row = info.get("rtt")
+                if nid == self.hostname or not row:
+                    continue
+                matrix[nid] = {
+                    dst: {"rtt_ms": v[0] / 1000.0, "jitter_ms": v[1] / 1000.0}
+                    for dst, v in row.items()
+                    if isinstance(v, list) and len(v) == 2
+                }
+        return matrix
 
     # ------------------------------------------------------------------
     # Anti-entropy — digest-based state synchronization
     # ------------------------------------------------------------------
 
+    def _digest(self):
+        """Return {node_id: seq}; unverified entries report 0 so peers reply."""
+        with self._lock:
+            digest = {
+                nid: 0 if info.get("unverified") else info["seq"]
+                for nid, info in self._cluster.items()
+            }
+        digest[self.hostname] = self.seq
+        return digest
+
+    def _send_digest_request(self, target):
+        msg = {
+            "type": "digest_req",
+            "node_id": self.hostname,
+            "target": target,
+            "digest": self._digest(),
+            "epoch": time.time(),
+        }
+        self._mark_sent(msg["epoch"])
+        try:
+            data = json.dumps(msg).encode("utf-8")
+            self._mcast_send_sock.sendto(
+                data, (MULTICAST_GROUP, self.port),
+            )
+        except Exception:
+            pass
+
+    def _has_unverified(self):
+        with self._lock:
+            return any(info.get("unverified") for info in self._cluster.values())
+
     def _anti_entropy_loop(self):
+        # Boot sync: ask every peer for its own state right away (target
+        # "*"), and once more shortly after if restored entries remain
+        # unverified (lost requests or replies).
+        self._send_digest_request("*")
+        time.sleep(1.5)
+        if self._has_unverified():
+            self._send_digest_request("*")
+
         while self._running:
             sleep = ANTI_ENTROPY_INTERVAL + random.uniform(-2.0, 2.0)
             time.sleep(max(2.0, sleep))
@@ -266,38 +611,27 @@ class GossipNode:
             if not peer_ids:
                 continue
 
-            target_id = random.choice(peer_ids)
-
-            # Build digest: {node_id: seq}
-            with self._lock:
-                digest = {
-                    nid: info["seq"] for nid, info in self._cluster.items()
-                }
-            digest[self.hostname] = self.seq
-
-            msg = {
-                "type": "digest_req",
-                "node_id": self.hostname,
-                "target": target_id,
-                "digest": digest,
-            }
-
-            try:
-                data = json.dumps(msg).encode("utf-8")
-                self._mcast_send_sock.sendto(
-                    data, (MULTICAST_GROUP, self.port),
-                )
-            except Exception:
-                pass
+            self._send_digest_request(random.choice(peer_ids))
 
     def _process_digest_request(self, msg, addr):
-        """Respond only if we are the target.  Only send self data — never
-        relay cached third-party node data (avoids stale data oscillation).
+        """Respond only if we are the target (or the request targets "*").
+        Only send self data — never relay cached third-party node data
+        (avoids stale data oscillation).
         """
-        if msg.get("target") != self.hostname:
-            return
-
-        their_digest = msg.get("digest", {})
+        target = msg.get("target")
+        requester = msg.get("node_id")
+        if target == "*" and requester != self.hostname:
+            # Fleet-wide sync: spread replies so the requester is not flooded
+            timer = threading.Timer(
+                random.uniform(0, SYNC_JITTER),
+                self._reply_digest, (msg.get("digest", {}), addr, requester),
+            )
+            timer.daemon = True
+            timer.start()
+        elif target == self.hostname:
+            self._reply_digest(msg.get("digest", {}), addr, requester)
+
+    def _reply_digest(self, their_digest, addr, requester=None):
         updates = []
 
         # Only include our own fresh data — no third-party relay
@@ -312,14 +646,24 @@ class GossipNode:
                 "link_speed": self._link_speed,
                 "link_speed_max": self._link_speed_max,
                 "ntp_drift": self._ntp_drift,
+                "nosana": self._nosana,
+                "tm": self._telemetry_wire,
+                "label": self.label,
+                "nettest_port": self.nettest_port,
+                "clock_offset": self._clock_offset,
             })
 
-        if updates:
+        # Reply even without updates when the request can be echoed (RTT)
+        echo = self._take_echoes(1, requester) if requester else {}
+        if updates or echo:
             resp = {
                 "type": "digest_resp",
                 "node_id": self.hostname,
                 "updates": updates,
+                "epoch": time.time(),
             }
+            if echo:
+                resp["echo"] = echo
             try:
                 data = json.dumps(resp).encode("utf-8")
                 self._unicast_sock.sendto(
@@ -332,6 +676,98 @@ class GossipNode:
         for update in msg.get("updates", []):
             self._process_heartbeat(update)
 
+    # ------------------------------------------------------------------
+    # Snapshot — checkpoint cluster state for warm restarts
+    # ------------------------------------------------------------------
+
+    def save_snapshot(self):
+        """Write the cluster state and own seq to snapshot_path (atomic)."""
+        with self._lock:
+            nodes = {
+                nid: {k: v for k, v in info.items()
+                      if v is not None and k != "unverified"}
+                for nid, info in self._cluster.items()
+            }
+        data = {
+            "v": SNAPSHOT_VERSION,
+            "node_id": self.hostname,
+            "seq": self.seq,
+            "saved": time.time(),
+            "nodes": nodes,
+        }
+        tmp = self.snapshot_path + ".tmp"
+        try:
+            with open(tmp, "w") as fh:
+                json.dump(data, fh, separators=(",", ":"))
+            os.replace(tmp, self.snapshot_path)
+        except OSError:
+            pass
+
+    def _load_snapshot(self):
+        """Restore peers seen within NODE_REMOVE, marked unverified.
+
+        Our own seq resumes past the checkpoint so peers that still hold
+        the old value accept our heartbeats immediately.
+        """
+        try:
+            with open(self.snapshot_path) as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            return
+        # A malformed file is discarded whole rather than aborting start()
+        try:
+            if data.get("v") != SNAPSHOT_VERSION:
+                return
+            seq = data.get("seq", 0)
+            if isinstance(seq, bool) or not isinstance(seq, int):
+                raise TypeError("bad seq")
+            nodes = {nid: self._snapshot_entry(info)
+                     for nid, info in data.get("nodes", {}).items()}
+        except (TypeError, AttributeError):
+            return
+
+        if data.get("node_id") == self.hostname:
+            self.seq = max(self.seq, seq + SEQ_RESUME_MARGIN)
+
+        now = time.time()
+        restored = []
+        with self._lock:
+            for nid, info in nodes.items():
+                if nid == self.hostname or nid in self._cluster:
+                    continue
+                if now - info["last_seen"] > NODE_REMOVE:
+                    continue
+                info["unverified"] = True
+                self._cluster[nid] = info
+                restored.append(self._peer_view(nid, info, now))
+        for node in restored:
+            self._notify(node["node_id"], node)
+
+    @staticmethod
+    def _snapshot_entry(info):
+        """Validated copy of one snapshot node entry; TypeError if malformed."""
+        if not isinstance(info, dict):
+            raise TypeError("node entry is not an object")
+        entry = {}
+        for key, kind in SNAPSHOT_FIELDS.items():
+            value = info.get(key)
+            if value is None:
+                continue
+            if isinstance(value, bool) or not isinstance(value, kind):
+                raise TypeError("bad %s" % key)
+            entry[key] = value
+        if "last_seen" not in entry:
+            raise TypeError("missing last_seen")
+        entry.setdefault("gpus", [])
+        entry.setdefault("timestamp", "")
+        entry.setdefault("seq", 0)
+        return entry
+
+    def _snapshot_loop(self):
+        while self._running:
+            time.sleep(SNAPSHOT_INTERVAL)
+            self.save_snapshot()
+
     # ------------------------------------------------------------------
     # Reaper — remove nodes that have gone silent
     # ------------------------------------------------------------------
@@ -347,3 +783,12 @@ class GossipNode:
                 ]
                 for nid in stale:
                     del self._cluster[nid]
+                    self._heard.pop(nid, None)
+                    self.rtt.remove(nid)
+                    self.clock.remove(nid)
+                    self._notify(nid, None)
+                # Time-driven transitions (online -> stale) for listeners
+                if self._listeners:
+                    for nid, info in self._cluster.items():
+                        if self._peer_status(info, now) != self._last_status.get(nid):
+                            self._notify(nid, self._peer_view(nid, info, now))
@@ -106,3 +106,53 @@ def get_local_gpu_info():
 
     except Exception:
         return []
+
+
+def get_local_gpu_load():
+    """Query nvidia-smi for per-GPU utilization, memory and temperature.
+
+    Returns a list ordered by GPU index:
+      [{"util": 37, "mem": 62.5, "temp": 71}, ...]
+
+    util and mem are percentages (mem = used / total), temp is in degrees
+    Celsius.  Values nvidia-smi reports as "[N/A]" are None.
+    """
+    try:
+        result = subprocess.run(
+            [
+                "nvidia-smi",
+                "--query-gpu=index,utilization.gpu,memory.used,memory.total,temperature.gpu",
+                "--format=csv,noheader,nounits",
+            ],
+            capture_output=True,
+            text=True,
+            timeout=10,
+        )
+        if result.returncode != 0:
+            return []
+    except Exception:
+        return []
+
+    def number(text):
+        try:
+            return float(text)
+        except ValueError:
+            return None
+
+    rows = []
+    for line in result.stdout.strip().split("\n"):
+        parts = [p.strip() for p in line.split(",")]
+        if len(parts) < 5:
+            continue
+        try:
+            idx = int(parts[0])
+        except ValueError:
+            continue
+        used, total = number(parts[2]), number(parts[3])
+        rows.append((idx, {
+            "util": number(parts[1]),
+            "mem": 100.0 * used / total if used is not None and total else None,
+            "temp": number(parts[4]),
+        }))
+    rows.sort(key=lambda r: r[0])
+    return [load for _idx, load in rows]
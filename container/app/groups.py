@@ -0,0 +1,218 @@
+"""CoreLink - Node groups and incremental per-group rollups.
+
+A node's group is, in order of precedence:
+
+  1. its own label (CORELINK_GROUP on that node, carried in gossip),
+  2. the first CORELINK_GROUPS rule it matches, e.g.
+       "rack1=10.0.1.0/24;rack2=rack2-*,gpu-b*;lab=10.9.0.0/16"
+     where a pattern is a CIDR subnet (matched against the gossip source
+     address) or a hostname glob,
+  3. UNGROUPED.
+
+GroupRollups keeps per-group aggregates (node counts by status, GPUs by
+model, summed CoreLink I/O, worst NTP drift, degraded links) updated from
+GossipNode change notifications by subtracting a node's previous
+contribution and adding the new one, so the fleet overview never walks
+every node.
+"""
+
+import fnmatch
+import ipaddress
+import threading
+
+from clocksync import sync_offset
+
+UNGROUPED = "ungrouped"
+STATUSES = ("online", "stale", "unverified")
+
+
+def link_degraded(speed, max_speed):
+    """Same rule as the dashboard NIC colour: 1G or slower, or below max."""
+    if not speed or speed <= 0:
+        return False
+    return speed <= 1000 or bool(max_speed and speed < max_speed)
+
+
+class GroupRules:
+    """Ordered (group, subnets, hostname globs) assignment rules."""
+
+    def __init__(self, rules=()):
+        self.rules = list(rules)
+
+    @classmethod
+    def parse(cls, spec):
+        """Parse "name=pattern,pattern;name=..." (see module docstring)."""
+        rules = []
+        for part in (spec or "").split(";"):
+            name, _, patterns = part.partition("=")
+            name = name.strip()
+            if not name or not patterns.strip():
+                continue
+            nets, globs = [], []
+            for pattern in patterns.split(","):
+                pattern = pattern.strip()
+                if not pattern:
+                    continue
+                if "/" in pattern:
+                    try:
+                        nets.append(ipaddress.ip_network(pattern, strict=False))
+                        continue
+                    except ValueError:
+                        pass
+                globs.append(pattern)
+            rules.append((name, nets, globs))
+        return cls(rules)
+
+    def assign(self, node):
+        """Return the group name for a get_cluster_state() node dict."""
+        label = node.get("label")
+        if label:
+            return label
+        node_id = node.get("node_id", "")
+        addr = None
+        if node.get("ip"):
+            try:
+                addr = ipaddress.ip_address(node["ip"])
+            except ValueError:
+                pass
+        for name, nets, globs in self.rules:
+            if addr is not None and any(addr in net for net in nets):
+                return name
+            if any(fnmatch.fnmatchcase(node_id, g) for g in globs):
+                return name
+        return UNGROUPED
+
+
+class _Rollup:
+    """Running aggregates for one group."""
+
+    def __init__(self, name):
+        self.name = name
+        self.members = set()
+        self.status = dict.fromkeys(STATUSES, 0)
+        self.models = {}        # {model: GPU count}
+        self.gpus = 0
+        self.net_kbps = 0.0
+        self.degraded = 0
+        self.drifts = {}        # {node_id: abs(ntp_drift)}
+        self._worst = None      # cached max of drifts (None = recompute)
+        self._worst_node = None
+
+    def apply(self, node_id, c, sign):
+        if sign > 0:
+            self.members.add(node_id)
+        else:
+            self.members.discard(node_id)
+        self.status[c["status"]] = self.status.get(c["status"], 0) + sign
+        for model, count in c["models"].items():
+            total = self.models.get(model, 0) + sign * count
+            if total:
+                self.models[model] = total
+            else:
+                self.models.pop(model, None)
+        self.gpus += sign * c["gpus"]
+        self.net_kbps += sign * c["net_kbps"]
+        self.degraded += sign * c["degraded"]
+
+        drift = c["drift"]
+        if drift is None:
+            return
+        if sign > 0:
+            self.drifts[node_id] = drift
+            if self._worst is not None and drift >= self._worst:
+                self._worst, self._worst_node = drift, node_id
+        else:
+            self.drifts.pop(node_id, None)
+            if node_id == self._worst_node:
+                self._worst = None  # recompute lazily
+
+    def worst_drift(self):
+        if self._worst is None and self.drifts:
+            self._worst_node = max(self.drifts, key=self.drifts.get)
+            self._worst = self.drifts[self._worst_node]
+        return self._worst
+
+    def summary(self):
+        worst = self.worst_drift()
+        return {
+            "group": self.name,
+            "nodes": len(self.members),
+            "online": self.status["online"],
+            "stale": self.status["stale"],
+            "unverified": self.status["unverified"],
+            "gpus": self.gpus,
+            "models": dict(sorted(self.models.items())),
+            "net_kbps": round(max(self.net_kbps, 0.0), 2),
+            "worst_ntp_drift": round(worst, 3) if worst is not None else None,
+            "ntp_unknown": len(self.members) - len(self.drifts),
+            "degraded_links": self.degraded,
+        }
+
+
+class GroupRollups:
+    """Per-group aggregates maintained from gossip change notifications."""
+
+    def __init__(self, rules=None):
+        self.rules = rules or GroupRules()
+        self._lock = threading.Lock()
+        self._groups = {}   # {name: _Rollup}
+        self._nodes = {}    # {node_id: contribution}
+
+    def update(self, node_id, node):
+        """GossipNode listener: apply one node's new state (None removes)."""
+        with self._lock:
+            old = self._nodes.pop(node_id, None)
+            if old is not None:
+                rollup = self._groups[old["group"]]
+                rollup.apply(node_id, old, -1)
+                if not rollup.members:
+                    del self._groups[old["group"]]
+            if node is not None:
+                c = self._contribution(node)
+                self._nodes[node_id] = c
+                rollup = self._groups.get(c["group"])
+                if rollup is None:
+                    rollup = self._groups[c["group"]] = _Rollup(c["group"])
+                rollup.apply(node_id, c, 1)
+
+    def _contribution(self, node):
+        models = {}
+        for gpu in node.get("gpus") or []:
+            model = gpu.get("model") or "Unknown"
+            models[model] = models.get(model, 0) + 1
+        drift = sync_offset(node)
+        return {
+            "group": self.rules.assign(node),
+            "status": node.get("status", "online"),
+            "models": models,
+            "gpus": sum(models.values()),
+            "net_kbps": float(node.get("net_kbps") or 0.0),
+            "drift": abs(drift) if drift is not None else None,
+            "degraded": int(link_degraded(node.get("link_speed"),
+                                          node.get("link_speed_max"))),
+        }
+
+    def group_of(self, node_id):
+        """Return the group *node_id* is currently counted in, or None."""
+        with self._lock:
+            c = self._nodes.get(node_id)
+            return c["group"] if c is not None else None
+
+    def members(self, name):
+        """Return a copy of the node ids in group *name* (empty if unknown)."""
+        with self._lock:
+            rollup = self._groups.get(name)
+            return set(rollup.members) if rollup is not None else set()
+
+    def summaries(self):
+        """Return one summary dict per group, sorted by name."""
+        with self._lock:
+            return [self._groups[name].summary() for name in sorted(self._groups)]
+
+    def detail(self, name):
+        """Return {"summary", "nodes": [node_id, ...]} or None if unknown."""
+        with self._lock:
+            rollup = self._groups.get(name)
+            if rollup is None:
+                return None
+            return {"summary": rollup.summary(), "nodes": sorted(rollup.members)}
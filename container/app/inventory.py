@@ -0,0 +1,276 @@
+"""CoreLink - Cluster GPU inventory index and placement queries.
+
+Secondary indexes over gossip state, updated incrementally from
+GossipNode change notifications (one node at a time, never a full scan):
+
+  GPU class (model, PCIe gen, PCIe width) -> {k: nodes with >= k such GPUs}
+  idle GPUs                               -> {k: nodes with >= k idle GPUs}
+  NIC speed (Mbps), status, NTP state, Nosana status -> nodes
+
+A placement query intersects the matching node sets (C-level set
+operations) and ranks the survivors by precomputed per-node keys.  Broad
+queries (no GPU class filter, or most of the fleet matching) take the
+total-GPU level sets and walk a presorted rank list instead of building
+the class union and heap-selecting over every candidate.
+"""
+
+import bisect
+import heapq
+import re
+import threading
+import time
+
+from clocksync import sync_offset
+
+NTP_SYNC_THRESHOLD = 5.0   # seconds, same as the dashboard check mark
+MAX_RESULTS = 500
+BROAD_FRACTION = 4         # walk the rank list when >= 1/4 of nodes match
+
+_LIMIT_RE = re.compile(r"^\s*(\d+)(?:\.\d+)?\s*x\s*(\d+)\s*$")
+_EMPTY = frozenset()
+
+
+def parse_pcie(limit):
+    """Parse a gpu.py limit string such as "4.0 x 16" into (gen, width)."""
+    match = _LIMIT_RE.match(limit or "")
+    if not match:
+        return 0, 0
+    return int(match.group(1)), int(match.group(2))
+
+
+def ntp_state(drift):
+    """Return "synced", "drift" or "unknown" for an NTP drift value."""
+    if drift is None:
+        return "unknown"
+    return "synced" if abs(drift) <= NTP_SYNC_THRESHOLD else "drift"
+
+
+def _idle_gpus(node):
+    # No per-GPU scheduler state is gossiped: each Nosana container with a
+    # running job is counted as occupying one GPU.
+    busy = sum(1 for c in node.get("nosana") or [] if c.get("status") == "running")
+    return max(0, len(node.get("gpus") or []) - busy)
+
+
+class InventoryIndex:
+    """Incrementally maintained indexes for placement queries."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._nodes = {}       # {node_id: summary}
+        self._gpu_ge = {}      # {(model_lc, gen, width): {k: set(node_id)}}
+        self._any_ge = {}      # {k: set(node_id)} by total GPU count
+        self._idle_ge = {}     # {k: set(node_id)}
+        self._by_nic = {}      # {link_speed: set(node_id)}
+        self._by_status = {}   # {status: set(node_id)}
+        self._by_ntp = {}      # {ntp_state: set(node_id)}
+        self._by_nosana = {}   # {nosana status or "none": set(node_id)}
+        self._models = {}      # {model_lc: display name}
+        self._mixed = set()    # nodes with more than one GPU class
+        self._rank = {}        # {node_id: sort key}, best first
+        self._ranked = []      # all sort keys, sorted (best first)
+
+    # ------------------------------------------------------------------
+    # Maintenance (GossipNode listener)
+    # ------------------------------------------------------------------
+
+    def update(self, node_id, node):
+        """Apply one node's new state; *node* None removes it."""
+        with self._lock:
+            old = self._nodes.pop(node_id, None)
+            if old is not None:
+                self._unindex(node_id, old)
+            if node is not None:
+                summary = self._summarize(node)
+                self._nodes[node_id] = summary
+                self._index(node_id, summary)
+
+    def _summarize(self, node):
+        classes = {}
+        for gpu in node.get("gpus") or []:
+            model = gpu.get("model") or "Unknown"
+            gen, width = parse_pcie(gpu.get("limit"))
+            key = (model.lower(), gen, width)
+            classes[key] = classes.get(key, 0) + 1
+            self._models.setdefault(model.lower(), model)
+        nosana = {c.get("status") or "unknown" for c in node.get("nosana") or []}
+        drift = sync_offset(node)
+        idle = _idle_gpus(node)
+        link = node.get("link_speed") or 0
+        best_gen = max((k[1] for k in classes), default=0)
+        return {
+            "classes": classes,
+            "idle": idle,
+            "gpus": sum(classes.values()),
+            "link_speed": link,
+            "status": node.get("status", "online"),
+            "ntp": ntp_state(drift),
+            "ntp_drift": drift,
+            "nosana": nosana or {"none"},
+            "pcie": sorted({"%d.0 x %d" % (k[1], k[2]) for k in classes}),
+            # Best first: most idle GPUs, fastest NIC, newest PCIe, best clock
+            "rank": (-idle, -link, -best_gen,
+                     abs(drift) if drift is not None else float("inf")),
+        }
+
+    def _index(self, node_id, s):
+        rank = self._rank[node_id] = s["rank"] + (node_id,)
+        bisect.insort(self._ranked, rank)
+        for k in range(1, s["gpus"] + 1):
+            self._any_ge.setdefault(k, set()).add(node_id)
+        if len(s["classes"]) > 1:
+            self._mixed.add(node_id)
+        for key, count in s["classes"].items():
+            levels = self._gpu_ge.setdefault(key, {})
+            for k in range(1, count + 1):
+                levels.setdefault(k, set()).add(node_id)
+        for k in range(1, s["idle"] + 1):
+            self._idle_ge.setdefault(k, set()).add(node_id)
+        self._by_nic.setdefault(s["link_speed"], set()).add(node_id)
+        self._by_status.setdefault(s["status"], set()).add(node_id)
+        self._by_ntp.setdefault(s["ntp"], set()).add(node_id)
+        for status in s["nosana"]:
+            self._by_nosana.setdefault(status, set()).add(node_id)
+
+    def _unindex(self, node_id, s):
+        rank = self._rank.pop(node_id)
+        del self._ranked[bisect.bisect_left(self._ranked, rank)]
+        for k in range(1, s["gpus"] + 1):
+            self._discard(self._any_ge, k, node_id)
+        self._mixed.discard(node_id)
+        for key, count in s["classes"].items():
+            levels = self._gpu_ge[key]
+            for k in range(1, count + 1):
+                self._discard(levels, k, node_id)
+            if not levels:
+                del self._gpu_ge[key]
+        for k in range(1, s["idle"] + 1):
+            self._discard(self._idle_ge, k, node_id)
+        self._discard(self._by_nic, s["link_speed"], node_id)
+        self._discard(self._by_status, s["status"], node_id)
+        self._discard(self._by_ntp, s["ntp"], node_id)
+        for status in s["nosana"]:
+            self._discard(self._by_nosana, status, node_id)
+
+    @staticmethod
+    def _discard(index, key, node_id):
+        nodes = index.get(key)
+        if nodes is not None:
+            nodes.discard(node_id)
+            if not nodes:
+                del index[key]
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def query(self, model=None, min_gpus=1, min_pcie_gen=0, min_pcie_width=0,
+              min_nic=0, ntp=None, status="online", nosana=None, idle=True,
+              limit=20):
+        """Return ranked placement candidates.
+
+        A node qualifies when it has at least *min_gpus* GPUs of *model*
+        (any model if None) at PCIe >= *min_pcie_gen* x *min_pcie_width*,
+        and, with *idle*, at least *min_gpus* idle GPUs.  *ntp* is
+        "synced"/"drift"/"unknown", *status* "online"/"stale"/"unverified"
+        (None for any), *nosana* a Nosana container status or "none".
+        """
+        started = time.perf_counter()
+        min_gpus = max(1, int(min_gpus))
+        limit = max(1, min(int(limit), MAX_RESULTS))
+        model_lc = model.lower() if model else None
+
+        with self._lock:
+            keys = [
+                key for key in self._gpu_ge
+                if (model_lc is None or key[0] == model_lc)
+                and key[1] >= min_pcie_gen and key[2] >= min_pcie_width
+            ]
+            every_class = len(keys) == len(self._gpu_ge)
+            if every_class:
+                # No class filter: total GPU count decides
+                candidates = self._any_ge.get(min_gpus, _EMPTY)
+            else:
+                # Nodes with enough GPUs of a single qualifying class come
+                # straight from the level sets; only mixed-class nodes
+                # (rare) need their qualifying GPUs summed across classes.
+                candidates = set().union(*[
+                    self._gpu_ge[key].get(min_gpus, _EMPTY) for key in keys
+                ])
+            if not every_class and len(keys) > 1 and self._mixed:
+                keyset = set(keys)
+                for node_id in self._mixed - candidates:
+                    classes = self._nodes[node_id]["classes"]
+                    if sum(c for k, c in classes.items() if k in keyset) >= min_gpus:
+                        candidates.add(node_id)
+
+            filters = []
+            if idle:
+                filters.append(self._idle_ge.get(min_gpus, _EMPTY))
+            if min_nic:
+                filters.append(set().union(*[
+                    nodes for speed, nodes in self._by_nic.items()
+                    if speed >= min_nic
+                ]))
+            if status:
+                filters.append(self._by_status.get(status, _EMPTY))
+            if ntp:
+                filters.append(self._by_ntp.get(ntp, _EMPTY))
+            if nosana:
+                filters.append(self._by_nosana.get(nosana, _EMPTY))
+            # Intersect smallest first
+            for nodes in sorted(filters, key=len):
+                if not candidates:
+                    break
+                candidates = candidates & nodes
+
+            if len(candidates) * BROAD_FRACTION >= len(self._ranked):
+                # Most nodes match: the first *limit* hits of the presorted
+                # list are reached after about BROAD_FRACTION * limit steps
+                best = []
+                for rank in self._ranked:
+                    if rank[-1] in candidates:
+                        best.append(rank)
+                        if len(best) == limit:
+                            break
+            else:
+                best = heapq.nsmallest(limit, map(self._rank.__getitem__, candidates))
+            keyset = set(keys)
+            results = []
+            for rank in best:
+                node_id = rank[-1]
+                s = self._nodes[node_id]
+                if every_class:
+                    count = s["gpus"]
+                else:
+                    count = sum(c for k, c in s["classes"].items() if k in keyset)
+                results.append({
+                    "node_id": node_id,
+                    "matching_gpus": count,
+                    "idle_gpus": s["idle"],
+                    "gpus": s["gpus"],
+                    "link_speed": s["link_speed"],
+                    "status": s["status"],
+                    "ntp_drift": s["ntp_drift"],
+                    "pcie": list(s["pcie"]),
+                })
+            total = len(candidates)
+
+        return {
+            "total": total,
+            "candidates": results,
+            "took_ms": round((time.perf_counter() - started) * 1000, 3),
+        }
+
+    def facets(self):
+        """Return the distinct indexed values (for building query UIs)."""
+        with self._lock:
+            return {
+                "models": sorted({self._models[key[0]] for key in self._gpu_ge}),
+                "pcie": sorted({"%d.0 x %d" % (k[1], k[2]) for k in self._gpu_ge}),
+                "nic": sorted(self._by_nic),
+                "status": sorted(self._by_status),
+                "ntp": sorted(self._by_ntp),
+                "nosana": sorted(self._by_nosana),
+                "nodes": len(self._nodes),
+            }
@@ -0,0 +1,89 @@
+"""CoreLink - Passive per-peer round-trip time estimates.
+
+Samples come from timestamp echoes already carried by gossip messages
+(see GossipNode): no extra packets are sent.  Each peer gets a smoothed
+RTT and a jitter estimate (mean deviation) updated like TCP's SRTT and
+RTTVAR (RFC 6298), stored in flat arrays indexed by a per-peer slot so
+hundreds of peers cost a few kilobytes.
+"""
+
+import threading
+import time
+from array import array
+
+ALPHA = 0.125         # SRTT gain
+BETA = 0.25           # RTTVAR gain
+MAX_RTT = 5.0         # seconds; larger samples are clock steps, not RTTs
+
+
+class RttTable:
+    """Smoothed RTT / jitter per peer, in compact arrays."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._slots = {}          # {node_id: index}
+        self._free = []           # reusable indexes of removed peers
+        self._srtt = array("d")
+        self._rttvar = array("d")
+        self._count = array("L")
+        self._updated = array("d")
+
+    def update(self, node_id, rtt):
+        """Fold one RTT sample (seconds) for *node_id*; ignore implausible ones."""
+        if not 0.0 <= rtt <= MAX_RTT:
+            return
+        with self._lock:
+            i = self._slots.get(node_id)
+            if i is None:
+                i = self._slot(node_id)
+            if self._count[i] == 0:
+                self._srtt[i] = rtt
+                self._rttvar[i] = rtt / 2
+            else:
+                self._rttvar[i] += BETA * (abs(self._srtt[i] - rtt) - self._rttvar[i])
+                self._srtt[i] += ALPHA * (rtt - self._srtt[i])
+            self._count[i] += 1
+            self._updated[i] = time.time()
+
+    def _slot(self, node_id):
+        if self._free:
+            i = self._free.pop()
+            self._srtt[i] = self._rttvar[i] = self._updated[i] = 0.0
+            self._count[i] = 0
+        else:
+            i = len(self._srtt)
+            self._srtt.append(0.0)
+            self._rttvar.append(0.0)
+            self._count.append(0)
+            self._updated.append(0.0)
+        self._slots[node_id] = i
+        return i
+
+    def remove(self, node_id):
+        """Forget *node_id* (peer left the cluster)."""
+        with self._lock:
+            i = self._slots.pop(node_id, None)
+            if i is not None:
+                self._free.append(i)
+
+    def row(self):
+        """Return {node_id: {"rtt_ms", "jitter_ms", "samples", "age"}}."""
+        now = time.time()
+        with self._lock:
+            return {
+                nid: {
+                    "rtt_ms": round(self._srtt[i] * 1000, 3),
+                    "jitter_ms": round(self._rttvar[i] * 1000, 3),
+                    "samples": self._count[i],
+                    "age": round(now - self._updated[i], 1),
+                }
+                for nid, i in self._slots.items()
+            }
+
+    def compact(self):
+        """Return {node_id: [srtt_us, jitter_us]} for sharing in heartbeats."""
+        with self._lock:
+            return {
+                nid: [int(self._srtt[i] * 1e6), int(self._rttvar[i] * 1e6)]
+                for nid, i in self._slots.items()
+            }
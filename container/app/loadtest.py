@@ -0,0 +1,509 @@
+"""CoreLink - Dashboard push load test.
+
+Drives a local CoreLink instance the way many open consoles would:
+
+  docker exec -it corelink python3 /app/loadtest.py --user alice \\
+      --clients 200 --nodes 500 --duration 60 --output /data/load.json
+
+Logs in once through /login (password from CORELINK_LOADTEST_PASSWORD or
+a prompt), then opens --clients Socket.IO websocket connections sharing
+that session, each subscribed to --tab.  Meanwhile --nodes synthetic
+nodes ("loadtest-0001", ...) heartbeat by unicast to 127.0.0.1, so the
+server holds a cluster of that size without anything reaching the LAN;
+they age out NODE_REMOVE seconds after the run.
+
+Pushed frames carry the server's send time ("sent"), so a frame's
+fan-out latency is its arrival time minus that.  A frame is late when it
+arrives more than LATE_FACTOR push intervals after the client's previous
+one, and the intervals missing in such a gap count as dropped.  Server
+CPU and RSS are sampled from /proc.  Results are printed (or written to
+--output) as JSON; the exit status is 1 when --max-p99-ms or
+--max-dropped is exceeded, so a run can gate a release.
+
+Standard library only: the websocket client below speaks just enough
+RFC 6455 and Engine.IO v4 for this.
+"""
+
+import argparse
+import base64
+import getpass
+import http.cookiejar
+import json
+import os
+import random
+import re
+import socket
+import ssl
+import struct
+import sys
+import threading
+import time
+import urllib.parse
+import urllib.request
+
+from gossip import HEARTBEAT_INTERVAL
+from telemetry import encode_telemetry
+
+PUSH_INTERVAL = 3.0      # server push period (see server._push_cluster_state)
+LATE_FACTOR = 1.5        # gap, in push intervals, that makes a frame late
+SAMPLE_INTERVAL = 1.0    # seconds between server CPU / RSS samples
+READ_TIMEOUT = 60.0      # longer than the Engine.IO ping interval
+MAX_LINE = 8192
+NODE_PREFIX = "loadtest-"
+PASSWORD_ENV = "CORELINK_LOADTEST_PASSWORD"
+
+OP_TEXT, OP_CLOSE, OP_PING, OP_PONG = 0x1, 0x8, 0x9, 0xA
+_SENT = re.compile(r'"sent":\s*([0-9.eE+-]+)')
+
+
+class LoadTestError(Exception):
+    """Login, handshake or protocol failure."""
+
+
+# ---------------------------------------------------------------------------
+# Login and websocket transport
+# ---------------------------------------------------------------------------
+
+def login(base_url, username, password, context):
+    """POST /login and return the session's Cookie header value."""
+    jar = http.cookiejar.CookieJar()
+    opener = urllib.request.build_opener(
+        urllib.request.HTTPCookieProcessor(jar),
+        urllib.request.HTTPSHandler(context=context),
+    )
+    form = urllib.parse.urlencode({"username": username, "password": password})
+    resp = opener.open(base_url + "/login", form.encode("ascii"), timeout=30)
+    if urllib.parse.urlsplit(resp.geturl()).path.rstrip("/") == "/login":
+        raise LoadTestError("login failed for %s" % username)
+    cookies = ["%s=%s" % (c.name, c.value) for c in jar]
+    if not cookies:
+        raise LoadTestError("login returned no session cookie")
+    return "; ".join(cookies)
+
+
+class _WebSocket:
+    """Minimal RFC 6455 client: masked text frames out, messages in."""
+
+    def __init__(self, host, port, path, cookie, context=None):
+        sock = socket.create_connection((host, port), timeout=READ_TIMEOUT)
+        if context is not None:
+            sock = context.wrap_socket(sock, server_hostname=host)
+        self.sock = sock
+        self.rfile = sock.makefile("rb")
+        key = base64.b64encode(os.urandom(16)).decode("ascii")
+        request = (
+            "GET %s HTTP/1.1\r\nHost: %s:%d\r\nUpgrade: websocket\r\n"
+            "Connection: Upgrade\r\nSec-WebSocket-Key: %s\r\n"
+            "Sec-WebSocket-Version: 13\r\nCookie: %s\r\n\r\n"
+            % (path, host, port, key, cookie)
+        )
+        sock.sendall(request.encode("latin-1"))
+        status = self.rfile.readline(MAX_LINE).decode("latin-1")
+        if " 101 " not in status:
+            raise LoadTestError("websocket upgrade refused: %s" % status.strip())
+        while self.rfile.readline(MAX_LINE) not in (b"\r\n", b"\n", b""):
+            pass
+
+    def _read(self, n):
+        data = self.rfile.read(n)
+        if len(data) < n:
+            raise LoadTestError("connection closed")
+        return data
+
+    def _send_frame(self, opcode, payload):
+        mask = os.urandom(4)
+        n = len(payload)
+        if n < 126:
+            head = struct.pack("!BB", 0x80 | opcode, 0x80 | n)
+        elif n < 65536:
+            head = struct.pack("!BBH", 0x80 | opcode, 0x80 | 126, n)
+        else:
+            head = struct.pack("!BBQ", 0x80 | opcode, 0x80 | 127, n)
+        masked = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+        self.sock.sendall(head + mask + masked)
+
+    def send(self, text):
+        self._send_frame(OP_TEXT, text.encode("utf-8"))
+
+    def recv(self):
+        """Return the next text message; answers pings, raises on close."""
+        parts = []
+        while True:
+            b0, b1 = self._read(2)
+            length = b1 & 0x7F
+            if length == 126:
+                length = struct.unpack("!H", self._read(2))[0]
+            elif length == 127:
+                length = struct.unpack("!Q", self._read(8))[0]
+            if b1 & 0x80:
+                self._read(4)   # servers do not mask; skip the key if one does
+            data = self._read(length)
+            opcode = b0 & 0x0F
+            if opcode == OP_CLOSE:
+                raise LoadTestError("closed by server")
+            if opcode == OP_PING:
+                self._send_frame(OP_PONG, data)
+                continue
+            if opcode == OP_PONG:
+                continue
+            parts.append(data)
+            if b0 & 0x80:
+                return b"".join(parts).decode("utf-8")
+
+    def close(self):
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+# ---------------------------------------------------------------------------
+# Clients, synthetic cluster, server sampler
+# ---------------------------------------------------------------------------
+
+def _sent_time(message):
+    """The "sent" stamp of a pushed cluster_state frame (last top-level key)."""
+    match = _SENT.search(message, max(0, len(message) - 64))
+    return float(match.group(1)) if match else None
+
+
+class _Client(threading.Thread):
+    """One dashboard connection recording (arrival, sent, size) per frame."""
+
+    def __init__(self, target, cookie, context, tab, stop):
+        threading.Thread.__init__(self, daemon=True)
+        self.target = target
+        self.cookie = cookie
+        self.context = context
+        self.tab = tab
+        self.stop = stop
+        self.frames = []
+        self.connected = False
+        self.error = None
+        self._ws = None
+
+    def run(self):
+        host, port = self.target
+        try:
+            ws = self._ws = _WebSocket(host, port, "/socket.io/?EIO=4&transport=websocket",
+                                       self.cookie, self.context)
+            if not ws.recv().startswith("0"):
+                raise LoadTestError("unexpected Engine.IO open packet")
+            ws.send("40")
+            while True:
+                message = ws.recv()
+                if message == "2":
+                    ws.send("3")
+                elif message.startswith('42["cluster_state"'):
+                    self.frames.append((time.time(), _sent_time(message), len(message)))
+                elif message.startswith("40"):
+                    self.connected = True
+                    ws.send('42["subscribe",%s]' % json.dumps({"tab": self.tab}))
+                elif message.startswith("44"):
+                    raise LoadTestError("connection rejected (session not accepted)")
+                elif message.startswith("41") or message.startswith("1"):
+                    raise LoadTestError("disconnected by server")
+        except (OSError, ValueError, LoadTestError) as exc:
+            if not self.stop.is_set():
+                self.error = str(exc) or exc.__class__.__name__
+
+    def close(self):
+        if self._ws is not None:
+            self._ws.close()
+
+
+class SyntheticCluster(threading.Thread):
+    """Heartbeats for *count* fake nodes, unicast to the local gossip port."""
+
+    def __init__(self, count, gpus, port, stop):
+        threading.Thread.__init__(self, daemon=True)
+        self.node_ids = ["%s%04d" % (NODE_PREFIX, i + 1) for i in range(count)]
+        self.gpus = [{"id": i, "model": "RTX A6000", "limit": "4.0 x 16"}
+                     for i in range(gpus)]
+        self.port = port
+        self.stop = stop
+        self.sent = 0
+
+    def _heartbeat(self, node_id, seq):
+        telemetry = {
+            "cpu": random.uniform(0, 100), "ram": random.uniform(20, 90),
+            "disk": 40,
+            "gpus": [{"util": random.uniform(0, 100), "mem": random.uniform(0, 100),
+                      "temp": random.uniform(35, 85)} for _ in self.gpus],
+        }
+        return json.dumps({
+            "type": "heartbeat",
+            "node_id": node_id,
+            "gpus": self.gpus,
+            "timestamp": time.strftime("%d%b%y %H:%M:%S").upper() + "utc",
+            "seq": seq,
+            "net_kbps": round(random.uniform(0, 5000), 1),
+            "epoch": time.time(),
+            "link_speed": 10000,
+            "link_speed_max": 10000,
+            "ntp_drift": round(random.uniform(-0.01, 0.01), 4),
+            "nosana": [],
+            "label": "loadtest",
+            "tm": encode_telemetry(telemetry),
+        }).encode("utf-8")
+
+    def run(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        # Wall-clock based so a rerun's seqs beat entries left from the last one
+        seq = int(time.time())
+        while not self.stop.is_set():
+            seq += 1
+            start = time.monotonic()
+            for i, node_id in enumerate(self.node_ids):
+                try:
+                    sock.sendto(self._heartbeat(node_id, seq), ("127.0.0.1", self.port))
+                    self.sent += 1
+                except OSError:
+                    pass
+                # Spread each round over the heartbeat interval like real nodes
+                delay = start + HEARTBEAT_INTERVAL * (i + 1) / len(self.node_ids) \
+                    - time.monotonic()
+                if delay > 0 and self.stop.wait(delay):
+                    break
+        sock.close()
+
+
+def find_server_pid():
+    """PID of the local server.py process, or None."""
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit() or int(entry) == os.getpid():
+            continue
+        try:
+            with open("/proc/%s/cmdline" % entry, "rb") as f:
+                argv = f.read().split(b"\0")
+        except OSError:
+            continue
+        if any(arg.endswith(b"server.py") for arg in argv):
+            return int(entry)
+    return None
+
+
+class ServerSampler(threading.Thread):
+    """Samples CPU % and RSS of process *pid* every SAMPLE_INTERVAL."""
+
+    def __init__(self, pid, stop):
+        threading.Thread.__init__(self, daemon=True)
+        self.pid = pid
+        self.stop = stop
+        self.samples = []    # (time, cpu_pct, rss_mb)
+
+    def _read(self):
+        with open("/proc/%d/stat" % self.pid) as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        ticks = int(fields[11]) + int(fields[12])   # utime + stime
+        rss = 0.0
+        with open("/proc/%d/status" % self.pid) as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    rss = int(line.split()[1]) / 1024.0
+                    break
+        return ticks, rss
+
+    def run(self):
+        hz = os.sysconf("SC_CLK_TCK")
+        try:
+            ticks, rss = self._read()
+            last = time.monotonic()
+            self.samples.append((time.time(), 0.0, rss))
+            while not self.stop.wait(SAMPLE_INTERVAL):
+                now_ticks, rss = self._read()
+                now = time.monotonic()
+                cpu = 100.0 * (now_ticks - ticks) / hz / (now - last)
+                ticks, last = now_ticks, now
+                self.samples.append((time.time(), cpu, rss))
+        except (OSError, ValueError, IndexError):
+            pass
+
+
+# ---------------------------------------------------------------------------
+# Results
+# ---------------------------------------------------------------------------
+
+def _percentiles(values):
+    """{"p50", "p90", "p99", "max"} in ms (nearest rank), or None if empty."""
+    if not values:
+        return None
+    values = sorted(values)
+
+    def rank(p):
+        return values[min(len(values) - 1, max(0, int(round(p * len(values))) - 1))]
+
+    return {
+        "p50": round(rank(0.50) * 1000, 2),
+        "p90": round(rank(0.90) * 1000, 2),
+        "p99": round(rank(0.99) * 1000, 2),
+        "max": round(values[-1] * 1000, 2),
+    }
+
+
+def summarize(clients, window, samples):
+    """Aggregate client frames and server samples inside *window* (start, end)."""
+    start, end = window
+    latencies, sizes = [], []
+    arrivals = {}        # {sent: [arrival, ...]}, one push to many clients
+    late = dropped = 0
+    for client in clients:
+        pushes = [(a, s, n) for a, s, n in client.frames
+                  if s is not None and start <= a <= end]
+        for arrival, sent, size in pushes:
+            latencies.append(arrival - sent)
+            sizes.append(size)
+            arrivals.setdefault(sent, []).append(arrival)
+        times = [start] + [a for a, _s, _n in pushes] + [end]
+        for prev, cur in zip(times, times[1:]):
+            if cur - prev > LATE_FACTOR * PUSH_INTERVAL:
+                missed = int(round((cur - prev) / PUSH_INTERVAL)) - 1
+                dropped += max(missed, 0)
+                if cur != end:
+                    late += 1
+    spreads = [max(a) - min(a) for a in arrivals.values() if len(a) > 1]
+
+    cpu = [s[1] for s in samples[1:] if start <= s[0] <= end]
+    rss = [s[2] for s in samples]
+    return {
+        "clients": {
+            "requested": len(clients),
+            "connected": sum(1 for c in clients if c.connected),
+            "errors": sum(1 for c in clients if c.error),
+            "error_samples": sorted(set(c.error for c in clients if c.error))[:5],
+        },
+        "frames": {
+            "received": len(latencies),
+            "bytes_avg": int(sum(sizes) / len(sizes)) if sizes else 0,
+            "late": late,
+            "dropped": dropped,
+        },
+        "latency_ms": _percentiles(latencies),
+        "fanout_spread_ms": _percentiles(spreads),
+        "server": {
+            "cpu_pct_avg": round(sum(cpu) / len(cpu), 1) if cpu else None,
+            "cpu_pct_max": round(max(cpu), 1) if cpu else None,
+            "rss_mb_start": round(rss[0], 1) if rss else None,
+            "rss_mb_max": round(max(rss), 1) if rss else None,
+        },
+    }
+
+
+# ---------------------------------------------------------------------------
+# Command line
+# ---------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="CoreLink dashboard push load test")
+    parser.add_argument("--url", default="https://127.0.0.1:443")
+    parser.add_argument("--user", required=True)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--nodes", type=int, default=100,
+                        help="synthetic nodes to add (0 = use the real cluster)")
+    parser.add_argument("--gpus", type=int, default=8, help="GPUs per synthetic node")
+    parser.add_argument("--tab", default="test", help="view each client subscribes to")
+    parser.add_argument("--duration", type=float, default=60.0, help="measured seconds")
+    parser.add_argument("--ramp", type=float, default=10.0,
+                        help="seconds over which clients connect")
+    parser.add_argument("--gossip-port", type=int,
+                        default=int(os.environ.get("CORELINK_GOSSIP_PORT", "47100")))
+    parser.add_argument("--pid", type=int, help="server PID (default: find server.py)")
+    parser.add_argument("--verify", action="store_true",
+                        help="verify the TLS certificate (off for local self-signed)")
+    parser.add_argument("--output", help="write JSON results here instead of stdout")
+    parser.add_argument("--max-p99-ms", type=float)
+    parser.add_argument("--max-dropped", type=int)
+    args = parser.parse_args()
+
+    url = urllib.parse.urlsplit(args.url)
+    target = (url.hostname, url.port or (443 if url.scheme == "https" else 80))
+    context = None
+    if url.scheme == "https":
+        context = ssl.create_default_context()
+        if not args.verify:
+            context.check_hostname = False
+            context.verify_mode = ssl.CERT_NONE
+    base_url = "%s://%s:%d" % (url.scheme, target[0], target[1])
+
+    password = os.environ.get(PASSWORD_ENV) or getpass.getpass("Password for %s: " % args.user)
+    try:
+        cookie = login(base_url, args.user, password, context)
+    except (OSError, LoadTestError) as exc:
+        print("[FAIL] %s" % exc, file=sys.stderr)
+        return 2
+
+    try:
+        import resource
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if soft < hard:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    except (ImportError, ValueError, OSError):
+        pass
+
+    stop = threading.Event()
+    feeder = None
+    if args.nodes > 0:
+        feeder = SyntheticCluster(args.nodes, args.gpus, args.gossip_port, stop)
+        feeder.start()
+        print("[INFO] Feeding %d synthetic nodes; waiting one heartbeat round"
+              % args.nodes, file=sys.stderr)
+        time.sleep(HEARTBEAT_INTERVAL + 1)
+
+    pid = args.pid or find_server_pid()
+    sampler = None
+    if pid:
+        sampler = ServerSampler(pid, stop)
+        sampler.start()
+    else:
+        print("[WARN] server process not found; no CPU/RSS figures", file=sys.stderr)
+
+    clients = []
+    for i in range(args.clients):
+        client = _Client(target, cookie, context, args.tab, stop)
+        client.start()
+        clients.append(client)
+        time.sleep(args.ramp / max(args.clients, 1))
+    # Let the last clients receive their first push before measuring
+    time.sleep(PUSH_INTERVAL)
+
+    window = (time.time(), time.time() + args.duration)
+    print("[INFO] %d clients started; measuring for %ds"
+          % (len(clients), args.duration), file=sys.stderr)
+    time.sleep(args.duration)
+    stop.set()
+    for client in clients:
+        client.close()
+    for thread in clients + [t for t in (feeder, sampler) if t is not None]:
+        thread.join(5)
+
+    results = summarize(clients, window, sampler.samples if sampler else [])
+    results["config"] = {
+        "url": base_url, "clients": args.clients, "nodes": args.nodes,
+        "gpus": args.gpus, "tab": args.tab, "duration": args.duration,
+        "ramp": args.ramp, "server_pid": pid,
+    }
+    failures = []
+    p99 = (results["latency_ms"] or {}).get("p99")
+    if args.max_p99_ms is not None and (p99 is None or p99 > args.max_p99_ms):
+        failures.append("p99 latency %s ms > %s ms" % (p99, args.max_p99_ms))
+    if args.max_dropped is not None and results["frames"]["dropped"] > args.max_dropped:
+        failures.append("%d dropped frames > %d"
+                        % (results["frames"]["dropped"], args.max_dropped))
+    if results["clients"]["connected"] < args.clients:
+        failures.append("%d of %d clients connected"
+                        % (results["clients"]["connected"], args.clients))
+    results["passed"] = not failures
+    results["failures"] = failures
+
+    text = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0 if results["passed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
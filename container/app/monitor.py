@@ -21,13 +21,12 @@ class AppMonitor:
         self._prev_io_net = 0
         self._prev_time = 0.0
         self._default_iface = self._get_default_iface()
-        self._link_speed = self._detect_link_speed()
-        self._link_speed_max = self._detect_max_speed(self._default_iface)
-        # Graceful degradation: if ethtool failed but negotiated > 0, treat as max
-        if self._link_speed_max == 0 and self._link_speed > 0:
-            self._link_speed_max = self._link_speed
-        self._ntp_drift = self._query_ntp()
-        self._ntp_last_check = time.monotonic()
+        # Filled in by discover_link() / refresh_ntp(), which block on
+        # ethtool and the network and are run off the event loop at startup
+        self._link_speed = 0
+        self._link_speed_max = 0
+        self._ntp_drift = None
+        self._ntp_last_check = None
         self._ntp_interval = 60
         self._metrics = {
             "cpu": 0.0,
@@ -58,15 +57,35 @@ class AppMonitor:
         self._metrics["net_mbps"] = self._calc_net(dt)
         self._metrics["disk"] = self._calc_disk()
 
-        if now - self._ntp_last_check >= self._ntp_interval:
-            self._ntp_drift = self._query_ntp()
-            self._ntp_last_check = now
+        if (self._ntp_last_check is not None
+                and now - self._ntp_last_check >= self._ntp_interval):
+            self.refresh_ntp()
         self._metrics["ntp_drift"] = self._ntp_drift
 
     def get_metrics(self):
         """Return a copy of the latest metrics dict."""
         return dict(self._metrics)
 
+    def discover_link(self):
+        """Detect negotiated and max NIC speed; return (speed, max) in Mbps."""
+        speed = self._detect_link_speed()
+        speed_max = self._detect_max_speed(self._default_iface)
+        # Graceful degradation: if ethtool failed but negotiated > 0, treat as max
+        if speed_max == 0 and speed > 0:
+            speed_max = speed
+        self._link_speed = speed
+        self._link_speed_max = speed_max
+        self._metrics["link_speed"] = speed
+        self._metrics["link_speed_max"] = speed_max
+        return speed, speed_max
+
+    def refresh_ntp(self):
+        """Query NTP now and return the drift (seconds, or None)."""
+        self._ntp_drift = self._query_ntp()
+        self._ntp_last_check = time.monotonic()
+        self._metrics["ntp_drift"] = self._ntp_drift
+        return self._ntp_drift
+
     # ------------------------------------------------------------------
     # NTP — query pool.ntp.org for local clock drift
     # ------------------------------------------------------------------
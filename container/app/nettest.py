@@ -0,0 +1,383 @@
+"""CoreLink - On-demand node-to-node throughput and latency tests.
+
+Every node runs a small TCP test server (CORELINK_NETTEST_PORT, default
+gossip port + 2) and advertises the port in gossip.  A pair test is one
+connection: a few 8-byte ping/echo round trips for latency, then a timed
+bulk transfer whose rate is measured by the receiver.
+
+A matrix run, started from any node's console or API, covers every ordered
+pair of the chosen gossip members in rounds of disjoint pairs, so no node
+is in two tests at once.  Each node also holds a test lock: tests from a
+concurrent run elsewhere are refused ("busy") instead of overlapping.
+Tests sent from other nodes are delegated to them over the same port (a
+"run" request naming the target by node id, which the delegate resolves
+from its own gossip view).  Runs are spaced at least RUN_COOLDOWN apart.
+
+Every test a node sends goes through NetTestServer.run(), whatever
+started it, so the limits live there: "run" requests are only accepted
+from gossip members, the same target is tested at most once per
+RUN_COOLDOWN, at most RUN_BUDGET tests are sent per BUDGET_WINDOW, and
+the sender is capped at CORELINK_NETTEST_MAX_MBPS (DEFAULT_MAX_MBPS).
+The listener serves at most MAX_CONNECTIONS connections at a time.
+"""
+
+import fnmatch
+import json
+import math
+import socket
+import struct
+import threading
+import time
+
+DEFAULT_SECS = 2.0      # bulk transfer duration per direction
+MAX_SECS = 10.0
+PINGS = 10              # latency round trips per test
+CHUNK = 64 * 1024
+MAX_NODES = 32          # per matrix run (N * (N - 1) tests)
+RUN_COOLDOWN = 30.0     # seconds between matrix runs / tests to one target
+RUN_BUDGET = 2 * (MAX_NODES - 1)  # tests sent per BUDGET_WINDOW (two full runs)
+BUDGET_WINDOW = 600.0
+DEFAULT_MAX_MBPS = 1000.0   # sender cap unless CORELINK_NETTEST_MAX_MBPS
+MAX_CONNECTIONS = 8     # concurrent connections served by the listener
+CONNECT_TIMEOUT = 3.0
+MAX_HEADER = 4096
+
+
+class NetTestError(Exception):
+    """A pair test could not be run (refused, busy, closed early)."""
+
+
+def _send_json(conn, obj):
+    conn.sendall(json.dumps(obj).encode("utf-8") + b"\n")
+
+
+def _read_json(rfile):
+    line = rfile.readline(MAX_HEADER)
+    if not line:
+        raise NetTestError("connection closed")
+    return json.loads(line.decode("utf-8"))
+
+
+def measure(host, port, secs=DEFAULT_SECS, max_mbps=0, pings=PINGS):
+    """Run one pair test against the server at *host*:*port*.
+
+    Returns {"mbps", "rtt_ms", "rtt_min_ms", "bytes"}; raises NetTestError
+    or OSError.  With *max_mbps* the sender paces itself to that rate.
+    """
+    secs = min(max(float(secs), 0.5), MAX_SECS)
+    with socket.create_connection((host, port), timeout=CONNECT_TIMEOUT) as conn:
+        conn.settimeout(secs + 10)
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        rfile = conn.makefile("rb")
+        _send_json(conn, {"op": "test", "pings": pings})
+        reply = _read_json(rfile)
+        if not reply.get("ok"):
+            raise NetTestError(reply.get("error") or "refused")
+
+        rtts = []
+        for _ in range(pings):
+            t0 = time.perf_counter()
+            conn.sendall(struct.pack("!d", t0))
+            if len(rfile.read(8)) < 8:
+                raise NetTestError("connection closed")
+            rtts.append(time.perf_counter() - t0)
+
+        chunk = bytes(CHUNK)
+        sent = 0
+        start = time.monotonic()
+        deadline = start + secs
+        while True:
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            if max_mbps:
+                ahead = sent * 8 / (max_mbps * 1e6) - (now - start)
+                if ahead > 0:
+                    time.sleep(min(ahead, deadline - now))
+                    continue
+            conn.sendall(chunk)
+            sent += CHUNK
+        conn.shutdown(socket.SHUT_WR)
+        result = _read_json(rfile)
+
+    received, took = result.get("bytes", 0), result.get("secs", 0)
+    return {
+        "mbps": round(received * 8 / took / 1e6, 1) if took > 0 else 0.0,
+        "rtt_ms": round(1000 * sum(rtts) / len(rtts), 3) if rtts else None,
+        "rtt_min_ms": round(1000 * min(rtts), 3) if rtts else None,
+        "bytes": received,
+    }
+
+
+def schedule(node_ids):
+    """Return rounds of disjoint (src, dst) pairs covering each ordered pair once.
+
+    Circle method: n - 1 rounds of n / 2 pairs for an even node count, each
+    run once per direction.
+    """
+    players = list(node_ids)
+    if len(players) % 2:
+        players.append(None)
+    n = len(players)
+    rounds = []
+    for _ in range(n - 1):
+        pairs = [(players[i], players[n - 1 - i]) for i in range(n // 2)]
+        pairs = [p for p in pairs if p[0] is not None and p[1] is not None]
+        rounds.append(pairs)
+        rounds.append([(b, a) for a, b in pairs])
+        players = [players[0], players[-1]] + players[1:-1]
+    return [r for r in rounds if r]
+
+
+def endpoint(gossip, node_id):
+    """(host, port) of *node_id*'s test server from gossip, or None."""
+    nodes = gossip.get_nodes([node_id])
+    if not nodes or not nodes[0].get("nettest_port"):
+        return None
+    host = "127.0.0.1" if node_id == gossip.hostname else nodes[0].get("ip")
+    return (host, nodes[0]["nettest_port"]) if host else None
+
+
+class NetTestServer:
+    """TCP test endpoint: serves pair tests and delegated "run" requests.
+
+    Targets of "run" requests are resolved through *gossip* membership.
+    """
+
+    def __init__(self, port, gossip, max_mbps=DEFAULT_MAX_MBPS):
+        self.port = port
+        # Always capped: a non-positive setting falls back to the default
+        self.max_mbps = max_mbps if max_mbps and max_mbps > 0 else DEFAULT_MAX_MBPS
+        self._gossip = gossip
+        self._busy = threading.Lock()  # one test per node at a time
+        self._slots = threading.BoundedSemaphore(MAX_CONNECTIONS)
+        self._limits = threading.Lock()
+        self._last_test = {}    # {target: monotonic time of last test}
+        self._sent = []         # monotonic times of tests in BUDGET_WINDOW
+        self._sock = None
+
+    def start(self):
+        """Bind the listener and start accepting (call once)."""
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind(("", self.port))
+        self._sock.listen(16)
+        threading.Thread(target=self._accept_loop, name="nettest", daemon=True).start()
+
+    def _accept_loop(self):
+        while True:
+            try:
+                conn, addr = self._sock.accept()
+            except OSError:
+                continue
+            if not self._slots.acquire(blocking=False):
+                conn.close()
+                continue
+            threading.Thread(target=self._handle, args=(conn, addr), daemon=True).start()
+
+    def _handle(self, conn, addr):
+        try:
+            conn.settimeout(MAX_SECS + 20)
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            rfile = conn.makefile("rb")
+            req = _read_json(rfile)
+            if req.get("op") == "test":
+                self._serve_test(conn, rfile, req)
+            elif req.get("op") == "run":
+                if self._is_member(addr[0]):
+                    self._serve_run(conn, req)
+                else:
+                    _send_json(conn, {"error": "not a cluster member"})
+        except (OSError, ValueError, NetTestError):
+            pass
+        finally:
+            conn.close()
+            self._slots.release()
+
+    def _is_member(self, ip):
+        """True if *ip* is the gossip address of a known node."""
+        return any(n.get("ip") == ip for n in self._gossip.get_cluster_state())
+
+    def _serve_test(self, conn, rfile, req):
+        if not self._busy.acquire(blocking=False):
+            _send_json(conn, {"ok": False, "error": "busy"})
+            return
+        try:
+            result = self._receive(conn, rfile, req)
+        finally:
+            # Released before replying so the sender's next round never
+            # finds this node still busy
+            self._busy.release()
+        if result is not None:
+            _send_json(conn, result)
+
+    @staticmethod
+    def _receive(conn, rfile, req):
+        """Echo the pings, then count bulk bytes until EOF; None if cut short."""
+        _send_json(conn, {"ok": True})
+        for _ in range(min(int(req.get("pings", PINGS)), 100)):
+            data = rfile.read(8)
+            if len(data) < 8:
+                return None
+            conn.sendall(data)
+
+        # Clock starts at the first chunk, which is not counted
+        received = 0
+        start = None
+        limit = time.monotonic() + MAX_SECS + 5
+        buf = bytearray(CHUNK)
+        while True:
+            n = rfile.readinto(buf)
+            if not n or time.monotonic() > limit:
+                break
+            if start is None:
+                start = time.monotonic()
+            else:
+                received += n
+        took = time.monotonic() - start if start is not None else 0.0
+        return {"bytes": received, "secs": took}
+
+    def _serve_run(self, conn, req):
+        _send_json(conn, self.run(req.get("target"), req.get("secs", DEFAULT_SECS)))
+
+    def run(self, target, secs=DEFAULT_SECS):
+        """Test from this node to node *target*; return a result dict.
+
+        Failures are returned as {"error": ...} rather than raised.
+        """
+        addr = endpoint(self._gossip, target) if isinstance(target, str) else None
+        if addr is None:
+            return {"error": "unknown target"}
+        if not self._busy.acquire(blocking=False):
+            return {"error": "busy"}
+        try:
+            refused = self._charge(target)
+            if refused:
+                return {"error": refused}
+            return measure(addr[0], addr[1], secs, self.max_mbps)
+        except (OSError, ValueError, NetTestError) as exc:
+            return {"error": str(exc) or exc.__class__.__name__}
+        finally:
+            self._busy.release()
+
+    def _charge(self, target):
+        """Account one test to *target*; return an error string if over a limit."""
+        now = time.monotonic()
+        with self._limits:
+            self._sent = [t for t in self._sent if now - t < BUDGET_WINDOW]
+            last = self._last_test.get(target)
+            if last is not None and now - last < RUN_COOLDOWN:
+                return "cooling down (%d s)" % math.ceil(RUN_COOLDOWN - (now - last))
+            if len(self._sent) >= RUN_BUDGET:
+                return "test budget exhausted (%d per %d s)" % (RUN_BUDGET, BUDGET_WINDOW)
+            self._last_test[target] = now
+            self._sent.append(now)
+        return None
+
+
+def delegate(host, port, target, secs):
+    """Ask the test server at *host*:*port* to run a test to node *target*."""
+    try:
+        with socket.create_connection((host, port), timeout=CONNECT_TIMEOUT) as conn:
+            conn.settimeout(min(max(float(secs), 0.5), MAX_SECS) + 20)
+            rfile = conn.makefile("rb")
+            _send_json(conn, {"op": "run", "target": target, "secs": secs})
+            return _read_json(rfile)
+    except (OSError, ValueError, NetTestError) as exc:
+        return {"error": str(exc) or exc.__class__.__name__}
+
+
+class NetTestMatrix:
+    """Coordinates matrix runs from this node and keeps the last results."""
+
+    def __init__(self, gossip, server):
+        self._gossip = gossip
+        self._server = server
+        self._lock = threading.Lock()
+        self._state = {
+            "running": False,
+            "started": None,
+            "finished": None,
+            "secs": DEFAULT_SECS,
+            "nodes": [],
+            "done": 0,
+            "total": 0,
+            "matrix": {},   # {src: {dst: result}}
+        }
+
+    def start(self, patterns=None, secs=DEFAULT_SECS):
+        """Start a run over online members matching hostname *patterns*.
+
+        Returns None on success or an error string (already running,
+        cooling down, fewer than two eligible nodes).
+        """
+        secs = min(max(float(secs), 0.5), MAX_SECS)
+        nodes = [
+            n["node_id"] for n in self._gossip.get_cluster_state()
+            if n.get("status") == "online" and n.get("nettest_port")
+            and (not patterns or any(fnmatch.fnmatchcase(n["node_id"], p)
+                                     for p in patterns))
+        ]
+        if len(nodes) < 2:
+            return "need at least two online nodes with a test server"
+        if len(nodes) > MAX_NODES:
+            return "too many nodes (%d, max %d)" % (len(nodes), MAX_NODES)
+
+        with self._lock:
+            state = self._state
+            if state["running"]:
+                return "a test run is already in progress"
+            if state["finished"] and time.time() - state["finished"] < RUN_COOLDOWN:
+                return "wait %d seconds between runs" % math.ceil(
+                    RUN_COOLDOWN - (time.time() - state["finished"]))
+            rounds = schedule(sorted(nodes))
+            self._state = {
+                "running": True,
+                "started": time.time(),
+                "finished": None,
+                "secs": secs,
+                "nodes": sorted(nodes),
+                "done": 0,
+                "total": sum(len(r) for r in rounds),
+                "matrix": {},
+            }
+        threading.Thread(target=self._run, args=(rounds, secs),
+                         name="nettest-matrix", daemon=True).start()
+        return None
+
+    def snapshot(self):
+        """Return the current run state and result matrix."""
+        with self._lock:
+            state = dict(self._state)
+            state["matrix"] = {src: dict(row) for src, row in state["matrix"].items()}
+        return state
+
+    def _run(self, rounds, secs):
+        try:
+            for pairs in rounds:
+                threads = [
+                    threading.Thread(target=self._pair, args=(src, dst, secs), daemon=True)
+                    for src, dst in pairs
+                ]
+                for t in threads:
+                    t.start()
+                for t in threads:
+                    t.join()
+        finally:
+            with self._lock:
+                self._state["running"] = False
+                self._state["finished"] = time.time()
+
+    def _pair(self, src, dst, secs):
+        if src == self._gossip.hostname:
+            result = self._server.run(dst, secs)
+        else:
+            addr = endpoint(self._gossip, src)
+            if addr is None:
+                result = {"error": "no test server"}
+            else:
+                result = delegate(addr[0], addr[1], dst, secs)
+        result["at"] = time.time()
+        with self._lock:
+            self._state["matrix"].setdefault(src, {})[dst] = result
+            self._state["done"] += 1
@@ -1,11 +1,178 @@
 """CoreLink - Nosana node discovery and status probe."""
 
+import http.client
 import json
 import os
 import shutil
+import socket
 import subprocess
 import threading
 import time
+import urllib.parse
+
+PROBE_TIMEOUT = 45  # seconds before the probe subprocess is killed
+DOCKER_SOCK = os.environ.get("CORELINK_DOCKER_SOCK", "/var/run/docker.sock")
+EVENTS_RETRY = 5.0  # seconds between events stream reconnects
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP connection over the Docker Unix socket."""
+
+    def __init__(self, sock_path, timeout=10):
+        super().__init__("localhost", timeout=timeout)
+        self._sock_path = sock_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self._sock_path)
+
+
+def _is_nosana_image(image):
+    return "nosana" in (image or "").lower()
+
+
+class DockerEventWatcher:
+    """Tracks running Nosana containers via the Docker ``/events`` stream.
+
+    Seeds the set from ``/containers/json`` once per connection, then
+    applies start/stop/die events as they arrive.  ``synced`` is False
+    until the first seed succeeds and whenever the stream is down, so
+    callers can fall back to polling.
+    """
+
+    def __init__(self, sock_path=DOCKER_SOCK):
+        self._sock_path = sock_path
+        self._lock = threading.Lock()
+        self._containers = {}  # {id: {"Id", "Names", "Image"}}
+        self._changed = False
+        self.synced = False
+        self._running = False
+        self._stopped = threading.Event()
+        self._stream = None    # socket of the live /events stream
+        self._thread = None
+
+    def start(self):
+        """Start the watcher thread (call once)."""
+        self._running = True
+        self._thread = threading.Thread(target=self._watch_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the watcher, waking a thread blocked on a quiet stream."""
+        self._running = False
+        self._stopped.set()
+        with self._lock:
+            sock = self._stream
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def containers(self):
+        """Return the current Nosana container list (probe input format)."""
+        with self._lock:
+            return [dict(c) for c in self._containers.values()]
+
+    def consume_change(self):
+        """Return True once if the container set changed since the last call."""
+        with self._lock:
+            changed, self._changed = self._changed, False
+            return changed
+
+    # ------------------------------------------------------------------
+    # Stream handling
+    # ------------------------------------------------------------------
+
+    def _watch_loop(self):
+        while self._running:
+            try:
+                self._stream_events()
+            except Exception:
+                pass
+            self.synced = False
+            self._stopped.wait(EVENTS_RETRY)
+
+    def _stream_events(self):
+        filters = json.dumps({
+            "type": ["container"],
+            "event": ["start", "stop", "die"],
+        })
+        conn = _UnixHTTPConnection(self._sock_path)
+        try:
+            # Subscribe before seeding so no event between the two is lost;
+            # replayed start events for seeded containers are idempotent.
+            conn.request("GET", "/events?filters=" + urllib.parse.quote(filters))
+            sock = conn.sock  # getresponse() drops it for a close-delimited body
+            with self._lock:
+                self._stream = sock
+            if not self._running:
+                return  # stop() ran before the socket was published
+            resp = conn.getresponse()
+            if resp.status != 200:
+                return
+            sock.settimeout(None)
+            self._seed()
+
+            while self._running:
+                line = resp.readline()
+                if not line:
+                    return  # daemon closed the stream
+                line = line.strip()
+                if line:
+                    self._apply_event(json.loads(line.decode("utf-8")))
+        finally:
+            with self._lock:
+                self._stream = None
+            conn.close()
+
+    def _seed(self):
+        conn = _UnixHTTPConnection(self._sock_path)
+        try:
+            conn.request("GET", "/containers/json")
+            resp = conn.getresponse()
+            body = resp.read()
+            if resp.status != 200:
+                raise IOError("containers list returned %d" % resp.status)
+            listed = json.loads(body.decode("utf-8"))
+        finally:
+            conn.close()
+
+        current = {
+            c["Id"]: {"Id": c["Id"], "Names": c.get("Names", []),
+                      "Image": c.get("Image", "")}
+            for c in listed if _is_nosana_image(c.get("Image"))
+        }
+        with self._lock:
+            if set(current) != set(self._containers):
+                self._changed = True
+            self._containers = current
+        self.synced = True
+
+    def _apply_event(self, event):
+        action = event.get("Action") or event.get("status")
+        actor = event.get("Actor", {})
+        cid = actor.get("ID") or event.get("id")
+        attrs = actor.get("Attributes", {})
+        if not cid:
+            return
+
+        with self._lock:
+            if action == "start":
+                image = attrs.get("image") or event.get("from", "")
+                if not _is_nosana_image(image) or cid in self._containers:
+                    return
+                name = attrs.get("name", "")
+                self._containers[cid] = {
+                    "Id": cid,
+                    "Names": ["/" + name] if name else [],
+                    "Image": image,
+                }
+                self._changed = True
+            elif action in ("stop", "die"):
+                if self._containers.pop(cid, None) is not None:
+                    self._changed = True
 
 
 class NosanaProbe:
@@ -13,19 +180,22 @@ class NosanaProbe:
 
     Runs a Node.js probe script as a subprocess, caches results in a
     thread-safe dict.  Designed to be called from an eventlet background
-    task every 30 seconds.
+    task every 30 seconds, or sooner when the Docker events watcher
+    reports a container change.
     """
 
     def __init__(self):
         self._lock = threading.Lock()
-        self._state = {"nodes": [], "error": None, "last_probe": None}
+        self._state = {"nodes": [], "error": None, "last_probe": None,
+                       "partial": False}
 
         # Check prerequisites
         self._node_bin = shutil.which("node")
         self._probe_script = os.path.join(
             os.path.dirname(os.path.abspath(__file__)), "nosana", "nosana_probe.mjs"
         )
-        self._docker_sock = "/var/run/docker.sock"
+        self._docker_sock = DOCKER_SOCK
+        self._watcher = None
 
         self.enabled = True
         if not self._node_bin:
@@ -37,19 +207,51 @@ class NosanaProbe:
         elif not os.path.exists(self._docker_sock):
             self._state["error"] = "Docker socket not mounted"
             self.enabled = False
+        else:
+            self._watcher = DockerEventWatcher(self._docker_sock)
+
+    def start(self):
+        """Start the Docker events watcher (call once)."""
+        if self._watcher is not None:
+            self._watcher.start()
+
+    def consume_change(self):
+        """Return True once if Nosana containers started or stopped."""
+        return self._watcher is not None and self._watcher.consume_change()
 
     def collect(self):
         """Run the probe and update cached state.  Safe to call from any thread."""
         if not self.enabled:
             return
 
+        # The probe emits partial results at its own deadline, which must
+        # land before our subprocess timeout.
+        env = dict(os.environ)
+        env.setdefault("CORELINK_NOSANA_DEADLINE", str(PROBE_TIMEOUT - 5))
+
+        # With a live events stream the container set is already known:
+        # skip the probe entirely on idle hosts, otherwise hand it over.
+        if self._watcher is not None and self._watcher.synced:
+            containers = self._watcher.containers()
+            if not containers:
+                with self._lock:
+                    self._state = {
+                        "nodes": [],
+                        "error": None,
+                        "last_probe": time.strftime("%H:%M:%S"),
+                        "partial": False,
+                    }
+                return
+            env["CORELINK_NOSANA_CONTAINERS"] = json.dumps(containers)
+
         try:
             result = subprocess.run(
                 [self._node_bin, self._probe_script],
                 capture_output=True,
                 text=True,
-                timeout=45,
+                timeout=PROBE_TIMEOUT,
                 cwd=os.path.dirname(self._probe_script),
+                env=env,
             )
 
             stdout = result.stdout.strip()
@@ -59,6 +261,7 @@ class NosanaProbe:
                         "nodes": [],
                         "error": "Probe returned no output",
                         "last_probe": time.strftime("%H:%M:%S"),
+                        "partial": False,
                     }
                 return
 
@@ -68,6 +271,7 @@ class NosanaProbe:
                     "nodes": data.get("nodes", []),
                     "error": data.get("error"),
                     "last_probe": time.strftime("%H:%M:%S"),
+                    "partial": bool(data.get("partial")),
                 }
 
         except subprocess.TimeoutExpired:
@@ -7,20 +7,39 @@
  * Output: single JSON object to stdout.  Always exits 0.
  */
 
+import fs from "node:fs";
 import http from "node:http";
 import { createNosanaClient, NosanaNetwork, MarketQueueType } from "@nosana/kit";
 import { createKeyPairSignerFromBytes } from "@solana/kit";
 
-const DOCKER_SOCK = "/var/run/docker.sock";
+const DOCKER_SOCK = process.env.CORELINK_DOCKER_SOCK || "/var/run/docker.sock";
+const WALLET_CACHE = process.env.CORELINK_NOSANA_WALLET_CACHE || "/data/nosana_wallets.json";
+const MARKET_CACHE = process.env.CORELINK_NOSANA_MARKET_CACHE || "/data/nosana_markets.json";
+
+// Concurrency cap and deadlines (overridable via environment)
+const CONCURRENCY = envInt("CORELINK_NOSANA_CONCURRENCY", 4);
+const CONTAINER_TIMEOUT_MS = envInt("CORELINK_NOSANA_CONTAINER_TIMEOUT", 20) * 1000;
+const PROBE_DEADLINE_MS = envInt("CORELINK_NOSANA_DEADLINE", 40) * 1000;
+const MARKET_TTL_MS = envInt("CORELINK_NOSANA_MARKET_TTL", 60) * 1000;
+const MARKET_NAMES_TTL_MS = envInt("CORELINK_NOSANA_MARKET_NAMES_TTL", 3600) * 1000;
+
+function envInt(name, fallback) {
+    const val = parseInt(process.env[name] || "", 10);
+    return isNaN(val) || val <= 0 ? fallback : val;
+}
+
+function sleep(ms) {
+    return new Promise((resolve) => setTimeout(resolve, ms));
+}
 
 // ---------------------------------------------------------------------------
 // Docker socket helpers
 // ---------------------------------------------------------------------------
 
-function dockerGet(path) {
+function dockerGet(path, signal) {
     return new Promise((resolve, reject) => {
         const req = http.request(
-            { socketPath: DOCKER_SOCK, path, method: "GET" },
+            { socketPath: DOCKER_SOCK, path, method: "GET", signal },
             (res) => {
                 const chunks = [];
                 res.on("data", (c) => chunks.push(c));
@@ -36,7 +55,15 @@ function dockerGet(path) {
     });
 }
 
+/**
+ * Return Nosana containers.  When the Python wrapper already tracks them via
+ * the Docker events stream it passes the list in CORELINK_NOSANA_CONTAINERS
+ * and the /containers/json round trip is skipped.
+ */
 async function listNosanaContainers() {
+    if (process.env.CORELINK_NOSANA_CONTAINERS) {
+        return JSON.parse(process.env.CORELINK_NOSANA_CONTAINERS);
+    }
     const res = await dockerGet("/containers/json");
     if (res.status !== 200) return [];
     const containers = JSON.parse(res.body.toString());
@@ -53,9 +80,10 @@ async function listNosanaContainers() {
  * minimal tar parsing: 512-byte header, size at offset 124 (octal ASCII),
  * then file data starting at byte 512.
  */
-async function extractFileFromContainer(containerId, filePath) {
+async function extractFileFromContainer(containerId, filePath, signal) {
     const res = await dockerGet(
-        `/containers/${containerId}/archive?path=${encodeURIComponent(filePath)}`
+        `/containers/${containerId}/archive?path=${encodeURIComponent(filePath)}`,
+        signal
     );
     if (res.status !== 200) return null;
 
@@ -70,10 +98,19 @@ async function extractFileFromContainer(containerId, filePath) {
     return tar.subarray(512, 512 + size);
 }
 
-async function getWalletAddress(containerId) {
+/** Return the container's State.StartedAt, or null if it cannot be read. */
+async function getContainerStartedAt(containerId, signal) {
+    const res = await dockerGet(`/containers/${containerId}/json`, signal);
+    if (res.status !== 200) return null;
+    const info = JSON.parse(res.body.toString());
+    return (info.State && info.State.StartedAt) || null;
+}
+
+async function extractWalletAddress(containerId, signal) {
     const buf = await extractFileFromContainer(
         containerId,
-        "/root/.nosana/nosana_key.json"
+        "/root/.nosana/nosana_key.json",
+        signal
     );
     if (!buf) return null;
 
@@ -84,27 +121,179 @@ async function getWalletAddress(containerId) {
     return signer.address;
 }
 
+// ---------------------------------------------------------------------------
+// Wallet cache — {containerId: {started_at, wallet}} persisted under /data
+// ---------------------------------------------------------------------------
+
+function loadWalletCache() {
+    let entries = {};
+    try {
+        const data = JSON.parse(fs.readFileSync(WALLET_CACHE, "utf8"));
+        if (data && typeof data === "object") entries = data;
+    } catch (err) {
+        // Missing or corrupt — start empty
+    }
+    return { entries, dirty: false };
+}
+
+/** Persist the cache, keeping only entries for *liveIds*.  Best-effort. */
+function saveWalletCache(cache, liveIds) {
+    const pruned = {};
+    for (const id of liveIds) {
+        if (cache.entries[id]) pruned[id] = cache.entries[id];
+    }
+    try {
+        const tmp = WALLET_CACHE + ".tmp";
+        fs.writeFileSync(tmp, JSON.stringify(pruned));
+        fs.renameSync(tmp, WALLET_CACHE);
+    } catch (err) {
+        // Non-fatal — the cache is rebuilt on the next run
+    }
+}
+
+/**
+ * Return the wallet address for a container, using the cache when the
+ * container has not restarted since the wallet was extracted.  A restart
+ * changes StartedAt, which invalidates the entry.
+ */
+async function getWalletAddress(containerId, cache, signal) {
+    const startedAt = await getContainerStartedAt(containerId, signal);
+    const entry = cache.entries[containerId];
+    if (entry && startedAt && entry.started_at === startedAt && entry.wallet) {
+        return entry.wallet;
+    }
+
+    const wallet = await extractWalletAddress(containerId, signal);
+    if (wallet && startedAt) {
+        cache.entries[containerId] = { started_at: startedAt, wallet };
+        cache.dirty = true;
+    } else if (entry) {
+        delete cache.entries[containerId];
+        cache.dirty = true;
+    }
+    return wallet;
+}
+
 // ---------------------------------------------------------------------------
 // Node API health check
 // ---------------------------------------------------------------------------
 
 const NODE_DOMAIN = "node.k8s.prd.nos.ci";
 
-async function checkNodeApi(walletAddress) {
+async function checkNodeApi(walletAddress, signal) {
     try {
         const url = `https://${walletAddress}.${NODE_DOMAIN}/`;
-        const resp = await fetch(url, { signal: AbortSignal.timeout(5000) });
+        const timeout = AbortSignal.timeout(5000);
+        const resp = await fetch(url, {
+            signal: signal ? AbortSignal.any([signal, timeout]) : timeout,
+        });
         return resp.status === 200 ? "online" : "error";
     } catch (e) {
         return "unreachable";
     }
 }
 
+// ---------------------------------------------------------------------------
+// Market snapshot cache
+// ---------------------------------------------------------------------------
+
+/**
+ * Compact market snapshot persisted under /data and shared across probe
+ * runs.  The queue index inverts every node queue once per refresh so a
+ * wallet lookup is a single property access:
+ *
+ *   {
+ *     markets_at, names_at,
+ *     job_timeouts: {market: seconds},
+ *     queue_index:  {wallet: [market, position, length]},
+ *     names:        {market: "human-readable name"},
+ *   }
+ */
+function emptySnapshot() {
+    return { markets_at: 0, names_at: 0, job_timeouts: {}, queue_index: {}, names: {} };
+}
+
+function loadMarketSnapshot() {
+    try {
+        const data = JSON.parse(fs.readFileSync(MARKET_CACHE, "utf8"));
+        if (data && data.queue_index && data.job_timeouts && data.names) return data;
+    } catch (err) {
+        // Missing or corrupt — refresh from chain
+    }
+    return emptySnapshot();
+}
+
+function saveMarketSnapshot(snapshot) {
+    try {
+        const tmp = MARKET_CACHE + ".tmp";
+        fs.writeFileSync(tmp, JSON.stringify(snapshot));
+        fs.renameSync(tmp, MARKET_CACHE);
+    } catch (err) {
+        // Non-fatal — next run refreshes again
+    }
+}
+
+function indexMarkets(markets) {
+    const jobTimeouts = {};
+    const queueIndex = {};
+    for (const market of markets) {
+        const addr = String(market.address);
+        if (market.jobTimeout) jobTimeouts[addr] = Number(market.jobTimeout);
+        if (market.queueType !== MarketQueueType.NODE_QUEUE || !market.queue) continue;
+        const length = market.queue.length;
+        for (let i = 0; i < length; i++) {
+            const wallet = String(market.queue[i]);
+            if (!(wallet in queueIndex)) queueIndex[wallet] = [addr, i + 1, length];
+        }
+    }
+    return { jobTimeouts, queueIndex };
+}
+
+/**
+ * Return the market snapshot, refreshing on-chain markets and REST market
+ * names only when their TTL has expired.  A failed refresh keeps the
+ * previous (stale) data rather than dropping queue positions.
+ */
+async function getMarketSnapshot(client) {
+    const snapshot = loadMarketSnapshot();
+    const now = Date.now();
+    let dirty = false;
+
+    if (now - snapshot.markets_at >= MARKET_TTL_MS) {
+        try {
+            const { jobTimeouts, queueIndex } = indexMarkets(await client.jobs.markets());
+            snapshot.job_timeouts = jobTimeouts;
+            snapshot.queue_index = queueIndex;
+            snapshot.markets_at = now;
+            dirty = true;
+        } catch (err) {
+            // Non-fatal — queue position may be stale or unavailable
+        }
+    }
+
+    if (now - snapshot.names_at >= MARKET_NAMES_TTL_MS) {
+        try {
+            const names = {};
+            for (const m of await client.api.markets.list()) {
+                names[m.address] = m.name || m.slug || m.address;
+            }
+            snapshot.names = names;
+            snapshot.names_at = now;
+            dirty = true;
+        } catch (err) {
+            // Non-fatal — will fall back to truncated address
+        }
+    }
+
+    if (dirty) saveMarketSnapshot(snapshot);
+    return snapshot;
+}
+
 // ---------------------------------------------------------------------------
 // Blockchain queries
 // ---------------------------------------------------------------------------
 
-async function queryNodeStatus(client, walletAddress, allMarkets) {
+async function queryNodeStatus(client, walletAddress, snapshot) {
     const result = {
         wallet: walletAddress,
         status: "idle",
@@ -116,29 +305,16 @@ async function queryNodeStatus(client, walletAddress, allMarkets) {
         max_duration: null,
     };
 
-    // Build market lookup by address for jobTimeout
-    const marketByAddr = {};
-    for (const m of allMarkets) {
-        marketByAddr[m.address] = m;
-    }
-
-    // Check queue position across all markets (always, regardless of status)
-    try {
-        for (const market of allMarkets) {
-            if (market.queueType === MarketQueueType.NODE_QUEUE) {
-                const idx = market.queue.indexOf(walletAddress);
-                if (idx !== -1) {
-                    result.status = "queued";
-                    result.market = market.address || null;
-                    result.max_duration = market.jobTimeout || null;
-                    result.queue_position = idx + 1;
-                    result.queue_length = market.queue.length;
-                    break;
-                }
-            }
-        }
-    } catch (err) {
-        // Non-fatal — continue to check runs
+    // Queue position from the snapshot's inverted index (always checked,
+    // regardless of status)
+    const queued = snapshot.queue_index[walletAddress];
+    if (queued) {
+        const [market, position, length] = queued;
+        result.status = "queued";
+        result.market = market;
+        result.max_duration = snapshot.job_timeouts[market] || null;
+        result.queue_position = position;
+        result.queue_length = length;
     }
 
     // Check active runs
@@ -161,9 +337,8 @@ async function queryNodeStatus(client, walletAddress, allMarkets) {
                 const job = await client.jobs.get(runs[0].job);
                 if (job && job.market) {
                     result.market = job.market;
-                    const mkt = marketByAddr[job.market];
-                    if (mkt) {
-                        result.max_duration = mkt.jobTimeout || null;
+                    if (snapshot.job_timeouts[job.market]) {
+                        result.max_duration = snapshot.job_timeouts[job.market];
                     }
                 }
             } catch (e) {
@@ -180,6 +355,55 @@ async function queryNodeStatus(client, walletAddress, allMarkets) {
     return result;
 }
 
+// ---------------------------------------------------------------------------
+// Per-container probe
+// ---------------------------------------------------------------------------
+
+function newNodeEntry(container) {
+    const name = (container.Names && container.Names[0] || "").replace(/^\//, "");
+    return {
+        container: name || container.Id.substring(0, 12),
+        wallet: null,
+        status: "unknown",
+        market: null,
+        queue_position: null,
+        queue_length: null,
+        job: null,
+        error: null,
+    };
+}
+
+/**
+ * Fill *node* in place so that a container which misses its deadline still
+ * reports whatever was resolved before the cut-off (e.g. the wallet).
+ * Aborting *signal* cancels the Docker and node API requests; @nosana/kit
+ * RPC calls take no signal, so the probe stops before starting them.
+ */
+async function probeContainer(container, node, ctx, signal) {
+    try {
+        const wallet = await getWalletAddress(container.Id, ctx.walletCache, signal);
+        if (!wallet) {
+            node.error = "Could not extract wallet key";
+            return;
+        }
+        node.wallet = wallet;
+        if (signal.aborted) return;
+
+        // Blockchain status and node API check are independent
+        const [status, api] = await Promise.all([
+            queryNodeStatus(ctx.client, wallet, ctx.snapshot),
+            checkNodeApi(wallet, signal),
+        ]);
+        Object.assign(node, status);
+        if (node.market && ctx.snapshot.names[node.market]) {
+            node.market_name = ctx.snapshot.names[node.market];
+        }
+        node.node_api = api;
+    } catch (err) {
+        node.error = err.message;
+    }
+}
+
 // ---------------------------------------------------------------------------
 // Main
 // ---------------------------------------------------------------------------
@@ -211,65 +435,76 @@ async function main() {
         return;
     }
 
-    // Fetch markets once (shared across all nodes)
-    let markets = [];
-    try {
-        markets = await client.jobs.markets();
-    } catch (err) {
-        // Non-fatal — queue position will be unavailable
-    }
-
-    // Fetch market names from REST API (address → human-readable name)
-    let marketNames = {};
-    try {
-        const marketList = await client.api.markets.list();
-        for (const m of marketList) {
-            marketNames[m.address] = m.name || m.slug || m.address;
-        }
-    } catch (err) {
-        // Non-fatal — will fall back to truncated address
-    }
-
-    // Process each container independently
-    for (const container of containers) {
-        const name = (container.Names && container.Names[0] || "").replace(/^\//, "");
-        const node = {
-            container: name || container.Id.substring(0, 12),
-            wallet: null,
-            status: "unknown",
-            market: null,
-            queue_position: null,
-            queue_length: null,
-            job: null,
-            error: null,
-        };
-
-        try {
-            const wallet = await getWalletAddress(container.Id);
-            if (!wallet) {
-                node.error = "Could not extract wallet key";
-                output.nodes.push(node);
-                continue;
+    // Market snapshot shared across all nodes (and across probe runs)
+    const snapshot = await getMarketSnapshot(client);
+
+    // Probe containers concurrently (bounded).  Each container has its own
+    // deadline; the whole run has a global deadline so partial results are
+    // emitted before the Python wrapper's subprocess timeout fires.
+    const nodes = containers.map(newNodeEntry);
+    const walletCache = loadWalletCache();
+    const ctx = { client, snapshot, walletCache };
+    let next = 0;
+
+    async function worker() {
+        while (next < containers.length) {
+            const i = next++;
+            const controller = new AbortController();
+            const done = probeContainer(containers[i], nodes[i], ctx, controller.signal);
+            const timedOut = await Promise.race([
+                done.then(() => false),
+                sleep(CONTAINER_TIMEOUT_MS).then(() => true),
+            ]);
+            if (timedOut) {
+                // Snapshot so the abandoned probe cannot mutate the result
+                nodes[i] = Object.assign({}, nodes[i], {
+                    error: "Timed out after " + (CONTAINER_TIMEOUT_MS / 1000) + "s",
+                });
             }
-            node.wallet = wallet;
-
-            const status = await queryNodeStatus(client, wallet, markets);
-            Object.assign(node, status);
-            if (node.market && marketNames[node.market]) {
-                node.market_name = marketNames[node.market];
+            nodes[i]._done = true;
+            if (timedOut) {
+                // Cancel what can be cancelled and keep this worker's slot
+                // until the probe settles, so at most CONCURRENCY run at once
+                controller.abort();
+                await done;
             }
-            node.node_api = await checkNodeApi(wallet);
-        } catch (err) {
-            node.error = err.message;
         }
+    }
 
+    const workers = [];
+    for (let w = 0; w < Math.min(CONCURRENCY, containers.length); w++) {
+        workers.push(worker());
+    }
+    const finished = await Promise.race([
+        Promise.all(workers).then(() => true),
+        sleep(PROBE_DEADLINE_MS).then(() => false),
+    ]);
+
+    for (const node of nodes) {
+        if (!finished && !node._done && !node.error) {
+            node.error = "Probe deadline exceeded";
+        }
+        delete node._done;
         output.nodes.push(node);
     }
+    if (!finished) {
+        output.partial = true;
+    }
+
+    const liveIds = containers.map((c) => c.Id);
+    const stale = Object.keys(walletCache.entries).some((id) => !liveIds.includes(id));
+    if (walletCache.dirty || stale) {
+        saveWalletCache(walletCache, liveIds);
+    }
+
+    emit(output);
+}
 
-    process.stdout.write(JSON.stringify(output));
+/** Write the JSON result and exit once stdout has flushed. */
+function emit(output) {
+    process.stdout.write(JSON.stringify(output), () => process.exit(0));
 }
 
 main().catch((err) => {
-    process.stdout.write(JSON.stringify({ nodes: [], error: err.message }));
-    process.exit(0);
+    emit({ nodes: [], error: err.message });
 });
@@ -0,0 +1,266 @@
+"""CoreLink - Stage timers, event-loop lag and an on-demand sampling profiler.
+
+StageTimers keeps one fixed-bucket latency histogram per named stage
+("push.emit", "gossip.decode", ...): recording a duration is a bisect and
+a few integer updates, so the timers stay on permanently.  TimedLock is a
+drop-in Lock that only starts a clock when the fast non-blocking acquire
+fails, so uncontended locking costs one extra call and a counter bump.
+LoopLagMonitor is a green task that sleeps LAG_INTERVAL and records how
+late it wakes up, which is the time other greenlets held the eventlet hub.
+
+SamplingProfiler does nothing until asked: a run samples every thread's
+stack at a fixed rate for a few seconds from a real thread and returns
+the counts in the collapsed-stack format of flamegraph.pl / speedscope:
+
+  MainThread;server.py:_push_cluster_state;views.py:slice_state 42
+"""
+
+import bisect
+import os
+import sys
+import threading
+import time
+
+# Histogram bucket upper bounds in milliseconds (last bucket: +Inf)
+BUCKETS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500,
+              1000, 2500, 5000)
+_BOUNDS = tuple(b / 1000.0 for b in BUCKETS_MS)
+
+LAG_INTERVAL = 0.5        # seconds between event-loop lag probes
+PROFILE_MAX_SECS = 30.0
+PROFILE_MAX_HZ = 250
+PROFILE_DEFAULT_HZ = 97   # off a round number so periodic work is not aliased
+MAX_DEPTH = 64            # frames kept per sampled stack
+
+
+class _Histogram:
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def quantile(self, q):
+        """Upper bound (ms) of the bucket holding quantile *q*; None if empty."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return BUCKETS_MS[i] if i < len(BUCKETS_MS) else round(self.max * 1000, 3)
+        return round(self.max * 1000, 3)
+
+
+class _Timing:
+    """Context manager returned by StageTimers.timed()."""
+
+    __slots__ = ("_timers", "_stage", "_start")
+
+    def __init__(self, timers, stage):
+        self._timers = timers
+        self._stage = stage
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._timers.record(self._stage, time.perf_counter() - self._start)
+        return False
+
+
+class StageTimers:
+    """Per-stage duration histograms."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages = {}    # {stage: _Histogram}
+        self._locks = {}     # {stage: TimedLock}
+
+    def record(self, stage, seconds):
+        """Add one duration (seconds) for *stage*."""
+        i = bisect.bisect_left(_BOUNDS, seconds)
+        with self._lock:
+            h = self._stages.get(stage)
+            if h is None:
+                h = self._stages[stage] = _Histogram()
+            h.counts[i] += 1
+            h.count += 1
+            h.total += seconds
+            if seconds > h.max:
+                h.max = seconds
+
+    def timed(self, stage):
+        """``with timers.timed("stage"):`` records the block's duration."""
+        return _Timing(self, stage)
+
+    def add_lock(self, stage, lock):
+        """Report *lock*'s acquire counts in snapshot() under *stage*."""
+        with self._lock:
+            self._locks[stage] = lock
+
+    def snapshot(self):
+        """Return {"stages": {stage: summary}, "locks": {...}, "buckets_ms"}.
+
+        A stage summary has count, sum/mean/max and bucket-estimated p50/p90/
+        p99 in ms, plus the per-bucket counts (last bucket is +Inf).  Locks
+        report {"acquires", "contended"}; contended waits are in "stages".
+        """
+        with self._lock:
+            stages = {}
+            for stage, h in self._stages.items():
+                stages[stage] = {
+                    "count": h.count,
+                    "sum_ms": round(h.total * 1000, 3),
+                    "mean_ms": round(h.total * 1000 / h.count, 3) if h.count else None,
+                    "max_ms": round(h.max * 1000, 3),
+                    "p50_ms": h.quantile(0.50),
+                    "p90_ms": h.quantile(0.90),
+                    "p99_ms": h.quantile(0.99),
+                    "buckets": list(h.counts),
+                }
+            locks = {stage: {"acquires": lock.acquires, "contended": lock.contended}
+                     for stage, lock in self._locks.items()}
+        return {"stages": stages, "locks": locks, "buckets_ms": list(BUCKETS_MS)}
+
+
+class TimedLock:
+    """threading.Lock that records contended acquire waits as *stage*.
+
+    The uncontended path is a non-blocking acquire plus a counter bump;
+    only waits that actually block are timed.  The counters are updated
+    while holding the lock, so they need no lock of their own.
+    """
+
+    def __init__(self, timers, stage):
+        self._lock = threading.Lock()
+        self._timers = timers
+        self._stage = stage
+        self.acquires = 0
+        self.contended = 0
+        timers.add_lock(stage, self)
+
+    def acquire(self, blocking=True, timeout=-1):
+        if self._lock.acquire(False):
+            self.acquires += 1
+            return True
+        if not blocking:
+            return False
+        start = time.perf_counter()
+        acquired = self._lock.acquire(True, timeout)
+        self._timers.record(self._stage, time.perf_counter() - start)
+        if acquired:
+            self.acquires += 1
+            self.contended += 1
+        return acquired
+
+    def release(self):
+        self._lock.release()
+
+    def locked(self):
+        return self._lock.locked()
+
+    __enter__ = acquire
+
+    def __exit__(self, *exc):
+        self._lock.release()
+        return False
+
+
+class LoopLagMonitor:
+    """Measures event-loop lag: how late a LAG_INTERVAL sleep wakes up.
+
+    *sleep* is the loop's cooperative sleep (socketio.sleep); run() is the
+    body of a background task.
+    """
+
+    def __init__(self, timers, sleep, stage="loop.lag"):
+        self._timers = timers
+        self._sleep = sleep
+        self._stage = stage
+        self.last = None
+        self.worst = 0.0
+
+    def run(self):
+        while True:
+            start = time.perf_counter()
+            self._sleep(LAG_INTERVAL)
+            lag = max(time.perf_counter() - start - LAG_INTERVAL, 0.0)
+            self.last = lag
+            self.worst = max(self.worst, lag)
+            self._timers.record(self._stage, lag)
+
+    def snapshot(self):
+        return {
+            "interval_ms": LAG_INTERVAL * 1000,
+            "last_ms": round(self.last * 1000, 3) if self.last is not None else None,
+            "worst_ms": round(self.worst * 1000, 3),
+        }
+
+
+def _frame_label(code):
+    return "%s:%s" % (os.path.basename(code.co_filename), code.co_name)
+
+
+class SamplingProfiler:
+    """On-demand statistical profiler over all threads (one run at a time)."""
+
+    def __init__(self):
+        self._busy = threading.Lock()
+
+    def start(self, secs, hz=PROFILE_DEFAULT_HZ):
+        """Begin a run in a background thread; return its result holder.
+
+        The holder is a dict whose "done" Event is set when "stacks" is
+        filled in; returns None if another run is in progress.
+        """
+        if not self._busy.acquire(blocking=False):
+            return None
+        secs = min(max(float(secs), 0.1), PROFILE_MAX_SECS)
+        hz = min(max(int(hz), 1), PROFILE_MAX_HZ)
+        result = {"done": threading.Event(), "secs": secs, "hz": hz,
+                  "samples": 0, "stacks": {}}
+        threading.Thread(target=self._run, args=(result,),
+                         name="profiler", daemon=True).start()
+        return result
+
+    def _run(self, result):
+        try:
+            me = threading.get_ident()
+            period = 1.0 / result["hz"]
+            stacks = result["stacks"]
+            deadline = time.monotonic() + result["secs"]
+            next_at = time.monotonic()
+            while next_at < deadline:
+                names = {t.ident: t.name for t in threading.enumerate()}
+                for ident, frame in sys._current_frames().items():
+                    if ident == me:
+                        continue
+                    labels = []
+                    while frame is not None and len(labels) < MAX_DEPTH:
+                        labels.append(_frame_label(frame.f_code))
+                        frame = frame.f_back
+                    labels.append(names.get(ident, "thread-%d" % ident))
+                    key = ";".join(reversed(labels))
+                    stacks[key] = stacks.get(key, 0) + 1
+                result["samples"] += 1
+                next_at += period
+                delay = next_at - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    next_at = time.monotonic()  # overran: skip, do not burst
+        finally:
+            self._busy.release()
+            result["done"].set()
+
+    @staticmethod
+    def collapsed(result):
+        """Render a finished run as collapsed-stack text, hottest first."""
+        lines = ["%s %d" % (stack, n) for stack, n in
+                 sorted(result["stacks"].items(), key=lambda kv: -kv[1])]
+        return "\n".join(lines) + "\n"
@@ -1,22 +1,38 @@
 """CoreLink - Main Flask application."""
 
 import argparse
+import math
 import os
 import socket
 import time
 from datetime import timedelta
 
-from flask import Flask, render_template, redirect, url_for, request, send_file, abort
-from flask_socketio import SocketIO, emit
+from flask import (
+    Flask, render_template, redirect, url_for, request, send_file, abort, jsonify,
+    Response,
+)
+from flask_socketio import SocketIO, emit, join_room, leave_room
 from flask_login import (
     LoginManager, login_user, logout_user, login_required, current_user,
 )
 
-from auth import authenticate_pam, User, check_rate_limit, record_failure
+from auth import (
+    User, pool_from_env, limiter_from_env, user_exists, invalidate_user_cache,
+    AUTH_OK, AUTH_FAILED, AUTH_TIMEOUT,
+)
 from gossip import GossipNode
 from gpu import get_local_gpu_info
+from groups import GroupRollups, GroupRules
+from inventory import InventoryIndex
 from monitor import AppMonitor
+from nettest import NetTestMatrix, NetTestServer, DEFAULT_SECS, DEFAULT_MAX_MBPS
 from nosana import NosanaProbe
+from profiling import (
+    LoopLagMonitor, SamplingProfiler, StageTimers, PROFILE_DEFAULT_HZ,
+)
+from startup import StartupTracker, DONE
+from telemetry import HostTelemetry
+from views import DEFAULT_VIEW, normalize_view, view_room, slice_state
 
 VERSION = "0.01.9"
 
@@ -47,6 +63,10 @@ app.config["PERMANENT_SESSION_LIFETIME"] = timedelta(hours=8)
 # Flask-SocketIO (eventlet async mode for native WebSocket support)
 socketio = SocketIO(app, async_mode="eventlet")
 
+# PAM runs in a thread pool; waiting yields to the eventlet loop
+pam_pool = pool_from_env(wait=socketio.sleep)
+login_limiter = limiter_from_env()
+
 # Flask-Login
 login_manager = LoginManager()
 login_manager.init_app(app)
@@ -55,37 +75,83 @@ login_manager.login_view = "login"
 
 @login_manager.user_loader
 def load_user(user_id):
-    """Reload user from session.  Verify the user still exists in /etc/passwd."""
-    import pwd
-    try:
-        pwd.getpwnam(user_id)
+    """Reload user from session.  Verify the user still exists (cached NSS lookup)."""
+    if user_exists(user_id):
         return User(user_id)
-    except KeyError:
-        return None
+    return None
 
 
 # ---------------------------------------------------------------------------
-# Initialize GPU discovery and gossip protocol
+# Initialize gossip protocol (GPU / NIC / NTP discovery is deferred)
 # ---------------------------------------------------------------------------
 
+startup = StartupTracker(("gossip", "listener", "gpu", "nic", "ntp"))
+
 _hostname = os.environ.get("CORELINK_HOSTNAME", socket.gethostname())
-_gpu_info = get_local_gpu_info()
 _gossip_port = int(os.environ.get("CORELINK_GOSSIP_PORT", "47100"))
+_nettest_port = int(os.environ.get("CORELINK_NETTEST_PORT", _gossip_port + 2))
 
 monitor = AppMonitor()
-_metrics = monitor.get_metrics()
+
+# Per-stage timing histograms, event-loop lag and on-demand profiling
+stage_timers = StageTimers()
+loop_lag = LoopLagMonitor(stage_timers, socketio.sleep)
+profiler = SamplingProfiler()
 
 gossip = GossipNode(
     hostname=_hostname,
-    local_gpu_info=_gpu_info,
+    local_gpu_info=[],
     port=_gossip_port,
-    link_speed=_metrics.get("link_speed", 0),
-    link_speed_max=_metrics.get("link_speed_max", 0),
-    ntp_drift=_metrics.get("ntp_drift"),
+    snapshot_path=os.environ.get(
+        "CORELINK_GOSSIP_SNAPSHOT", "/data/gossip_snapshot.json"),
+    label=os.environ.get("CORELINK_GROUP"),
+    nettest_port=_nettest_port,
+    timers=stage_timers,
 )
 
 nosana_probe = NosanaProbe()
 
+# On-demand pairwise throughput/latency tests (/api/nettest)
+nettest_server = NetTestServer(
+    _nettest_port, gossip,
+    max_mbps=float(os.environ.get("CORELINK_NETTEST_MAX_MBPS", DEFAULT_MAX_MBPS)),
+)
+nettest = NetTestMatrix(gossip, nettest_server)
+
+# Host/GPU load sampled off the event loop, published via heartbeats
+telemetry = HostTelemetry(gossip.set_telemetry)
+
+# Placement indexes, maintained from gossip change notifications
+inventory = InventoryIndex()
+gossip.add_listener(inventory.update)
+
+# Per-group rollups for the fleet overview (Groups tab, /api/groups)
+rollups = GroupRollups(GroupRules.parse(os.environ.get("CORELINK_GROUPS")))
+gossip.add_listener(rollups.update)
+
+
+def _on_gpus(gpus):
+    gossip.set_local_info(gpus=gpus)
+    for gpu in gpus:
+        print("[Startup]   GPU%s: %s (%s)" % (gpu["id"], gpu["model"], gpu["limit"]))
+
+
+def _on_link(speeds):
+    gossip.set_local_info(link_speed=speeds[0], link_speed_max=speeds[1])
+
+
+def _start_discovery():
+    """Run GPU, NIC and NTP discovery in parallel threads off the event loop."""
+    startup.run_in_thread("gpu", get_local_gpu_info, _on_gpus)
+    startup.run_in_thread("nic", monitor.discover_link, _on_link)
+    startup.run_in_thread("ntp", monitor.refresh_ntp, gossip.set_ntp_drift)
+
+
+def _mark_listening():
+    # Background tasks first run once socketio.run() has bound the socket
+    # and the eventlet hub starts accepting connections.
+    startup.mark("listener", DONE)
+
 
 # ---------------------------------------------------------------------------
 # Routes
@@ -114,18 +180,30 @@ def login():
         remember = request.form.get("remember") == "on"
         client_ip = request.remote_addr or "unknown"
 
+        retry_after = login_limiter.check(client_ip, username)
+
         if not username or not password:
             error = "Username and password are required."
-        elif not check_rate_limit(client_ip):
-            error = "Too many failed attempts. Please wait 30 seconds."
-        elif authenticate_pam(username, password):
-            user = User(username)
-            login_user(user, remember=remember)
-            next_page = request.args.get("next")
-            return redirect(next_page or url_for("index"))
+        elif retry_after:
+            error = ("Too many failed attempts. Please wait %d seconds."
+                     % math.ceil(retry_after))
         else:
-            record_failure(client_ip)
-            error = "Invalid username or password."
+            result = pam_pool.authenticate(username, password)
+            if result == AUTH_OK:
+                login_limiter.record_success(client_ip, username)
+                # PAM just vouched for the account: drop any stale "no such user"
+                invalidate_user_cache(username)
+                user = User(username)
+                login_user(user, remember=remember)
+                next_page = request.args.get("next")
+                return redirect(next_page or url_for("index"))
+            elif result == AUTH_FAILED:
+                login_limiter.record_failure(client_ip, username)
+                error = "Invalid username or password."
+            elif result == AUTH_TIMEOUT:
+                error = "Authentication timed out. Please try again."
+            else:
+                error = "Login service busy. Please try again shortly."
 
     return render_template("login.html", version=VERSION, error=error)
 
@@ -137,6 +215,145 @@ def logout():
     return redirect(url_for("login"))
 
 
+@app.route("/api/metrics")
+@login_required
+def api_metrics():
+    """Internal service metrics (PAM pool, login rate limiter, startup,
+    stage timings, event-loop lag)."""
+    return jsonify({
+        "auth": pam_pool.stats(),
+        "rate_limit": login_limiter.stats(),
+        "startup": startup.snapshot(),
+        "timings": stage_timers.snapshot(),
+        "loop_lag": loop_lag.snapshot(),
+    })
+
+
+@app.route("/api/profile")
+@login_required
+def api_profile():
+    """Sample all threads for ?secs= (default 10) at ?hz=; return collapsed
+    stacks (text, flamegraph.pl / speedscope input)."""
+    try:
+        secs = float(request.args.get("secs", 10))
+        hz = int(request.args.get("hz", PROFILE_DEFAULT_HZ))
+    except (TypeError, ValueError):
+        abort(400)
+    run = profiler.start(secs, hz)
+    if run is None:
+        return jsonify({"error": "a profile is already running"}), 409
+    # Wait cooperatively so the event loop keeps serving (and is profiled)
+    while not run["done"].is_set():
+        socketio.sleep(0.1)
+    return Response(
+        profiler.collapsed(run), mimetype="text/plain",
+        headers={"X-Profile-Samples": str(run["samples"]),
+                 "X-Profile-Hz": str(run["hz"])},
+    )
+
+
+def _arg_int(name, default=0):
+    try:
+        return int(request.args.get(name, default))
+    except (TypeError, ValueError):
+        abort(400)
+
+
+@app.route("/api/placement")
+@login_required
+def api_placement():
+    """Ranked placement candidates from the cluster inventory index.
+
+    Query parameters: model, min_gpus, min_pcie_gen, min_pcie_width,
+    min_nic (Mbps), ntp (synced|drift|unknown), status (default online,
+    "any" for all), nosana (container status or "none"), idle (0/1),
+    limit.  With ``facets=1`` the distinct indexed values are returned.
+    """
+    if request.args.get("facets") == "1":
+        return jsonify(inventory.facets())
+    status = request.args.get("status", "online")
+    return jsonify(inventory.query(
+        model=request.args.get("model") or None,
+        min_gpus=_arg_int("min_gpus", 1),
+        min_pcie_gen=_arg_int("min_pcie_gen"),
+        min_pcie_width=_arg_int("min_pcie_width"),
+        min_nic=_arg_int("min_nic"),
+        ntp=request.args.get("ntp") or None,
+        status=None if status == "any" else status,
+        nosana=request.args.get("nosana") or None,
+        idle=request.args.get("idle", "1") != "0",
+        limit=_arg_int("limit", 20),
+    ))
+
+
+@app.route("/api/groups")
+@login_required
+def api_groups():
+    """Per-group rollups: node counts, GPUs by model, I/O, NTP, links."""
+    return jsonify({"groups": rollups.summaries()})
+
+
+@app.route("/api/groups/<name>")
+@login_required
+def api_group_detail(name):
+    """One group's rollup plus its member nodes (cluster_state entries)."""
+    detail = rollups.detail(name)
+    if detail is None:
+        abort(404)
+    detail["nodes"] = gossip.get_nodes(detail["nodes"])
+    return jsonify(detail)
+
+
+@app.route("/api/nettest", methods=["GET", "POST"])
+@login_required
+def api_nettest():
+    """Pairwise throughput/latency matrix.
+
+    GET returns the last (or running) matrix.  POST starts a run; the JSON
+    body may give "nodes" (hostname globs, default all online nodes) and
+    "secs" (transfer time per direction).  409 if a run is in progress or
+    the cooldown has not passed.
+    """
+    if request.method == "POST":
+        body = request.get_json(silent=True) or {}
+        patterns = body.get("nodes") or []
+        if not isinstance(patterns, list):
+            patterns = [patterns]
+        try:
+            secs = float(body.get("secs", DEFAULT_SECS))
+        except (TypeError, ValueError):
+            abort(400)
+        error = nettest.start([str(p) for p in patterns if p], secs)
+        if error:
+            return jsonify({"error": error}), 409
+        return jsonify(nettest.snapshot()), 202
+    return jsonify(nettest.snapshot())
+
+
+@app.route("/api/latency")
+@login_required
+def api_latency():
+    """Passive RTT/jitter matrix learned from gossip timestamp echoes."""
+    return jsonify({"matrix": gossip.latency_matrix()})
+
+
+@app.route("/api/clock")
+@login_required
+def api_clock():
+    """Peer clock offsets and per-node offsets from the cluster consensus."""
+    return jsonify(gossip.clock_state())
+
+
+@app.route("/healthz")
+def healthz():
+    """Unauthenticated liveness/readiness probe (phase states only)."""
+    snap = startup.snapshot()
+    return jsonify({
+        "ready": snap["ready"],
+        "phases": {name: p["state"] for name, p in snap["phases"].items()},
+    })
+
+
 @app.route("/ca.pem")
 def download_ca():
     """Serve the CA certificate for browser installation (unauthenticated)."""
@@ -155,17 +372,79 @@ def download_ca():
 # SocketIO events
 # ---------------------------------------------------------------------------
 
+# View subscriptions: clients with identical views share a room and the
+# push loop emits one pre-sliced payload per room.
+_rooms = {}        # {room: {"view": view, "members": set(sid), "last_push": t}}
+_client_room = {}  # {sid: room}
+
+
+def _join_view(view):
+    """Move the current client into the room for *view*."""
+    sid = request.sid
+    _leave_view(sid)
+    room = view_room(view)
+    info = _rooms.setdefault(
+        room, {"view": view, "members": set(), "last_push": 0.0},
+    )
+    info["members"].add(sid)
+    _client_room[sid] = room
+    join_room(room)
+    return info
+
+
+def _leave_view(sid):
+    room = _client_room.pop(sid, None)
+    if room is None:
+        return
+    leave_room(room, sid=sid)
+    info = _rooms.get(room)
+    if info is not None:
+        info["members"].discard(sid)
+        if not info["members"]:
+            del _rooms[room]
+
+
+def _view_nodes(view):
+    """Nodes a view needs: none (Groups tab), one group, or everything."""
+    if view["tab"] == "groups":
+        return []
+    if view["group"]:
+        return gossip.get_nodes(rollups.members(view["group"]))
+    return gossip.get_cluster_state()
+
+
+def _view_payload(view):
+    return slice_state(
+        view,
+        _view_nodes(view),
+        monitor.get_metrics(),
+        nosana_probe.get_state(),
+        rollups.summaries() if view["tab"] == "groups" else None,
+    )
+
+
 @socketio.on("connect")
 def handle_connect():
     """Reject unauthenticated WebSocket connections."""
     if not current_user.is_authenticated:
         return False
-    # Send initial cluster state to the connecting client
-    emit("cluster_state", {
-        "nodes": gossip.get_cluster_state(),
-        "monitor": monitor.get_metrics(),
-        "nosana": nosana_probe.get_state(),
-    })
+    # Full view until the client subscribes; send initial state right away
+    info = _join_view(dict(DEFAULT_VIEW))
+    emit("cluster_state", _view_payload(info["view"]))
+
+
+@socketio.on("disconnect")
+def handle_disconnect():
+    _leave_view(request.sid)
+
+
+@socketio.on("subscribe")
+def handle_subscribe(data):
+    """Switch this client to the view in *data* (tab, nodes, fields, max_rate)."""
+    if not current_user.is_authenticated:
+        return
+    info = _join_view(normalize_view(data))
+    emit("cluster_state", _view_payload(info["view"]))
 
 
 @socketio.on("request_update")
@@ -173,11 +452,9 @@ def handle_request_update():
     """Manual refresh requested by the client."""
     if not current_user.is_authenticated:
         return
-    emit("cluster_state", {
-        "nodes": gossip.get_cluster_state(),
-        "monitor": monitor.get_metrics(),
-        "nosana": nosana_probe.get_state(),
-    })
+    room = _client_room.get(request.sid)
+    view = _rooms[room]["view"] if room in _rooms else DEFAULT_VIEW
+    emit("cluster_state", _view_payload(view))
 
 
 # ---------------------------------------------------------------------------
@@ -185,30 +462,57 @@ def handle_request_update():
 # ---------------------------------------------------------------------------
 
 def _push_cluster_state():
-    """Emit cluster_state to every connected client every 3 seconds."""
+    """Emit each view room its slice of cluster_state, at most every 3 seconds."""
     while True:
         socketio.sleep(3)
-        monitor.collect()
+        cycle_start = time.perf_counter()
+        with stage_timers.timed("push.collect"):
+            monitor.collect()
         metrics = monitor.get_metrics()
         gossip.set_net_kbps(metrics["net_mbps"] * 1000)
         gossip.set_ntp_drift(metrics.get("ntp_drift"))
-        socketio.emit("cluster_state", {
-            "nodes": gossip.get_cluster_state(),
-            "monitor": metrics,
-            "nosana": nosana_probe.get_state(),
-        })
+        if not _rooms:
+            continue
+
+        nosana_state = nosana_probe.get_state()
+        nodes = {}      # {(tab is groups, group): node list}, built on demand
+        summaries = None
+        now = time.monotonic()
+        for room, info in list(_rooms.items()):
+            view = info["view"]
+            # Small slack so a 3s max_rate is not skipped by timer jitter
+            if now - info["last_push"] < view["max_rate"] - 0.5:
+                continue
+            info["last_push"] = now
+            key = (view["tab"] == "groups", view["group"])
+            if key not in nodes:
+                with stage_timers.timed("push.nodes"):
+                    nodes[key] = _view_nodes(view)
+            if view["tab"] == "groups" and summaries is None:
+                summaries = rollups.summaries()
+            with stage_timers.timed("push.slice"):
+                payload = slice_state(view, nodes[key], metrics, nosana_state, summaries)
+            payload["sent"] = time.time()  # push fan-out latency (loadtest.py)
+            with stage_timers.timed("push.emit"):
+                socketio.emit("cluster_state", payload, to=room)
+        stage_timers.record("push.total", time.perf_counter() - cycle_start)
         socketio.sleep(0)  # yield to let gossip threads run
 
 
 def _nosana_collect_loop():
-    """Run Nosana probe every 30 seconds in a background task."""
+    """Run Nosana probe every 30 seconds, or as soon as containers change."""
     socketio.sleep(10)  # initial delay — let other services start first
     while True:
         try:
-            nosana_probe.collect()
+            with stage_timers.timed("nosana.collect"):
+                nosana_probe.collect()
+            gossip.set_nosana(nosana_probe.get_state()["nodes"])
         except Exception as exc:
             print("[Nosana] probe error: %s" % exc)
-        socketio.sleep(30)
+        waited = 0
+        while waited < 30 and not nosana_probe.consume_change():
+            socketio.sleep(1)
+            waited += 1
 
 
 # ---------------------------------------------------------------------------
@@ -225,11 +529,10 @@ if __name__ == "__main__":
 
     print("CoreLink v%s" % VERSION)
     print("  Hostname : %s" % _hostname)
-    print("  GPUs     : %d" % len(_gpu_info))
-    for gpu in _gpu_info:
-        print("    GPU%s: %s" % (gpu["id"], gpu["model"]))
+    print("  GPUs     : discovering in background")
     print("  Port     : %d (HTTPS)" % args.port)
     print("  Gossip   : %d/udp" % _gossip_port)
+    print("  NetTest  : %d/tcp" % _nettest_port)
     if nosana_probe.enabled:
         print("  Nosana   : probe enabled (Docker socket)")
     ca_cert = "/data/ssl/ca.pem"
@@ -240,13 +543,25 @@ if __name__ == "__main__":
         print("  TLS      : Self-signed")
     print("")
 
-    # Start gossip protocol
+    # Start gossip protocol, then slow discovery in the background
+    t0 = time.monotonic()
     gossip.start()
+    startup.mark("gossip", DONE, time.monotonic() - t0)
+    _start_discovery()
+    telemetry.start()
+    try:
+        nettest_server.start()
+    except OSError as exc:
+        print("[NetTest] Test server disabled: %s" % exc)
+        gossip.nettest_port = 0
+    socketio.start_background_task(_mark_listening)
 
-    # Start background SocketIO pusher
+    # Start background SocketIO pusher and the event-loop lag probe
     socketio.start_background_task(_push_cluster_state)
+    socketio.start_background_task(loop_lag.run)
 
-    # Start Nosana probe loop
+    # Start Nosana container watcher and probe loop
+    nosana_probe.start()
     socketio.start_background_task(_nosana_collect_loop)
 
     # Run HTTPS server
@@ -0,0 +1,74 @@
+"""CoreLink - Startup readiness phases.
+
+The HTTPS listener and gossip come up first; slower discovery (GPUs via
+nvidia-smi, NIC max speed via ethtool, NTP drift) runs in background
+threads and fills in node state as each phase completes.  Every phase
+records its duration and when it finished relative to process start.
+"""
+
+import threading
+import time
+
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+
+
+class StartupTracker:
+    """Records the state and timing of named startup phases."""
+
+    def __init__(self, phases):
+        self._t0 = time.monotonic()
+        self._lock = threading.Lock()
+        self._order = list(phases)
+        self._phases = {
+            name: {"state": PENDING, "took": None, "at": None}
+            for name in self._order
+        }
+
+    def mark(self, name, state=DONE, took=None):
+        """Record *name* as finished (DONE or FAILED) now."""
+        at = round(time.monotonic() - self._t0, 3)
+        with self._lock:
+            self._phases[name] = {
+                "state": state,
+                "took": round(took, 3) if took is not None else None,
+                "at": at,
+            }
+        detail = " in %.2fs" % took if took is not None else ""
+        print("[Startup] %s %s%s (t+%.2fs)" % (name, state, detail, at))
+
+    def run(self, name, func):
+        """Run *func* as phase *name*; return its result, or None on error."""
+        start = time.monotonic()
+        try:
+            result = func()
+        except Exception as exc:
+            print("[Startup] %s error: %s" % (name, exc))
+            self.mark(name, FAILED, time.monotonic() - start)
+            return None
+        self.mark(name, DONE, time.monotonic() - start)
+        return result
+
+    def run_in_thread(self, name, func, on_done=None):
+        """Run phase *name* in a daemon thread, passing its result to *on_done*."""
+        def target():
+            result = self.run(name, func)
+            if on_done is not None and result is not None:
+                on_done(result)
+        threading.Thread(target=target, name="startup-" + name, daemon=True).start()
+
+    def ready(self):
+        """True once no phase is still pending."""
+        with self._lock:
+            return all(p["state"] != PENDING for p in self._phases.values())
+
+    def snapshot(self):
+        """Return {"ready", "uptime", "phases": {name: {state, took, at}}}."""
+        with self._lock:
+            phases = {name: dict(self._phases[name]) for name in self._order}
+        return {
+            "ready": all(p["state"] != PENDING for p in phases.values()),
+            "uptime": round(time.monotonic() - self._t0, 3),
+            "phases": phases,
+        }
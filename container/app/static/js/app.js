@@ -8,8 +8,11 @@
         new bootstrap.Tooltip(el);
     });
 
-    // ---- Socket.IO connection (prefer WebSocket) ----
-    var socket = io({transports: ["websocket", "polling"]});
+    // ---- State worker (owns the Socket.IO connection) ----
+    // Decoding, aggregation and row building run off the UI thread; this
+    // file only applies the render instructions the worker posts back.
+    var workerUrl = document.currentScript.src.replace(/app\.js(\?.*)?$/, "state_worker.js");
+    var worker = new Worker(workerUrl);
 
     var tbody          = document.getElementById("gpu-table-body");
     var nodeCount      = document.getElementById("node-count");
@@ -18,49 +21,124 @@
     var nosanaTbody    = document.getElementById("nosana-table-body");
     var nosanaCount    = document.getElementById("nosana-count");
     var nosanaProbeTime = document.getElementById("nosana-probe-time");
+    var groupsTbody    = document.getElementById("groups-table-body");
+    var groupsCount    = document.getElementById("groups-count");
+    var groupBadge     = document.getElementById("gpu-group");
 
     var badgeHostname = connBadge ? (connBadge.getAttribute("data-hostname") || "") : "";
 
+    var R = window.CoreLinkRender;
+    var nosanaTable = nosanaTbody ? new R.KeyedTable(nosanaTbody, 9) : null;
+    var groupsTable = groupsTbody ? new R.KeyedTable(groupsTbody, 7) : null;
+    var gpuTable = tbody ? new window.CoreLinkGpuTable.GpuTableView({
+        scrollEl: document.getElementById("gpu-table-scroll"),
+        tbody: tbody,
+        colCount: 8,
+        theadEl: document.getElementById("gpu-table-head"),
+        filterEl: document.getElementById("gpu-filters"),
+        countEl: document.getElementById("gpu-row-count"),
+        onQuery: function (filters, sort) {
+            worker.postMessage({type: "query", filters: filters, sort: sort});
+        },
+        onWindow: function (first, last) {
+            worker.postMessage({type: "window", first: first, last: last});
+        },
+    }) : null;
+
+    // ---- View subscription (server pushes only what is displayed) ----
+    // ?nodes=rack1-*,rack2-* limits the view to matching hostnames;
+    // ?rate=10 lowers the push rate (seconds) for slow links;
+    // ?group=rack1 shows one node group (Groups tab drill-down).
+    var params = new URLSearchParams(window.location.search);
+    var viewNodes = (params.get("nodes") || "").split(",").filter(Boolean);
+    var viewRate = parseFloat(params.get("rate")) || 3;
+    var viewGroup = params.get("group") || "";
+    var TAB_VIEWS = {"nosana-tab": "nosana", "groups-tab": "groups"};
+
+    function subscribe(tab) {
+        worker.postMessage({type: "view", tab: tab, nodes: viewNodes, group: viewGroup,
+                            max_rate: viewRate});
+    }
+
+    function activeView() {
+        var active = document.querySelector("#mainTabs .nav-link.active");
+        return (active && TAB_VIEWS[active.id]) || "test";
+    }
+
+    document.querySelectorAll('#mainTabs button[data-bs-toggle="tab"]').forEach(function (btn) {
+        btn.addEventListener("shown.bs.tab", function () {
+            subscribe(TAB_VIEWS[btn.id] || "test");
+        });
+    });
+    subscribe(activeView());
+
+    // ---- Group drill-down (GPU rows are only pushed for the chosen group) ----
+
+    function setGroup(group) {
+        viewGroup = group;
+        var url = new URL(window.location.href);
+        if (group) url.searchParams.set("group", group);
+        else url.searchParams.delete("group");
+        window.history.replaceState(null, "", url);
+        renderGroupBadge();
+    }
+
+    function renderGroupBadge() {
+        if (!groupBadge) return;
+        groupBadge.classList.toggle("d-none", !viewGroup);
+        document.getElementById("gpu-group-name").textContent = viewGroup;
+    }
+    renderGroupBadge();
+
+    if (groupsTbody) {
+        groupsTbody.addEventListener("click", function (ev) {
+            var link = ev.target.closest("a[data-group]");
+            if (!link) return;
+            ev.preventDefault();
+            setGroup(link.getAttribute("data-group"));
+            bootstrap.Tab.getOrCreateInstance(document.getElementById("test-tab")).show();
+        });
+    }
+    var groupClear = document.getElementById("gpu-group-clear");
+    if (groupClear) {
+        groupClear.addEventListener("click", function (ev) {
+            ev.preventDefault();
+            setGroup("");
+            subscribe(activeView());
+        });
+    }
+
+    worker.onmessage = function (ev) {
+        var msg = ev.data;
+        if (msg.type === "conn") onConnection(msg.connected);
+        else if (msg.type === "summary") onSummary(msg);
+        else if (msg.type === "gpu" && gpuTable) gpuTable.setData(msg);
+        else if (msg.type === "nosana" && nosanaTable) nosanaTable.render(msg.rows, msg.empty);
+        else if (msg.type === "groups") onGroups(msg);
+    };
+
     // ---- Connection status ----
 
-    socket.on("connect", function () {
-        if (connBadge) {
+    function onConnection(connected) {
+        if (!connBadge) return;
+        if (connected) {
             connBadge.textContent = badgeHostname + " connected";
             connBadge.className = "badge bg-success-subtle";
-        }
-    });
-
-    socket.on("disconnect", function () {
-        if (connBadge) {
+        } else {
             connBadge.textContent = badgeHostname + " disconnected";
             connBadge.className = "badge bg-danger-subtle";
         }
-    });
-
-    // ---- Cluster state updates ----
+    }
 
-    socket.on("cluster_state", function (data) {
-        var nodes = data.nodes || [];
-        var mon   = data.monitor || {};
+    // ---- Status lines ----
 
-        if (!tbody) return;
+    function onSummary(msg) {
+        var mon = msg.monitor || {};
 
-        // Count online nodes and sum LAN traffic
-        var onlineNodes = 0;
-        var totalKbps = 0;
-        for (var i = 0; i < nodes.length; i++) {
-            if (nodes[i].status === "online") {
-                onlineNodes++;
-                totalKbps += (nodes[i].net_kbps || 0);
-            }
-        }
         if (nodeCount) {
-            var pcLabel = onlineNodes === 1 ? "PC" : "PCs";
-            var nosana = data.nosana || {};
-            var nosanaNodes = (nosana.nodes || []);
-            var hosts = nosanaNodes.length;
-            var hostLabel = hosts === 1 ? "Host" : "Hosts";
-            nodeCount.textContent = onlineNodes + " " + pcLabel + ", " + hosts + " " + hostLabel;
+            var pcLabel = msg.online === 1 ? "PC" : "PCs";
+            var hostLabel = msg.hosts === 1 ? "Host" : "Hosts";
+            nodeCount.textContent = msg.online + " " + pcLabel + ", " + msg.hosts + " " + hostLabel;
         }
 
         // Update CoreLink Resources line
@@ -68,188 +146,29 @@
             var cpu  = mon.cpu  != null ? Number(mon.cpu).toFixed(2)  : "\u2014";
             var ram  = mon.ram  != null ? Number(mon.ram).toFixed(2)  : "\u2014";
             var disk = mon.disk != null ? Number(mon.disk).toFixed(2) : "\u2014";
-            var lanMbps = (totalKbps / 1000).toFixed(3);
+            var lanMbps = (msg.total_kbps / 1000).toFixed(3);
             appMonitor.textContent = "CoreLink Resources \u2014 CPU: " + cpu
                 + "%\u2002 RAM: " + ram + "%\u2002 Disk: " + disk
                 + "%\u2002 LAN Saturation: " + lanMbps + " Mbps";
         }
 
-        // Rebuild table rows
-        var html = "";
-        for (var n = 0; n < nodes.length; n++) {
-            var node = nodes[n];
-            var gpus = node.gpus || [];
-            var rowClass = node.status === "stale" ? "node-stale" : "node-online";
-
-            var netDisplay = (node.net_kbps != null) ? Number(node.net_kbps).toFixed(2) + " Kbps" : "0.00 Kbps";
-            var nicLabel = fmtNicSpeed(node.link_speed);
-            var nicColor = nicSpeedClass(node.link_speed, node.link_speed_max);
-            var nicHtml = "<span style=\"" + nicColor + "\">" + nicLabel + "</span>";
-            var tsIndicator = timeSyncIndicator(node.ntp_drift);
-
-            if (gpus.length === 0) {
-                // Node with no GPUs (shouldn't happen but handle gracefully)
-                html += "<tr class=\"" + rowClass + "\">"
-                      + "<td>" + esc(node.node_id) + "</td>"
-                      + "<td>\u2014</td>"
-                      + "<td>\u2014</td>"
-                      + "<td>" + nicHtml + "</td>"
-                      + "<td>\u2014</td>"
-                      + "<td>" + esc(node.timestamp) + tsIndicator + "</td>"
-                      + "<td>" + netDisplay + "</td>"
-                      + "</tr>";
-            } else {
-                for (var g = 0; g < gpus.length; g++) {
-                    html += "<tr class=\"" + rowClass + "\">"
-                          + "<td>" + esc(node.node_id) + "</td>"
-                          + "<td>" + gpus[g].id + "</td>"
-                          + "<td>" + esc(gpus[g].limit || "0.0 x 0") + "</td>"
-                          + "<td>" + (g === 0 ? nicHtml : "---") + "</td>"
-                          + "<td>" + esc(gpus[g].model) + "</td>"
-                          + "<td>" + esc(node.timestamp) + tsIndicator + "</td>"
-                          + "<td>" + (g === 0 ? netDisplay : "---") + "</td>"
-                          + "</tr>";
-                }
-            }
-        }
-
-        if (html === "") {
-            html = "<tr><td colspan=\"7\" class=\"text-center text-muted\">"
-                 + "No nodes detected yet...</td></tr>";
-        }
-
-        tbody.innerHTML = html;
-
-        // ---- Nosana tab rendering ----
-        var nosanaState = data.nosana || {};
-        var nNodes = nosanaState.nodes || [];
-
         if (nosanaCount) {
-            nosanaCount.textContent = nNodes.length + " discovered";
+            nosanaCount.textContent = msg.hosts + " discovered";
         }
         if (nosanaProbeTime) {
-            nosanaProbeTime.textContent = nosanaState.last_probe || "\u2014";
+            nosanaProbeTime.textContent = (msg.last_probe || "\u2014")
+                + (msg.partial ? " (partial)" : "");
         }
-
-        if (nosanaTbody) {
-            var nHtml = "";
-            for (var ni = 0; ni < nNodes.length; ni++) {
-                var nn = nNodes[ni];
-                var walletDisplay = "\u2014";
-                var walletTitle = "";
-                if (nn.wallet) {
-                    walletDisplay = nn.wallet.substring(0, 4) + "..." + nn.wallet.substring(nn.wallet.length - 4);
-                    walletTitle = nn.wallet;
-                }
-
-                var statusStyle = "";
-                var statusText = esc(nn.status || "unknown");
-                if (nn.status === "running") statusStyle = "color: var(--cl-success)";
-                else if (nn.status === "queued") statusStyle = "color: var(--cl-warning)";
-                else if (nn.status === "error") statusStyle = "color: var(--cl-danger)";
-                else statusStyle = "opacity: 0.5";
-
-                var marketDisplay = "\u2014";
-                if (nn.market_name) {
-                    marketDisplay = esc(nn.market_name);
-                } else if (nn.market) {
-                    marketDisplay = nn.market.substring(0, 4) + "..." + nn.market.substring(nn.market.length - 4);
-                }
-
-                var queueDisplay = "\u2014";
-                if (nn.queue_position != null && nn.queue_length != null) {
-                    queueDisplay = nn.queue_position + " / " + nn.queue_length;
-                }
-
-                var jobDisplay = "\u2014";
-                if (nn.job) {
-                    jobDisplay = nn.job.substring(0, 4) + "..." + nn.job.substring(nn.job.length - 4);
-                }
-
-                var durationDisplay = "\u2014";
-                if (nn.duration != null && nn.max_duration != null) {
-                    durationDisplay = fmtDuration(nn.duration) + " / " + fmtDuration(nn.max_duration);
-                } else if (nn.max_duration != null) {
-                    durationDisplay = "\u2014 / " + fmtDuration(nn.max_duration);
-                }
-
-                var apiStyle = "";
-                var apiText = esc(nn.node_api || "\u2014");
-                if (nn.node_api === "online") apiStyle = "color: var(--cl-success)";
-                else if (nn.node_api === "unreachable") apiStyle = "color: var(--cl-danger)";
-                else if (nn.node_api === "error") apiStyle = "color: var(--cl-warning)";
-
-                nHtml += "<tr>"
-                    + "<td>" + esc(nn.container || "\u2014") + "</td>"
-                    + "<td title=\"" + esc(walletTitle) + "\">" + walletDisplay + "</td>"
-                    + "<td><span style=\"" + statusStyle + "\">" + statusText + "</span></td>"
-                    + "<td>" + marketDisplay + "</td>"
-                    + "<td>" + queueDisplay + "</td>"
-                    + "<td>" + jobDisplay + "</td>"
-                    + "<td>" + durationDisplay + "</td>"
-                    + "<td><span style=\"" + apiStyle + "\">" + apiText + "</span></td>"
-                    + "</tr>";
-            }
-
-            if (nHtml === "") {
-                if (nosanaState.error) {
-                    nHtml = "<tr><td colspan=\"8\" class=\"text-center text-muted\">"
-                          + esc(nosanaState.error) + "</td></tr>";
-                } else if (nosanaState.last_probe) {
-                    nHtml = "<tr><td colspan=\"8\" class=\"text-center text-muted\">"
-                          + "No Nosana containers found</td></tr>";
-                } else {
-                    nHtml = "<tr><td colspan=\"8\" class=\"text-center text-muted\">"
-                          + "Waiting for probe...</td></tr>";
-                }
-            }
-
-            nosanaTbody.innerHTML = nHtml;
-        }
-    });
-
-    // ---- Helpers ----
-
-    function esc(str) {
-        if (str == null) return "";
-        var d = document.createElement("div");
-        d.appendChild(document.createTextNode(String(str)));
-        return d.innerHTML;
     }
 
-    function fmtNicSpeed(mbps) {
-        if (!mbps || mbps === 0) return "?";
-        if (mbps < 1000) return mbps + "M";
-        return (mbps / 1000).toFixed(1).replace(/\.0$/, "") + "G";
-    }
-
-    function nicSpeedClass(speed, maxSpeed) {
-        if (!speed || speed <= 0) return "";
-        if (speed <= 1000) return "color: var(--cl-danger)";
-        if (maxSpeed && speed < maxSpeed) return "color: var(--cl-warning)";
-        return "color: var(--cl-success)";
-    }
-
-    function fmtDuration(seconds) {
-        if (seconds == null || seconds < 0) return "\u2014";
-        var h = Math.floor(seconds / 3600);
-        var m = Math.floor((seconds % 3600) / 60);
-        if (h > 0) return h + "h " + m + "m";
-        if (m > 0) return m + "m";
-        return seconds + "s";
-    }
-
-    function timeSyncIndicator(ntp_drift) {
-        if (ntp_drift == null) return "";
-        if (Math.abs(ntp_drift) <= 5) {
-            return " <span style=\"color:var(--cl-success)\">\u2713</span>";
-        }
-        return " <span style=\"color:var(--cl-danger)\">\u2717</span>";
+    function onGroups(msg) {
+        if (groupsTable) groupsTable.render(msg.rows, "No nodes discovered yet");
+        if (groupsCount) groupsCount.textContent = msg.count + (msg.count === 1 ? " group" : " groups");
     }
 
     // ---- Framework for future command buttons ----
-    // Command buttons can be wired via a Socket.IO event:
-    //   socket.on("available_commands", function (cmds) { ... });
-    //   socket.emit("execute_command", {command: cmdId});
+    // Command buttons can be wired via the state worker:
+    //   worker posts {type: "available_commands", ...} from a Socket.IO event;
+    //   app.js posts {type: "execute_command", command: cmdId} back.
 
 })();
@@ -0,0 +1,147 @@
+/* CoreLink - Client-side table rendering benchmark
+ *
+ * Compares the legacy full-rebuild path (HTML string + tbody.innerHTML,
+ * DOM-based escaping) against the keyed incremental renderer on a
+ * synthetic cluster.  Open /static/bench.html in a browser.
+ */
+
+(function () {
+    "use strict";
+
+    var R = window.CoreLinkRender;
+    var MODELS = ["RTX A6000", "RTX 4090", "A100-SXM4-80GB", "RTX 3090", "L40S"];
+
+    function syntheticCluster(nodeCount, gpusPerNode) {
+        var nodes = [];
+        for (var n = 0; n < nodeCount; n++) {
+            var gpus = [];
+            var loads = [];
+            for (var g = 0; g < gpusPerNode; g++) {
+                gpus.push({id: g, model: MODELS[(n + g) % MODELS.length], limit: "4.0 x 16"});
+                loads.push({util: 0, mem: 40, temp: 55});
+            }
+            nodes.push({
+                node_id: "gpu-node-" + ("000" + n).slice(-4),
+                gpus: gpus,
+                timestamp: "",
+                status: n % 37 === 0 ? "stale" : "online",
+                net_kbps: 0,
+                link_speed: n % 5 === 0 ? 1000 : 10000,
+                link_speed_max: 10000,
+                ntp_drift: 0.02,
+                telemetry: {cpu: 12, ram: 30, disk: 45, gpus: loads},
+            });
+        }
+        return nodes;
+    }
+
+    /** Simulate one 3 s push: every node's timestamp and a few rates/loads change. */
+    function tick(nodes, iter) {
+        var ts = "19OCT26 09:00:" + ("0" + (iter % 60)).slice(-2) + "utc";
+        for (var n = 0; n < nodes.length; n++) {
+            nodes[n].timestamp = ts;
+            if ((n + iter) % 10 === 0) {
+                nodes[n].net_kbps = Math.random() * 20;
+                var loads = nodes[n].telemetry.gpus;
+                for (var g = 0; g < loads.length; g++) loads[g].util = Math.floor(Math.random() * 100);
+            }
+        }
+    }
+
+    // ---- Legacy path (pre-keyed full rebuild, same 8 columns as the console) ----
+
+    function legacyEsc(str) {
+        if (str == null) return "";
+        var d = document.createElement("div");
+        d.appendChild(document.createTextNode(String(str)));
+        return d.innerHTML;
+    }
+
+    function legacyRender(tbody, nodes) {
+        var html = "";
+        for (var n = 0; n < nodes.length; n++) {
+            var node = nodes[n];
+            var gpus = node.gpus || [];
+            var rowClass = node.status === "stale" ? "node-stale" : "node-online";
+            var netDisplay = (node.net_kbps != null) ? Number(node.net_kbps).toFixed(2) + " Kbps" : "0.00 Kbps";
+            var nicHtml = "<span style=\"" + R.nicSpeedClass(node.link_speed, node.link_speed_max) + "\">"
+                        + R.fmtNicSpeed(node.link_speed) + "</span>";
+            var tsIndicator = R.timeSyncIndicator(node.ntp_drift);
+            for (var g = 0; g < gpus.length; g++) {
+                html += "<tr class=\"" + rowClass + "\">"
+                      + "<td>" + legacyEsc(node.node_id) + "</td>"
+                      + "<td>" + gpus[g].id + "</td>"
+                      + "<td>" + legacyEsc(gpus[g].limit || "0.0 x 0") + "</td>"
+                      + "<td>" + (g === 0 ? nicHtml : "---") + "</td>"
+                      + "<td>" + legacyEsc(gpus[g].model) + "</td>"
+                      + "<td>" + R.gpuLoad(node, g) + "</td>"
+                      + "<td>" + legacyEsc(node.timestamp) + tsIndicator + "</td>"
+                      + "<td>" + (g === 0 ? netDisplay : "---") + "</td>"
+                      + "</tr>";
+            }
+        }
+        tbody.innerHTML = html;
+    }
+
+    // ---- Runner ----
+
+    function measure(label, iterations, nodes, renderFn) {
+        var times = [];
+        for (var i = 0; i < iterations; i++) {
+            tick(nodes, i);
+            var t0 = performance.now();
+            renderFn(nodes);
+            void document.body.offsetHeight;  // force style + layout
+            times.push(performance.now() - t0);
+        }
+        times.sort(function (a, b) { return a - b; });
+        var sum = times.reduce(function (a, b) { return a + b; }, 0);
+        return {
+            path: label,
+            iterations: iterations,
+            mean_ms: +(sum / iterations).toFixed(2),
+            p50_ms: +times[Math.floor(iterations * 0.5)].toFixed(2),
+            p95_ms: +times[Math.min(iterations - 1, Math.floor(iterations * 0.95))].toFixed(2),
+            max_ms: +times[iterations - 1].toFixed(2),
+        };
+    }
+
+    function run(nodeCount, gpusPerNode, iterations) {
+        var nodes = syntheticCluster(nodeCount, gpusPerNode);
+        var legacyBody = document.getElementById("bench-legacy");
+        var keyedBody = document.getElementById("bench-keyed");
+        var table = new R.KeyedTable(keyedBody, 8);
+
+        var results = {
+            nodes: nodeCount,
+            gpus_per_node: gpusPerNode,
+            rows: nodeCount * gpusPerNode,
+            results: [
+                measure("legacy-innerHTML", iterations, nodes, function (ns) {
+                    legacyRender(legacyBody, ns);
+                }),
+                measure("keyed-incremental", iterations, nodes, function (ns) {
+                    table.render(R.clusterRows(ns), "");
+                }),
+            ],
+        };
+        legacyBody.textContent = "";
+        return results;
+    }
+
+    window.CoreLinkBench = {run: run, syntheticCluster: syntheticCluster};
+
+    document.getElementById("bench-run").addEventListener("click", function () {
+        var out = document.getElementById("bench-output");
+        out.textContent = "Running...";
+        setTimeout(function () {
+            var res = run(
+                parseInt(document.getElementById("bench-nodes").value, 10) || 300,
+                parseInt(document.getElementById("bench-gpus").value, 10) || 8,
+                parseInt(document.getElementById("bench-iters").value, 10) || 20
+            );
+            out.textContent = JSON.stringify(res, null, 2);
+        }, 0);
+    });
+
+})();
@@ -0,0 +1,442 @@
+/* CoreLink - Virtualized, sortable, filterable GPU table */
+
+(function (global) {
+    "use strict";
+
+    var R = global.CoreLinkRender;
+
+    // Filterable record fields (also the URL query parameter names)
+    var FILTER_FIELDS = ["model", "limit", "nic", "status", "ntp"];
+
+    // Sort keys per column; each returns a number or string for a record
+    var SORT_KEYS = {
+        pc:    function (r) { return r.node.node_id; },
+        gpu:   function (r) { return r.gpu ? Number(r.gpu.id) : -1; },
+        limit: function (r) { return limitRank(r.limit); },
+        nic:   function (r) { return r.node.link_speed || 0; },
+        model: function (r) { return r.model; },
+        load:  function (r) { return gpuUtil(r); },
+        ntp:   function (r) { var d = R.syncOffset(r.node); return d == null ? Infinity : Math.abs(d); },
+        io:    function (r) { return r.node.net_kbps || 0; },
+    };
+
+    /** GPU utilization from node telemetry, -1 when unknown. */
+    function gpuUtil(r) {
+        var t = r.node.telemetry;
+        var load = r.gpu && t && t.gpus ? t.gpus[r.pos] : null;
+        return load && load.util != null ? load.util : -1;
+    }
+
+    /** "4.0 x 16" -> 416, so bottlenecks sort by generation, then width. */
+    function limitRank(limit) {
+        var m = /^(\d+)\.\d+ x (\d+)$/.exec(limit || "");
+        return m ? Number(m[1]) * 100 + Number(m[2]) : 0;
+    }
+
+    // ---- Indexed in-memory model ----
+
+    /**
+     * Records plus one inverted index per filter field
+     * ({field: {value: [recordIndex, ...]}}), built once per update.
+     */
+    function GpuIndex(records) {
+        this.records = records;
+        this.index = {};
+        for (var f = 0; f < FILTER_FIELDS.length; f++) {
+            this.index[FILTER_FIELDS[f]] = Object.create(null);
+        }
+        for (var i = 0; i < records.length; i++) {
+            for (var k = 0; k < FILTER_FIELDS.length; k++) {
+                var field = FILTER_FIELDS[k];
+                var bucket = this.index[field];
+                var value = records[i][field];
+                (bucket[value] || (bucket[value] = [])).push(i);
+            }
+        }
+    }
+
+    /** Sorted distinct values for *field*. */
+    GpuIndex.prototype.values = function (field) {
+        return Object.keys(this.index[field]).sort();
+    };
+
+    /**
+     * Return record indices matching *filters* ({field: value}), ordered by
+     * *sort* ({key, dir}).  Starts from the smallest matching index bucket
+     * and checks the remaining filters per candidate.
+     */
+    GpuIndex.prototype.query = function (filters, sort) {
+        var active = [];
+        var base = null;
+        for (var f = 0; f < FILTER_FIELDS.length; f++) {
+            var field = FILTER_FIELDS[f];
+            if (!filters[field]) continue;
+            var bucket = this.index[field][filters[field]] || [];
+            active.push(field);
+            if (base === null || bucket.length < base.length) base = bucket;
+        }
+
+        var result;
+        if (base === null) {
+            result = new Array(this.records.length);
+            for (var i = 0; i < result.length; i++) result[i] = i;
+        } else {
+            result = [];
+            for (var b = 0; b < base.length; b++) {
+                var rec = this.records[base[b]];
+                var ok = true;
+                for (var a = 0; a < active.length && ok; a++) {
+                    ok = rec[active[a]] === filters[active[a]];
+                }
+                if (ok) result.push(base[b]);
+            }
+        }
+
+        var keyFn = sort && SORT_KEYS[sort.key];
+        if (keyFn) {
+            var keys = new Array(this.records.length);
+            for (var r = 0; r < result.length; r++) keys[result[r]] = keyFn(this.records[result[r]]);
+            var dir = sort.dir === "desc" ? -1 : 1;
+            // Stable: ties keep server order (self first, then by hostname)
+            result.sort(function (x, y) {
+                var kx = keys[x], ky = keys[y];
+                if (kx < ky) return -dir;
+                if (kx > ky) return dir;
+                return x - y;
+            });
+        }
+        return result;
+    };
+
+    // ---- Windowed rendering ----
+
+    /**
+     * Renders only the rows inside the scroll viewport (plus overscan) into
+     * a KeyedTable, with spacer rows standing in for the rest.
+     */
+    function VirtualTable(scrollEl, tbody, colCount) {
+        this.scrollEl = scrollEl;
+        this.tbody = tbody;
+        this.table = new R.KeyedTable(tbody, colCount);
+        this.rowHeight = 0;
+        this.overscan = 10;
+        this.count = 0;
+        this.rowAt = null;
+        this.emptyHtml = "";
+        this.onWindow = null;  // onWindow(first, last) when the drawn range moves
+        this._first = -1;
+        this._last = -1;
+        this._pending = false;
+
+        var self = this;
+        scrollEl.addEventListener("scroll", function () {
+            if (self._pending) return;
+            self._pending = true;
+            global.requestAnimationFrame(function () {
+                self._pending = false;
+                self.draw();
+            });
+        }, {passive: true});
+    }
+
+    /** Set the row source: *count* rows, *rowAt(i)* builds row i on demand. */
+    VirtualTable.prototype.setRows = function (count, rowAt, emptyHtml) {
+        this.count = count;
+        this.rowAt = rowAt;
+        this.emptyHtml = emptyHtml;
+        this.draw();
+    };
+
+    VirtualTable.prototype.draw = function () {
+        var n = this.count;
+        var rh = this.rowHeight || 25;
+        // Position of the tbody inside the scroll viewport (negative once scrolled)
+        var offset = this.tbody.getBoundingClientRect().top - this.scrollEl.getBoundingClientRect().top;
+        var top = Math.max(0, -offset);
+        var view = this.scrollEl.clientHeight || 600;
+
+        var first = Math.max(0, Math.floor(top / rh) - this.overscan);
+        var last = Math.min(n, Math.ceil((top + view) / rh) + this.overscan);
+        if (first > last) first = last;
+        if (this.onWindow && (first !== this._first || last !== this._last)) {
+            this._first = first;
+            this._last = last;
+            this.onWindow(first, last);
+        }
+
+        var rows = [];
+        for (var i = first; i < last; i++) rows.push(this.rowAt(i));
+        this.table.setPadding(first * rh, (n - last) * rh);
+        this.table.render(rows, this.emptyHtml);
+
+        if (!this.rowHeight && rows.length > 0) {
+            var tr = this.tbody.querySelector("tr:not(.cl-spacer)");
+            if (tr && tr.offsetHeight > 0) {
+                this.rowHeight = tr.offsetHeight;
+                this.draw();
+            }
+        }
+    };
+
+    // ---- URL state ----
+
+    function readUrlState() {
+        var params = new URLSearchParams(global.location.search);
+        var filters = {};
+        for (var f = 0; f < FILTER_FIELDS.length; f++) {
+            var v = params.get(FILTER_FIELDS[f]);
+            if (v) filters[FILTER_FIELDS[f]] = v;
+        }
+        var sortKey = params.get("sort");
+        return {
+            filters: filters,
+            sort: SORT_KEYS.hasOwnProperty(sortKey) ? {key: sortKey, dir: params.get("dir") === "desc" ? "desc" : "asc"} : null,
+        };
+    }
+
+    function writeUrlState(filters, sort) {
+        var params = new URLSearchParams(global.location.search);
+        for (var f = 0; f < FILTER_FIELDS.length; f++) {
+            if (filters[FILTER_FIELDS[f]]) params.set(FILTER_FIELDS[f], filters[FILTER_FIELDS[f]]);
+            else params.delete(FILTER_FIELDS[f]);
+        }
+        if (sort) {
+            params.set("sort", sort.key);
+            params.set("dir", sort.dir);
+        } else {
+            params.delete("sort");
+            params.delete("dir");
+        }
+        var qs = params.toString();
+        global.history.replaceState(null, "", global.location.pathname + (qs ? "?" + qs : "") + global.location.hash);
+    }
+
+    // ---- Feed: runs next to the data (state worker), emits row deltas ----
+
+    var FEED_OVERSCAN = 40;  // rows built beyond each edge of the view's window
+
+    /**
+     * Holds the GPU index and the current filter/sort query, and turns
+     * each change into a minimal message for GpuTableView.setData():
+     *
+     *   {order: [key, ...] | null, patch: {key: row}, removed: [key, ...],
+     *    total, options: {field: [value, ...]} | null}
+     *
+     * order/options are null when unchanged.  Rows are only built for the
+     * window the view last reported through setWindow() plus FEED_OVERSCAN:
+     * patch carries rows there whose class or cells differ from what was
+     * last sent, and removed lists keys that left the window or the data,
+     * so a large fleet costs a screenful of rows per update.
+     */
+    function GpuFeed() {
+        this.index = new GpuIndex([]);
+        this.filters = {};
+        this.sort = null;
+        this.first = 0;
+        this.last = 50;
+        this._positions = [];  // record indices in display order
+        this._keys = [];
+        this._joined = "";
+        this._sent = Object.create(null);  // {key: row signature}
+        this._order = null;
+        this._options = null;
+        this._optionsChanged = null;
+    }
+
+    GpuFeed.prototype.setNodes = function (nodes) {
+        this.index = new GpuIndex(R.gpuRecords(nodes));
+        var options = {};
+        for (var f = 0; f < FILTER_FIELDS.length; f++) {
+            options[FILTER_FIELDS[f]] = this.index.values(FILTER_FIELDS[f]);
+        }
+        var joined = JSON.stringify(options);
+        if (joined !== this._options) {
+            this._options = joined;
+            this._optionsChanged = options;
+        }
+        this._query();
+        return this.message();
+    };
+
+    GpuFeed.prototype.setQuery = function (filters, sort) {
+        this.filters = filters || {};
+        this.sort = sort || null;
+        this._query();
+        return this.message();
+    };
+
+    /** Move the built window to display positions [first, last). */
+    GpuFeed.prototype.setWindow = function (first, last) {
+        this.first = first;
+        this.last = last;
+        return this.message();
+    };
+
+    GpuFeed.prototype._query = function () {
+        var records = this.index.records;
+        this._positions = this.index.query(this.filters, this.sort);
+        this._keys = new Array(this._positions.length);
+        for (var i = 0; i < this._positions.length; i++) this._keys[i] = records[this._positions[i]].key;
+        this._joined = this._keys.join("\n");
+    };
+
+    GpuFeed.prototype.message = function () {
+        var records = this.index.records;
+        var positions = this._positions;
+        var joined = this._joined;
+
+        var lo = Math.max(0, this.first - FEED_OVERSCAN);
+        var hi = Math.min(positions.length, this.last + FEED_OVERSCAN);
+        var patch = {};
+        var live = Object.create(null);
+        for (var p = lo; p < hi; p++) {
+            var row = R.gpuRow(records[positions[p]]);
+            var sig = row.cls + "\x1f" + row.cells.join("\x1f");
+            live[row.key] = true;
+            if (this._sent[row.key] !== sig) {
+                this._sent[row.key] = sig;
+                patch[row.key] = row;
+            }
+        }
+        var removed = [];
+        for (var key in this._sent) {
+            if (!live[key]) {
+                removed.push(key);
+                delete this._sent[key];
+            }
+        }
+
+        var msg = {
+            order: joined === this._order ? null : this._keys,
+            patch: patch,
+            removed: removed,
+            total: records.length,
+            options: this._optionsChanged,
+        };
+        this._order = joined;
+        this._optionsChanged = null;
+        return msg;
+    };
+
+    // ---- View: filters, sorting, URL state (main thread) ----
+
+    /**
+     * Wires the GPU table: <select data-filter="field"> elements inside
+     * *filterEl*, <th data-sort="key"> headers inside *theadEl*, and an
+     * optional *countEl* showing "shown / total".  Row data arrives via
+     * setData() from a GpuFeed; filter/sort changes are reported through
+     * *onQuery(filters, sort)* (also called once with the URL state) and
+     * scrolling through *onWindow(first, last)* for GpuFeed.setWindow().
+     * Rows the feed has not sent yet draw as blank placeholders.
+     */
+    function GpuTableView(opts) {
+        var state = readUrlState();
+        this.filters = state.filters;
+        this.sort = state.sort;
+        this.onQuery = opts.onQuery;
+        this.countEl = opts.countEl || null;
+        this.virtual = new VirtualTable(opts.scrollEl, opts.tbody, opts.colCount);
+        this.virtual.onWindow = opts.onWindow || null;
+        this._blank = [];
+        for (var c = 0; c < opts.colCount; c++) this._blank.push("");
+        this.selects = opts.filterEl ? opts.filterEl.querySelectorAll("select[data-filter]") : [];
+        this.headers = opts.theadEl ? opts.theadEl.querySelectorAll("th[data-sort]") : [];
+        this._rows = Object.create(null);  // {key: row}
+        this._order = [];
+        this._total = 0;
+        this._options = {};  // {field: "joined option values"} to skip no-op rebuilds
+
+        var self = this;
+        Array.prototype.forEach.call(this.selects, function (sel) {
+            sel.addEventListener("change", function () {
+                var field = sel.getAttribute("data-filter");
+                if (sel.value) self.filters[field] = sel.value;
+                else delete self.filters[field];
+                self._changed();
+            });
+        });
+        Array.prototype.forEach.call(this.headers, function (th) {
+            th.addEventListener("click", function (ev) {
+                if (ev.target.classList.contains("cl-info")) return;
+                var key = th.getAttribute("data-sort");
+                // asc -> desc -> unsorted (server order)
+                if (!self.sort || self.sort.key !== key) self.sort = {key: key, dir: "asc"};
+                else if (self.sort.dir === "asc") self.sort = {key: key, dir: "desc"};
+                else self.sort = null;
+                self._changed();
+            });
+        });
+        this._renderSortIndicators();
+        this.onQuery(this.filters, this.sort);
+    }
+
+    /** Apply a GpuFeed message and redraw the visible window. */
+    GpuTableView.prototype.setData = function (msg) {
+        for (var key in msg.patch) this._rows[key] = msg.patch[key];
+        for (var i = 0; i < msg.removed.length; i++) delete this._rows[msg.removed[i]];
+        if (msg.order) this._order = msg.order;
+        if (msg.options) this._renderOptions(msg.options);
+        this._total = msg.total;
+        this._draw();
+    };
+
+    GpuTableView.prototype._changed = function () {
+        writeUrlState(this.filters, this.sort);
+        this._renderSortIndicators();
+        this.virtual.scrollEl.scrollTop = 0;
+        this.onQuery(this.filters, this.sort);
+    };
+
+    GpuTableView.prototype._draw = function () {
+        var rows = this._rows;
+        var order = this._order;
+        var blank = this._blank;
+        var filtered = Object.keys(this.filters).length > 0;
+        var empty = filtered && this._total > 0 ? "No GPUs match the current filters" : "No nodes detected yet...";
+        this.virtual.setRows(order.length, function (i) {
+            return rows[order[i]] || {key: order[i], cls: "", cells: blank};
+        }, empty);
+        if (this.countEl) {
+            this.countEl.textContent = filtered ? order.length + " / " + this._total + " GPUs" : this._total + " GPUs";
+        }
+    };
+
+    GpuTableView.prototype._renderOptions = function (options) {
+        for (var s = 0; s < this.selects.length; s++) {
+            var sel = this.selects[s];
+            var field = sel.getAttribute("data-filter");
+            var values = (options[field] || []).slice();
+            var current = this.filters[field];
+            // Keep a URL-supplied filter selectable even before data arrives
+            if (current && values.indexOf(current) === -1) values.push(current);
+            var joined = values.join("\n");
+            if (this._options[field] === joined) continue;
+            this._options[field] = joined;
+
+            var html = sel.options.length ? sel.options[0].outerHTML : "<option value=\"\">All</option>";
+            for (var v = 0; v < values.length; v++) {
+                html += "<option value=\"" + R.esc(values[v]) + "\">" + R.esc(values[v]) + "</option>";
+            }
+            sel.innerHTML = html;
+            sel.value = current || "";
+        }
+    };
+
+    GpuTableView.prototype._renderSortIndicators = function () {
+        for (var h = 0; h < this.headers.length; h++) {
+            var th = this.headers[h];
+            var ind = th.querySelector(".cl-sort");
+            if (!ind) continue;
+            var active = this.sort && this.sort.key === th.getAttribute("data-sort");
+            ind.textContent = active ? (this.sort.dir === "asc" ? "\u25B2" : "\u25BC") : "";
+        }
+    };
+
+    global.CoreLinkGpuTable = {
+        GpuIndex: GpuIndex,
+        VirtualTable: VirtualTable,
+        GpuFeed: GpuFeed,
+        GpuTableView: GpuTableView,
+    };
+
+})(typeof window !== "undefined" ? window : self);
@@ -0,0 +1,105 @@
+/* CoreLink - Network test matrix (Network tab)
+ *
+ * Starts pairwise throughput/latency runs via POST /api/nettest and polls
+ * GET /api/nettest while a run is in progress.  Rows are senders, columns
+ * receivers.
+ */
+
+(function () {
+    "use strict";
+
+    var R = window.CoreLinkRender;
+    var tabBtn   = document.getElementById("network-tab");
+    var matrixEl = document.getElementById("nettest-matrix");
+    var statusEl = document.getElementById("nettest-status");
+    var runBtn   = document.getElementById("nettest-run");
+    var nodesEl  = document.getElementById("nettest-nodes");
+    var secsEl   = document.getElementById("nettest-secs");
+    if (!tabBtn || !matrixEl) return;
+
+    var POLL_MS = 2000;
+    var pollTimer = null;
+
+    function fmtRate(mbps) {
+        if (mbps == null) return "\u2014";
+        if (mbps < 1000) return mbps.toFixed(0) + " Mbps";
+        return (mbps / 1000).toFixed(2) + " Gbps";
+    }
+
+    function cell(result) {
+        if (!result) return "<td class=\"text-muted\">\u2014</td>";
+        if (result.error) {
+            return "<td title=\"" + R.esc(result.error) + "\" style=\"color: var(--cl-danger)\">"
+                   + R.esc(result.error) + "</td>";
+        }
+        return "<td title=\"min RTT " + R.esc(result.rtt_min_ms) + " ms\">"
+               + fmtRate(result.mbps) + "<br><span class=\"text-muted\">"
+               + R.esc(result.rtt_ms) + " ms</span></td>";
+    }
+
+    function render(state) {
+        var nodes = state.nodes || [];
+        runBtn.disabled = !!state.running;
+        if (state.running) {
+            statusEl.textContent = "Running\u2026 " + state.done + " / " + state.total + " tests";
+        } else if (state.finished) {
+            statusEl.textContent = "Last run " + new Date(state.finished * 1000).toLocaleTimeString()
+                + " (" + state.done + " tests)";
+        }
+        if (nodes.length === 0) return;
+
+        var html = "<table class=\"table table-sm align-middle mb-0\"><thead><tr><th></th>";
+        for (var c = 0; c < nodes.length; c++) html += "<th>" + R.esc(nodes[c]) + "</th>";
+        html += "</tr></thead><tbody>";
+        for (var r = 0; r < nodes.length; r++) {
+            var row = (state.matrix || {})[nodes[r]] || {};
+            html += "<tr><th>" + R.esc(nodes[r]) + "</th>";
+            for (c = 0; c < nodes.length; c++) {
+                html += r === c ? "<td class=\"text-muted\">\u00b7</td>" : cell(row[nodes[c]]);
+            }
+            html += "</tr>";
+        }
+        matrixEl.innerHTML = html + "</tbody></table>";
+    }
+
+    function load() {
+        fetch("/api/nettest", {credentials: "same-origin"})
+            .then(function (resp) { return resp.json(); })
+            .then(function (state) {
+                render(state);
+                clearTimeout(pollTimer);
+                if (state.running) pollTimer = setTimeout(load, POLL_MS);
+            })
+            .catch(function () {
+                statusEl.textContent = "Could not load results";
+            });
+    }
+
+    runBtn.addEventListener("click", function () {
+        var patterns = nodesEl.value.split(",").map(function (p) { return p.trim(); })
+            .filter(Boolean);
+        runBtn.disabled = true;
+        fetch("/api/nettest", {
+            method: "POST",
+            credentials: "same-origin",
+            headers: {"Content-Type": "application/json"},
+            body: JSON.stringify({nodes: patterns, secs: Number(secsEl.value)}),
+        })
+            .then(function (resp) { return resp.json(); })
+            .then(function (state) {
+                if (state.error) {
+                    statusEl.textContent = state.error;
+                    runBtn.disabled = false;
+                    return;
+                }
+                load();
+            })
+            .catch(function () {
+                statusEl.textContent = "Could not start test";
+                runBtn.disabled = false;
+            });
+    });
+
+    tabBtn.addEventListener("shown.bs.tab", load);
+
+})();
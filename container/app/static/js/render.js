@@ -0,0 +1,396 @@
+/* CoreLink - Table row models and keyed incremental renderer */
+
+(function (global) {
+    "use strict";
+
+    // ---- Escaping (string-based, no throwaway DOM nodes) ----
+
+    var ESC_MAP = {"&": "&amp;", "<": "&lt;", ">": "&gt;", "\"": "&quot;", "'": "&#39;"};
+    var ESC_RE = /[&<>"']/g;
+
+    function escChar(c) {
+        return ESC_MAP[c];
+    }
+
+    function esc(str) {
+        if (str == null) return "";
+        return String(str).replace(ESC_RE, escChar);
+    }
+
+    // ---- Formatting helpers ----
+
+    function fmtNicSpeed(mbps) {
+        if (!mbps || mbps === 0) return "?";
+        if (mbps < 1000) return mbps + "M";
+        return (mbps / 1000).toFixed(1).replace(/\.0$/, "") + "G";
+    }
+
+    function nicSpeedClass(speed, maxSpeed) {
+        if (!speed || speed <= 0) return "";
+        if (speed <= 1000) return "color: var(--cl-danger)";
+        if (maxSpeed && speed < maxSpeed) return "color: var(--cl-warning)";
+        return "color: var(--cl-success)";
+    }
+
+    function fmtDuration(seconds) {
+        if (seconds == null || seconds < 0) return "\u2014";
+        var h = Math.floor(seconds / 3600);
+        var m = Math.floor((seconds % 3600) / 60);
+        if (h > 0) return h + "h " + m + "m";
+        if (m > 0) return m + "m";
+        return seconds + "s";
+    }
+
+    function timeSyncIndicator(ntp_drift, title) {
+        if (ntp_drift == null) return "";
+        var attr = title ? " title=\"" + esc(title) + "\"" : "";
+        if (Math.abs(ntp_drift) <= 5) {
+            return " <span style=\"color:var(--cl-success)\"" + attr + ">\u2713</span>";
+        }
+        return " <span style=\"color:var(--cl-danger)\"" + attr + ">\u2717</span>";
+    }
+
+    /** Clock error in seconds: NTP drift, else the peer consensus offset. */
+    function syncOffset(node) {
+        return node.ntp_drift != null ? node.ntp_drift : node.clock_offset;
+    }
+
+    /** NTP sync mark for a node, noting when it comes from peer consensus. */
+    function nodeSyncIndicator(node) {
+        if (node.ntp_drift == null && node.clock_offset != null) {
+            return timeSyncIndicator(node.clock_offset, "No NTP server; offset from peer consensus "
+                                     + Number(node.clock_offset).toFixed(3) + "s");
+        }
+        return timeSyncIndicator(node.ntp_drift);
+    }
+
+    /** Row class for a node status ("online", "stale" or "unverified"). */
+    function statusClass(status) {
+        if (status === "stale") return "node-stale";
+        if (status === "unverified") return "node-unverified";
+        return "node-online";
+    }
+
+    /** Per-GPU load "util% / mem% / temp" from a node's telemetry. */
+    function gpuLoad(node, pos) {
+        var t = node.telemetry;
+        var load = t && t.gpus ? t.gpus[pos] : null;
+        if (!load) return "\u2014";
+        function part(v, unit) { return v == null ? "?" : v + unit; }
+        return "<span title=\"Utilization / memory used / temperature\">"
+               + part(load.util, "%") + " / " + part(load.mem, "%") + " / "
+               + part(load.temp, "\u00b0C") + "</span>";
+    }
+
+    /** Node name, with host CPU / RAM / disk usage as a tooltip. */
+    function nodeName(node) {
+        var t = node.telemetry;
+        if (!t) return esc(node.node_id);
+        function part(label, v) { return label + " " + (v == null ? "?" : v + "%"); }
+        return "<span title=\"" + part("CPU", t.cpu) + ", " + part("RAM", t.ram) + ", "
+               + part("Disk", t.disk) + "\">" + esc(node.node_id) + "</span>";
+    }
+
+    function shortAddr(addr) {
+        return esc(addr.substring(0, 4) + "..." + addr.substring(addr.length - 4));
+    }
+
+    // ---- Row models: {key, cls, cells: [html, ...]} ----
+
+    /** NTP sync bucket used for filtering: "synced", "drift" or "unknown". */
+    function ntpState(ntp_drift) {
+        if (ntp_drift == null) return "unknown";
+        return Math.abs(ntp_drift) <= 5 ? "synced" : "drift";
+    }
+
+    /**
+     * Flatten nodes into one record per GPU (a GPU-less node gets a single
+     * record with gpu = null).  Cell HTML is built separately by gpuRow(),
+     * which GpuFeed only calls for the window the table has scrolled to.
+     */
+    function gpuRecords(nodes) {
+        var records = [];
+        for (var n = 0; n < nodes.length; n++) {
+            var node = nodes[n];
+            var gpus = node.gpus || [];
+            var nic = fmtNicSpeed(node.link_speed);
+            var ntp = ntpState(syncOffset(node));
+            if (gpus.length === 0) {
+                records.push({key: node.node_id + "/-", node: node, gpu: null, first: true,
+                              model: "\u2014", limit: "\u2014", nic: nic, status: node.status, ntp: ntp});
+                continue;
+            }
+            for (var g = 0; g < gpus.length; g++) {
+                records.push({key: node.node_id + "/" + gpus[g].id, node: node, gpu: gpus[g], pos: g, first: g === 0,
+                              model: gpus[g].model || "Unknown", limit: gpus[g].limit || "0.0 x 0",
+                              nic: nic, status: node.status, ntp: ntp});
+            }
+        }
+        return records;
+    }
+
+    /** Build the {key, cls, cells} row for one GPU record. */
+    function gpuRow(rec) {
+        var node = rec.node;
+        var netDisplay = (node.net_kbps != null) ? Number(node.net_kbps).toFixed(2) + " Kbps" : "0.00 Kbps";
+        var nicHtml = "<span style=\"" + nicSpeedClass(node.link_speed, node.link_speed_max) + "\">"
+                    + rec.nic + "</span>";
+        return {
+            key: rec.key,
+            cls: statusClass(node.status),
+            cells: [
+                nodeName(node),
+                rec.gpu ? esc(rec.gpu.id) : "\u2014",
+                esc(rec.limit),
+                rec.first ? nicHtml : "---",
+                esc(rec.model),
+                rec.gpu ? gpuLoad(node, rec.pos) : "\u2014",
+                esc(node.timestamp) + nodeSyncIndicator(node),
+                rec.first ? netDisplay : "---",
+            ],
+        };
+    }
+
+    /** One row per GPU, keyed by node_id + GPU id. */
+    function clusterRows(nodes) {
+        return gpuRecords(nodes).map(gpuRow);
+    }
+
+    /** One row per Nosana container, keyed by node_id + container name. */
+    function nosanaRows(nodes) {
+        var rows = [];
+        for (var n = 0; n < nodes.length; n++) {
+            var node = nodes[n];
+            var list = node.nosana || [];
+            var rowClass = statusClass(node.status);
+            for (var i = 0; i < list.length; i++) {
+                var nn = list[i];
+
+                var walletHtml = "\u2014";
+                if (nn.wallet) {
+                    walletHtml = "<span title=\"" + esc(nn.wallet) + "\">" + shortAddr(nn.wallet) + "</span>";
+                }
+
+                var statusStyle;
+                if (nn.status === "running") statusStyle = "color: var(--cl-success)";
+                else if (nn.status === "queued") statusStyle = "color: var(--cl-warning)";
+                else if (nn.status === "error") statusStyle = "color: var(--cl-danger)";
+                else statusStyle = "opacity: 0.5";
+
+                var marketDisplay = "\u2014";
+                if (nn.market_name) {
+                    marketDisplay = esc(nn.market_name);
+                } else if (nn.market) {
+                    marketDisplay = shortAddr(nn.market);
+                }
+
+                var queueDisplay = "\u2014";
+                if (nn.queue_position != null && nn.queue_length != null) {
+                    queueDisplay = esc(nn.queue_position + " / " + nn.queue_length);
+                }
+
+                var jobDisplay = nn.job ? shortAddr(nn.job) : "\u2014";
+
+                var durationDisplay = "\u2014";
+                if (nn.duration != null && nn.max_duration != null) {
+                    durationDisplay = fmtDuration(nn.duration) + " / " + fmtDuration(nn.max_duration);
+                } else if (nn.max_duration != null) {
+                    durationDisplay = "\u2014 / " + fmtDuration(nn.max_duration);
+                }
+
+                var apiStyle = "";
+                if (nn.node_api === "online") apiStyle = "color: var(--cl-success)";
+                else if (nn.node_api === "unreachable") apiStyle = "color: var(--cl-danger)";
+                else if (nn.node_api === "error") apiStyle = "color: var(--cl-warning)";
+
+                rows.push({
+                    key: node.node_id + "/" + (nn.container || nn.wallet || i),
+                    cls: rowClass,
+                    cells: [
+                        esc(node.node_id),
+                        esc(nn.container || "\u2014"),
+                        walletHtml,
+                        "<span style=\"" + statusStyle + "\">" + esc(nn.status || "unknown") + "</span>",
+                        marketDisplay,
+                        queueDisplay,
+                        jobDisplay,
+                        esc(durationDisplay),
+                        "<span style=\"" + apiStyle + "\">" + esc(nn.node_api || "\u2014") + "</span>",
+                    ],
+                });
+            }
+        }
+        return rows;
+    }
+
+    /** One row per node group (GET /api/groups summaries), keyed by name. */
+    function groupRows(groups) {
+        var rows = [];
+        for (var i = 0; i < groups.length; i++) {
+            var g = groups[i];
+            var models = [];
+            for (var model in g.models) models.push(g.models[model] + "\u00d7 " + model);
+            var drift = g.worst_ntp_drift;
+            var ntpHtml = drift == null ? "\u2014"
+                : Number(drift).toFixed(3) + "s" + timeSyncIndicator(drift);
+            rows.push({
+                key: g.group,
+                cls: g.online < g.nodes ? "node-stale" : "node-online",
+                cells: [
+                    "<a href=\"#\" data-group=\"" + esc(g.group) + "\">" + esc(g.group) + "</a>",
+                    g.online + " / " + g.nodes,
+                    g.stale ? "<span style=\"color: var(--cl-danger)\">" + g.stale + "</span>" : "0",
+                    g.gpus + (models.length ? " <span class=\"text-muted\">(" + esc(models.join(", ")) + ")</span>" : ""),
+                    Number(g.net_kbps || 0).toFixed(2) + " Kbps",
+                    ntpHtml,
+                    g.degraded_links ? "<span style=\"color: var(--cl-warning)\">" + g.degraded_links + "</span>" : "0",
+                ],
+            });
+        }
+        return rows;
+    }
+
+    // ---- Keyed incremental table ----
+
+    /**
+     * Keeps one <tr> per row key and patches only cells whose HTML changed,
+     * so hover state and text selection survive periodic updates.
+     */
+    function KeyedTable(tbody, colCount) {
+        this.tbody = tbody;
+        this.colCount = colCount;
+        this._rows = Object.create(null);  // {key: {tr, cls, cells}}
+        this._managed = false;
+        this._emptyRow = null;
+        this._emptyHtml = null;
+        this._padTop = null;     // spacer rows used by virtual scrolling
+        this._padBottom = null;
+    }
+
+    KeyedTable.prototype._spacer = function () {
+        var tr = document.createElement("tr");
+        tr.className = "cl-spacer";
+        var td = document.createElement("td");
+        td.colSpan = this.colCount;
+        tr.appendChild(td);
+        return tr;
+    };
+
+    /** Reserve *top* / *bottom* pixels around the rendered rows. */
+    KeyedTable.prototype.setPadding = function (top, bottom) {
+        if (!this._padTop) {
+            this._padTop = this._spacer();
+            this._padBottom = this._spacer();
+        }
+        this._padTop.firstChild.style.height = top + "px";
+        this._padBottom.firstChild.style.height = bottom + "px";
+        this._padTop.style.display = top > 0 ? "" : "none";
+        this._padBottom.style.display = bottom > 0 ? "" : "none";
+    };
+
+    KeyedTable.prototype._createRow = function () {
+        var tr = document.createElement("tr");
+        var cells = [];
+        for (var c = 0; c < this.colCount; c++) {
+            tr.appendChild(document.createElement("td"));
+            cells.push(null);
+        }
+        return {tr: tr, cls: null, cells: cells};
+    };
+
+    /** Render *rows* in order; show *emptyHtml* as a single row if none. */
+    KeyedTable.prototype.render = function (rows, emptyHtml) {
+        var tbody = this.tbody;
+        if (!this._managed) {
+            tbody.textContent = "";  // drop the template placeholder row
+            this._managed = true;
+        }
+
+        if (rows.length === 0) {
+            this._removeExcept(Object.create(null));
+            if (this._padTop && this._padTop.parentNode === tbody) {
+                tbody.removeChild(this._padTop);
+                tbody.removeChild(this._padBottom);
+            }
+            if (!this._emptyRow) {
+                this._emptyRow = document.createElement("tr");
+                var td = document.createElement("td");
+                td.colSpan = this.colCount;
+                td.className = "text-center text-muted";
+                this._emptyRow.appendChild(td);
+            }
+            if (this._emptyHtml !== emptyHtml) {
+                this._emptyRow.firstChild.innerHTML = emptyHtml;
+                this._emptyHtml = emptyHtml;
+            }
+            if (this._emptyRow.parentNode !== tbody) tbody.appendChild(this._emptyRow);
+            return;
+        }
+        if (this._emptyRow && this._emptyRow.parentNode === tbody) {
+            tbody.removeChild(this._emptyRow);
+        }
+
+        if (this._padTop && tbody.firstChild !== this._padTop) {
+            tbody.insertBefore(this._padTop, tbody.firstChild);
+        }
+
+        var seen = Object.create(null);
+        var cursor = this._padTop ? this._padTop.nextSibling : tbody.firstChild;
+        for (var i = 0; i < rows.length; i++) {
+            var row = rows[i];
+            seen[row.key] = true;
+            var rec = this._rows[row.key];
+            if (!rec) rec = this._rows[row.key] = this._createRow();
+
+            if (rec.cls !== row.cls) {
+                rec.tr.className = row.cls || "";
+                rec.cls = row.cls;
+            }
+            var tds = rec.tr.cells;
+            for (var c = 0; c < this.colCount; c++) {
+                if (rec.cells[c] !== row.cells[c]) {
+                    tds[c].innerHTML = row.cells[c];
+                    rec.cells[c] = row.cells[c];
+                }
+            }
+
+            if (rec.tr === cursor) {
+                cursor = cursor.nextSibling;
+            } else {
+                tbody.insertBefore(rec.tr, cursor);
+            }
+        }
+        this._removeExcept(seen);
+        if (this._padBottom && tbody.lastChild !== this._padBottom) {
+            tbody.appendChild(this._padBottom);
+        }
+    };
+
+    KeyedTable.prototype._removeExcept = function (seen) {
+        for (var key in this._rows) {
+            if (seen[key]) continue;
+            var tr = this._rows[key].tr;
+            if (tr.parentNode) tr.parentNode.removeChild(tr);
+            delete this._rows[key];
+        }
+    };
+
+    global.CoreLinkRender = {
+        esc: esc,
+        fmtNicSpeed: fmtNicSpeed,
+        nicSpeedClass: nicSpeedClass,
+        fmtDuration: fmtDuration,
+        timeSyncIndicator: timeSyncIndicator,
+        ntpState: ntpState,
+        syncOffset: syncOffset,
+        statusClass: statusClass,
+        gpuLoad: gpuLoad,
+        gpuRecords: gpuRecords,
+        gpuRow: gpuRow,
+        clusterRows: clusterRows,
+        nosanaRows: nosanaRows,
+        groupRows: groupRows,
+        KeyedTable: KeyedTable,
+    };
+
+})(typeof window !== "undefined" ? window : self);
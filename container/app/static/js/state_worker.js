@@ -0,0 +1,115 @@
+/* CoreLink - Dashboard state worker
+ *
+ * Owns the Socket.IO connection and does all decoding, aggregation and
+ * row-model building off the UI thread.  Posts only render instructions:
+ *
+ *   {type: "conn", connected}
+ *   {type: "summary", online, hosts, total_kbps, monitor, last_probe,
+ *    partial}
+ *   {type: "gpu", ...GpuFeed message}
+ *   {type: "nosana", rows, empty}
+ *   {type: "groups", rows, count}
+ *
+ * Receives {type: "query", filters, sort} and {type: "window", first, last}
+ * from the GPU table view, and {type: "view", tab, nodes, group, max_rate}
+ * when the visible tab, group drill-down or URL view changes; the latter
+ * is forwarded as a server-side "subscribe" so only the displayed slice
+ * is pushed.
+ */
+
+importScripts("../vendor/js/socket.io.min.js", "render.js", "gputable.js");
+
+(function () {
+    "use strict";
+
+    var R = self.CoreLinkRender;
+    var feed = new self.CoreLinkGpuTable.GpuFeed();
+    var lastNosana = null;  // JSON of last posted Nosana message
+    var view = {tab: "test", nodes: [], group: "", max_rate: 3};
+
+    // Socket.IO from a worker: same-origin, so the session cookie is sent
+    var socket = io(self.location.origin, {transports: ["websocket", "polling"]});
+
+    socket.on("connect", function () {
+        socket.emit("subscribe", view);  // re-subscribe after reconnects
+        self.postMessage({type: "conn", connected: true});
+    });
+
+    socket.on("disconnect", function () {
+        self.postMessage({type: "conn", connected: false});
+    });
+
+    socket.on("cluster_state", function (data) {
+        // Groups tab: rollups only, no per-node data
+        if (data.groups) {
+            self.postMessage({type: "groups", rows: R.groupRows(data.groups),
+                              count: data.groups.length});
+            return;
+        }
+        var nodes = data.nodes || [];
+
+        // Online nodes, LAN traffic and fleet-wide Nosana containers
+        var online = 0;
+        var totalKbps = 0;
+        var hosts = 0;
+        for (var i = 0; i < nodes.length; i++) {
+            if (nodes[i].status === "online") {
+                online++;
+                totalKbps += (nodes[i].net_kbps || 0);
+            }
+            hosts += nodes[i].nosana_count != null
+                ? nodes[i].nosana_count : (nodes[i].nosana || []).length;
+        }
+
+        var nosanaState = data.nosana || {};
+        var hasNosana = nodes.length === 0 || nodes[0].nosana !== undefined;
+        var hasGpus = nodes.length === 0 || nodes[0].gpus !== undefined;
+        self.postMessage({
+            type: "summary",
+            online: online,
+            hosts: hosts,
+            total_kbps: totalKbps,
+            monitor: data.monitor || {},
+            last_probe: nosanaState.last_probe || null,
+            partial: !!nosanaState.partial,
+        });
+
+        // Skip table models the current view did not ask for
+        if (hasGpus) postGpu(feed.setNodes(nodes));
+        if (!hasNosana) return;
+
+        var empty;
+        if (nosanaState.error) {
+            empty = R.esc(nosanaState.error);
+        } else if (nosanaState.last_probe) {
+            empty = "No Nosana containers found";
+        } else {
+            empty = "Waiting for probe...";
+        }
+        var nosanaMsg = {type: "nosana", rows: R.nosanaRows(nodes), empty: empty};
+        var nosanaJson = JSON.stringify(nosanaMsg);
+        if (nosanaJson !== lastNosana) {
+            lastNosana = nosanaJson;
+            self.postMessage(nosanaMsg);
+        }
+    });
+
+    self.onmessage = function (ev) {
+        var msg = ev.data || {};
+        if (msg.type === "query") {
+            postGpu(feed.setQuery(msg.filters, msg.sort));
+        } else if (msg.type === "window") {
+            postGpu(feed.setWindow(msg.first, msg.last));
+        } else if (msg.type === "view") {
+            view = {tab: msg.tab, nodes: msg.nodes || [], group: msg.group || "",
+                    max_rate: msg.max_rate || 3};
+            if (socket.connected) socket.emit("subscribe", view);
+        }
+    };
+
+    function postGpu(msg) {
+        msg.type = "gpu";
+        self.postMessage(msg);
+    }
+
+})();
@@ -0,0 +1,201 @@
+"""CoreLink - Per-node resource telemetry for gossip heartbeats.
+
+Host CPU, RAM and root-disk usage plus per-GPU utilization, memory and
+temperature are sampled every TELEMETRY_INTERVAL seconds and quantized to
+one byte per value (UNKNOWN = 255):
+
+  [version, cpu %, ram %, disk %, gpu count, (util %, mem %, temp C) * n]
+
+The packed bytes travel base64-encoded in the heartbeat "tm" field: 40
+characters for an 8-GPU node.  A value is only republished when it moves
+by at least its threshold, so sampling noise does not change the encoding
+and GossipNode can skip the field while it stays the same.
+"""
+
+import base64
+import os
+import threading
+import time
+
+from gpu import get_local_gpu_load
+
+TELEMETRY_VERSION = 1
+TELEMETRY_INTERVAL = 5.0   # seconds between samples
+UNKNOWN = 255              # quantized "no reading"
+PERCENT_STEP = 5           # republish threshold for percentages
+TEMP_STEP = 3              # republish threshold for temperatures (C)
+
+HOST_FIELDS = ("cpu", "ram", "disk")
+GPU_FIELDS = ("util", "mem", "temp")
+_STEPS = {"cpu": PERCENT_STEP, "ram": PERCENT_STEP, "disk": PERCENT_STEP,
+          "util": PERCENT_STEP, "mem": PERCENT_STEP, "temp": TEMP_STEP}
+
+
+def quantize(value):
+    """Round a reading to one byte (0-254), or UNKNOWN for None."""
+    if value is None:
+        return UNKNOWN
+    return min(max(int(round(value)), 0), UNKNOWN - 1)
+
+
+def encode_telemetry(telemetry):
+    """Pack a telemetry dict (see decode_telemetry) into its wire string."""
+    gpus = telemetry.get("gpus") or []
+    data = [TELEMETRY_VERSION]
+    data.extend(quantize(telemetry.get(k)) for k in HOST_FIELDS)
+    data.append(min(len(gpus), 255))
+    for gpu in gpus[:255]:
+        data.extend(quantize(gpu.get(k)) for k in GPU_FIELDS)
+    return base64.b64encode(bytes(data)).decode("ascii")
+
+
+def decode_telemetry(wire):
+    """Unpack a "tm" string into {"cpu", "ram", "disk", "gpus": [...]}.
+
+    Each GPU is {"util", "mem", "temp"}; unknown readings are None.
+    Returns None for malformed input or an unsupported version.
+    """
+    try:
+        data = base64.b64decode(wire, validate=True)
+    except (TypeError, ValueError):
+        return None
+    if len(data) < 5 or data[0] != TELEMETRY_VERSION:
+        return None
+    count = data[4]
+    if len(data) != 5 + 3 * count:
+        return None
+
+    def value(b):
+        return None if b == UNKNOWN else b
+
+    telemetry = {k: value(data[1 + i]) for i, k in enumerate(HOST_FIELDS)}
+    telemetry["gpus"] = [
+        {k: value(data[5 + 3 * g + i]) for i, k in enumerate(GPU_FIELDS)}
+        for g in range(count)
+    ]
+    return telemetry
+
+
+def _settle(key, published, sample):
+    """Keep *published* unless *sample* moved past the field's threshold."""
+    if published is None or sample is None:
+        return sample
+    return published if abs(sample - published) < _STEPS[key] else sample
+
+
+class HostTelemetry:
+    """Samples host and GPU load in a background thread.
+
+    *on_change(wire)* is called with the encoded telemetry whenever the
+    published (threshold-filtered) values change.
+    """
+
+    def __init__(self, on_change, interval=TELEMETRY_INTERVAL):
+        self._on_change = on_change
+        self._interval = interval
+        self._prev_cpu = self._read_cpu()
+        self._published = None
+        self._wire = None
+
+    def start(self):
+        """Start the sampling thread (call once)."""
+        threading.Thread(target=self._loop, name="telemetry", daemon=True).start()
+
+    def sample(self):
+        """Return the current quantized readings as a telemetry dict."""
+        telemetry = {
+            "cpu": self._calc_cpu(),
+            "ram": self._calc_ram(),
+            "disk": self._calc_disk(),
+            "gpus": [
+                {k: gpu[k] for k in GPU_FIELDS}
+                for gpu in get_local_gpu_load()
+            ],
+        }
+        for key in HOST_FIELDS:
+            telemetry[key] = self._quantized(telemetry[key])
+        for gpu in telemetry["gpus"]:
+            for key in GPU_FIELDS:
+                gpu[key] = self._quantized(gpu[key])
+        return telemetry
+
+    @staticmethod
+    def _quantized(value):
+        q = quantize(value)
+        return None if q == UNKNOWN else q
+
+    def _publish(self, sample):
+        old = self._published
+        if old is not None and len(old["gpus"]) == len(sample["gpus"]):
+            for key in HOST_FIELDS:
+                sample[key] = _settle(key, old[key], sample[key])
+            for prev, gpu in zip(old["gpus"], sample["gpus"]):
+                for key in GPU_FIELDS:
+                    gpu[key] = _settle(key, prev[key], gpu[key])
+        self._published = sample
+        wire = encode_telemetry(sample)
+        if wire != self._wire:
+            self._wire = wire
+            self._on_change(wire)
+
+    def _loop(self):
+        while True:
+            time.sleep(self._interval)
+            try:
+                self._publish(self.sample())
+            except Exception as exc:
+                print("[Telemetry] sample error: %s" % exc)
+
+    # ------------------------------------------------------------------
+    # Host readings (/proc is not namespaced: these are host-wide)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _read_cpu():
+        """Return (busy_ticks, total_ticks) from the /proc/stat cpu line."""
+        try:
+            with open("/proc/stat") as f:
+                fields = [int(x) for x in f.readline().split()[1:]]
+        except (IOError, ValueError):
+            return 0, 0
+        # cpu  user nice system idle iowait irq softirq steal ...
+        idle = fields[3] + (fields[4] if len(fields) > 4 else 0)
+        total = sum(fields)
+        return total - idle, total
+
+    def _calc_cpu(self):
+        busy, total = self._read_cpu()
+        d_busy = busy - self._prev_cpu[0]
+        d_total = total - self._prev_cpu[1]
+        self._prev_cpu = (busy, total)
+        if d_total <= 0:
+            return None
+        return 100.0 * d_busy / d_total
+
+    @staticmethod
+    def _calc_ram():
+        """Used memory (MemTotal - MemAvailable) as % of MemTotal."""
+        info = {}
+        try:
+            with open("/proc/meminfo") as f:
+                for line in f:
+                    key, _, rest = line.partition(":")
+                    if key in ("MemTotal", "MemAvailable"):
+                        info[key] = int(rest.split()[0])
+        except (IOError, ValueError, IndexError):
+            return None
+        total = info.get("MemTotal", 0)
+        if total <= 0 or "MemAvailable" not in info:
+            return None
+        return 100.0 * (total - info["MemAvailable"]) / total
+
+    @staticmethod
+    def _calc_disk():
+        """Used space on the root filesystem as a percentage."""
+        try:
+            st = os.statvfs("/")
+        except OSError:
+            return None
+        if st.f_blocks <= 0:
+            return None
+        return 100.0 * (st.f_blocks - st.f_bfree) / st.f_blocks
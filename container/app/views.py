@@ -0,0 +1,112 @@
+"""CoreLink - Dashboard view subscriptions.
+
+A client subscribes to a *view*: which tab it displays, which nodes
+(hostname glob patterns and/or one node group), which node fields, and
+the slowest acceptable push interval.  Clients with identical views
+share a Socket.IO room, and the push loop emits one pre-sliced payload
+per room.
+"""
+
+import fnmatch
+import hashlib
+import json
+
+VIEW_TABS = ("all", "test", "nosana", "groups")
+MIN_PUSH_INTERVAL = 3.0    # seconds (push loop period)
+MAX_PUSH_INTERVAL = 300.0
+MAX_PATTERNS = 32
+MAX_GROUP_LEN = 64
+
+DEFAULT_VIEW = {
+    "tab": "all",
+    "nodes": [],
+    "group": "",
+    "fields": [],
+    "max_rate": MIN_PUSH_INTERVAL,
+}
+
+# Node keys always sent, whatever the field selection
+_BASE_FIELDS = ("node_id", "status")
+
+
+def normalize_view(raw):
+    """Validate a client-supplied view dict, filling defaults."""
+    if not isinstance(raw, dict):
+        raw = {}
+
+    tab = raw.get("tab")
+    if tab not in VIEW_TABS:
+        tab = DEFAULT_VIEW["tab"]
+
+    nodes = raw.get("nodes") or []
+    if not isinstance(nodes, list):
+        nodes = [nodes]
+    nodes = sorted({str(p) for p in nodes if p})[:MAX_PATTERNS]
+
+    group = raw.get("group") or ""
+    if not isinstance(group, str):
+        group = ""
+    group = group[:MAX_GROUP_LEN]
+
+    fields = raw.get("fields") or []
+    if not isinstance(fields, list):
+        fields = [fields]
+    fields = sorted({str(f) for f in fields if f})[:MAX_PATTERNS]
+
+    try:
+        rate = float(raw.get("max_rate", MIN_PUSH_INTERVAL))
+    except (TypeError, ValueError):
+        rate = MIN_PUSH_INTERVAL
+    rate = min(max(rate, MIN_PUSH_INTERVAL), MAX_PUSH_INTERVAL)
+
+    return {"tab": tab, "nodes": nodes, "group": group, "fields": fields,
+            "max_rate": rate}
+
+
+def view_room(view):
+    """Return the Socket.IO room name shared by clients with this view."""
+    key = json.dumps(view, sort_keys=True).encode("utf-8")
+    return "view:" + hashlib.sha1(key).hexdigest()[:12]
+
+
+def slice_state(view, nodes, monitor, nosana, groups=None):
+    """Build the cluster_state payload for *view*.
+
+    *nodes* is gossip.get_cluster_state() (or, for a group view, that
+    group's entries), *monitor* the local metrics and *nosana* the local
+    probe state.  The "test" tab drops per-node Nosana lists (keeping only
+    a count for the Hosts counter) and the local probe state; the "nosana"
+    tab drops GPU/NIC/timing columns.  The "groups" tab carries only the
+    per-group rollups in *groups* (a list of summaries), no nodes.
+    """
+    tab = view["tab"]
+    if tab == "groups":
+        return {"groups": groups or [], "monitor": monitor}
+
+    patterns = view["nodes"]
+    fields = set(view["fields"])
+
+    out_nodes = []
+    for node in nodes:
+        if patterns and not any(
+                fnmatch.fnmatchcase(node["node_id"], p) for p in patterns):
+            continue
+
+        if tab == "nosana":
+            entry = {k: node.get(k) for k in _BASE_FIELDS}
+            entry["nosana"] = node.get("nosana", [])
+        elif tab == "test":
+            entry = {k: v for k, v in node.items() if k != "nosana"}
+            entry["nosana_count"] = len(node.get("nosana", []))
+        else:
+            entry = dict(node)
+
+        if fields:
+            entry = {k: v for k, v in entry.items()
+                     if k in fields or k in _BASE_FIELDS or k == "nosana_count"}
+        out_nodes.append(entry)
+
+    payload = {"nodes": out_nodes, "monitor": monitor}
+    if tab != "test":
+        payload["nosana"] = nosana
+    return payload
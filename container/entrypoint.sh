@@ -14,11 +14,21 @@ else
     # Fallback: generate self-signed cert (legacy mode / manual docker run)
     echo "[CoreLink] No certificate found. Generating self-signed TLS certificate..."
     HOSTNAME="${CORELINK_HOSTNAME:-$(hostname)}"
-    openssl req -x509 -newkey rsa:4096 \
+    # ECDSA P-256 is near-instant to generate; RSA-2048 only as a fallback.
+    # keyEncipherment (RSA key transport) is only asserted for the RSA key.
+    openssl req -x509 -newkey ec -pkeyopt ec_paramgen_curve:prime256v1 \
         -keyout "$CERT_DIR/key.pem" \
         -out "$CERT_DIR/cert.pem" \
         -days 3650 -nodes \
         -subj "/CN=${HOSTNAME}/O=CoreLink" \
+        -addext "keyUsage=digitalSignature" \
+        2>/dev/null \
+    || openssl req -x509 -newkey rsa:2048 \
+        -keyout "$CERT_DIR/key.pem" \
+        -out "$CERT_DIR/cert.pem" \
+        -days 3650 -nodes \
+        -subj "/CN=${HOSTNAME}/O=CoreLink" \
+        -addext "keyUsage=digitalSignature,keyEncipherment" \
         2>/dev/null
     echo "[CoreLink] Self-signed certificate generated."
 fi
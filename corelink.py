@@ -9,26 +9,52 @@ Usage:
 """
 
 import argparse
+import calendar
+import hashlib
+import http.client
+import ipaddress
+import json
 import os
 import platform
+import queue
 import re
+import secrets
 import shutil
 import socket
+import ssl
 import subprocess
 import sys
 import tempfile
+import threading
 import time
-import urllib.request
 import urllib.error
+import urllib.parse
+import urllib.request
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 
 VERSION = "0.01.9"
 CONTAINER_NAME = "corelink"
 IMAGE_NAME = "corelink:latest"
-REPO_RAW_URL = "https://raw.githubusercontent.com/MachoDrone/CoreLink/main"
+REPO_RAW_URL = os.environ.get(
+    "CORELINK_REPO_URL",
+    "https://raw.githubusercontent.com/MachoDrone/CoreLink/main",
+)
+MANIFEST_NAME = "MANIFEST.sha256"
+DOWNLOAD_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".corelink", "cache")
+DOWNLOAD_WORKERS = 6
+DOWNLOAD_RETRIES = 3
 
 CA_DIR = os.path.join(os.path.expanduser("~"), ".corelink", "ca")
 CA_CERT_PATH = os.path.join(CA_DIR, "ca.pem")
 CA_KEY_PATH = os.path.join(CA_DIR, "ca-key.pem")
+CERT_VERIFY_CACHE = os.path.join(os.path.expanduser("~"), ".corelink", "verified.json")
+CERT_RENEW_DAYS = 30
+HOSTNAME_RE = re.compile(r"^[A-Za-z0-9]([A-Za-z0-9.-]{0,251}[A-Za-z0-9])?$")
+_verify_lock = threading.Lock()
+
+PREREQ_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".corelink", "prereqs.json")
+PREREQ_CACHE_TTL = 24 * 3600
 
 CONTAINER_FILES = [
     "container/Dockerfile",
@@ -44,9 +70,25 @@ CONTAINER_FILES = [
     "container/app/templates/console.html",
     "container/app/static/css/style.css",
     "container/app/static/js/app.js",
+    "container/app/static/js/render.js",
+    "container/app/static/js/gputable.js",
+    "container/app/static/js/state_worker.js",
+    "container/app/static/js/bench.js",
+    "container/app/static/bench.html",
     "container/app/nosana/package.json",
     "container/app/nosana/nosana_probe.mjs",
     "container/app/nosana.py",
+    "container/app/views.py",
+    "container/app/startup.py",
+    "container/app/inventory.py",
+    "container/app/telemetry.py",
+    "container/app/groups.py",
+    "container/app/nettest.py",
+    "container/app/latency.py",
+    "container/app/clocksync.py",
+    "container/app/static/js/nettest.js",
+    "container/app/loadtest.py",
+    "container/app/profiling.py",
 ]
 
 
@@ -57,11 +99,32 @@ def print_banner():
     print("  %sCoreLink v%s%s" % (green, VERSION, reset))
     print("  GPU Cluster Communication Framework")
     print("  " + "=" * 40)
-    sys.stdout.flush()
-    time.sleep(3)
     print("")
 
 
+class StepTimer:
+    """Collect wall-clock timings for launcher steps."""
+
+    def __init__(self):
+        self.steps = []
+        self._start = time.monotonic()
+
+    @contextmanager
+    def step(self, name):
+        t0 = time.monotonic()
+        try:
+            yield
+        finally:
+            self.steps.append((name, time.monotonic() - t0))
+
+    def report(self):
+        if not self.steps:
+            return
+        parts = ["%s %.2fs" % step for step in self.steps]
+        parts.append("total %.2fs" % (time.monotonic() - self._start))
+        print("[*] Timings: %s" % ", ".join(parts))
+
+
 def run_cmd(cmd, check=True, capture=True, timeout=60):
     """Run a shell command and return the result."""
     try:
@@ -84,114 +147,180 @@ def run_cmd(cmd, check=True, capture=True, timeout=60):
 
 def check_ubuntu():
     """Verify running Ubuntu 20-24."""
-    sys.stdout.write("[*] Checking Ubuntu version... ")
-    sys.stdout.flush()
-
     osrel = "/etc/os-release"
     if not os.path.isfile(osrel):
-        print("FAIL - /etc/os-release not found")
-        return False
+        return False, "FAIL - /etc/os-release not found"
 
     with open(osrel) as fh:
         content = fh.read()
 
     if "ubuntu" not in content.lower():
-        print("FAIL - Not Ubuntu")
-        return False
+        return False, "FAIL - Not Ubuntu"
 
     match = re.search(r'VERSION_ID="(\d+)', content)
     if not match:
-        print("FAIL - Cannot determine version")
-        return False
+        return False, "FAIL - Cannot determine version"
 
     major = int(match.group(1))
     if major < 20 or major > 24:
-        print("FAIL - Ubuntu %d not supported (need 20-24)" % major)
-        return False
+        return False, "FAIL - Ubuntu %d not supported (need 20-24)" % major
 
-    print("OK (Ubuntu %d)" % major)
-    return True
+    return True, "OK (Ubuntu %d)" % major
 
 
 def check_nvidia_gpu():
     """Check for one or more NVIDIA GPUs via nvidia-smi."""
-    sys.stdout.write("[*] Checking NVIDIA GPU... ")
-    sys.stdout.flush()
-
     result = run_cmd("nvidia-smi --query-gpu=name --format=csv,noheader")
     if result is None or result.returncode != 0:
-        print("FAIL - nvidia-smi not found or no GPU detected")
-        return False
+        return False, "FAIL - nvidia-smi not found or no GPU detected"
 
     gpus = [g.strip() for g in result.stdout.strip().split("\n") if g.strip()]
     if not gpus:
-        print("FAIL - No NVIDIA GPUs found")
-        return False
+        return False, "FAIL - No NVIDIA GPUs found"
 
-    print("OK (%d GPU(s): %s)" % (len(gpus), ", ".join(gpus)))
-    return True
+    return True, "OK (%d GPU(s): %s)" % (len(gpus), ", ".join(gpus))
 
 
 def check_nvidia_container_toolkit():
     """Check for NVIDIA Container Toolkit."""
-    sys.stdout.write("[*] Checking NVIDIA Container Toolkit... ")
-    sys.stdout.flush()
-
     if shutil.which("nvidia-ctk"):
-        print("OK (nvidia-ctk found)")
-        return True
+        return True, "OK (nvidia-ctk found)"
 
     if shutil.which("nvidia-container-runtime"):
-        print("OK (nvidia-container-runtime found)")
-        return True
+        return True, "OK (nvidia-container-runtime found)"
 
     # Check Docker daemon config for nvidia runtime
     daemon_cfg = "/etc/docker/daemon.json"
     if os.path.isfile(daemon_cfg):
         with open(daemon_cfg) as fh:
             if "nvidia" in fh.read():
-                print("OK (nvidia runtime in daemon.json)")
-                return True
+                return True, "OK (nvidia runtime in daemon.json)"
 
-    print("FAIL - NVIDIA Container Toolkit not found")
-    return False
+    return False, "FAIL - NVIDIA Container Toolkit not found"
 
 
 def check_docker():
-    """Check Docker is installed and accessible."""
-    sys.stdout.write("[*] Checking Docker... ")
-    sys.stdout.flush()
-
+    """Check the Docker CLI is installed."""
     result = run_cmd("docker --version")
     if result is None or result.returncode != 0:
-        print("FAIL - Docker not found")
-        return False
+        return False, "FAIL - Docker not found"
 
-    version_str = result.stdout.strip()
-    print("OK (%s)" % version_str)
+    return True, "OK (%s)" % result.stdout.strip()
 
-    result = run_cmd("docker info", check=False)
+
+def check_docker_daemon():
+    """Check the Docker daemon is running and reachable by this user."""
+    result = run_cmd("docker info --format '{{.ServerVersion}}'", check=False)
     if result is None or result.returncode != 0:
-        print("  [!] Cannot connect to Docker daemon.")
-        print("      Try: sudo usermod -aG docker $USER  (then re-login)")
-        print("      Or run this script with sudo.")
-        return False
+        return False, (
+            "FAIL\n"
+            "  [!] Cannot connect to Docker daemon.\n"
+            "      Try: sudo usermod -aG docker $USER  (then re-login)\n"
+            "      Or run this script with sudo."
+        )
 
-    return True
+    return True, "OK (server %s)" % result.stdout.strip()
 
 
-def check_prerequisites():
-    """Run all prerequisite checks. Return True if all pass."""
-    print("Checking prerequisites...\n")
+# Static host facts: results are cached while prereq_fingerprint() holds
+PREREQ_CHECKS = [
+    ("Ubuntu version", check_ubuntu),
+    ("NVIDIA GPU", check_nvidia_gpu),
+    ("NVIDIA Container Toolkit", check_nvidia_container_toolkit),
+    ("Docker", check_docker),
+]
+
+# Runtime state (daemon up, docker group membership): never cached
+LIVE_CHECKS = [
+    ("Docker daemon", check_docker_daemon),
+]
 
-    results = [
-        check_ubuntu(),
-        check_nvidia_gpu(),
-        check_nvidia_container_toolkit(),
-        check_docker(),
-    ]
 
-    if all(results):
+def prereq_fingerprint():
+    """Hash the host facts the prerequisite results depend on.
+
+    Covers the kernel, OS release, NVIDIA driver version and GPU list
+    (from /proc, no nvidia-smi fork), and the identity (path, size,
+    mtime) of the docker/dockerd/NVIDIA binaries, so upgrading any of
+    them invalidates the cached result without running a single command.
+    """
+    parts = [VERSION, platform.release()]
+    for path in ("/etc/os-release", "/proc/driver/nvidia/version",
+                 "/etc/docker/daemon.json"):
+        try:
+            with open(path) as fh:
+                parts.append(fh.read())
+        except OSError:
+            parts.append("-")
+    try:
+        parts.append(",".join(sorted(os.listdir("/proc/driver/nvidia/gpus"))))
+    except OSError:
+        parts.append("-")
+    for binary in ("docker", "dockerd", "nvidia-smi", "nvidia-ctk",
+                   "nvidia-container-runtime"):
+        path = shutil.which(binary)
+        try:
+            st = os.stat(path) if path else None
+        except OSError:
+            st = None
+        parts.append("%s:%d:%d" % (path, st.st_size, int(st.st_mtime))
+                     if st else "%s:-" % binary)
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+def _load_prereq_cache(fingerprint):
+    try:
+        with open(PREREQ_CACHE_PATH) as fh:
+            data = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    if (data.get("fingerprint") != fingerprint
+            or time.time() - data.get("checked_at", 0) > PREREQ_CACHE_TTL):
+        return None
+    results = data.get("results")
+    if not isinstance(results, list) or len(results) != len(PREREQ_CHECKS):
+        return None
+    return results
+
+
+def _save_prereq_cache(fingerprint, results):
+    try:
+        os.makedirs(os.path.dirname(PREREQ_CACHE_PATH), mode=0o700, exist_ok=True)
+        tmp = PREREQ_CACHE_PATH + ".tmp"
+        with open(tmp, "w") as fh:
+            json.dump({"fingerprint": fingerprint, "checked_at": time.time(),
+                       "results": results}, fh)
+        os.replace(tmp, PREREQ_CACHE_PATH)
+    except OSError:
+        pass
+
+
+def check_prerequisites(use_cache=True):
+    """Run all prerequisite checks. Return True if all pass.
+
+    Checks run concurrently.  When every PREREQ_CHECKS entry passes, their
+    results are cached in ~/.corelink/prereqs.json and reused while the
+    host fingerprint is unchanged (at most PREREQ_CACHE_TTL seconds);
+    failures are never cached.  LIVE_CHECKS (daemon reachability, docker
+    group membership) run every time.
+    """
+    fingerprint = prereq_fingerprint()
+    results = _load_prereq_cache(fingerprint) if use_cache else None
+    cached = results is not None
+    checks = LIVE_CHECKS if cached else PREREQ_CHECKS + LIVE_CHECKS
+
+    print("Checking prerequisites...%s\n" % (" (cached)" if cached else ""))
+    with ThreadPoolExecutor(max_workers=len(checks)) as pool:
+        futures = [pool.submit(func) for _, func in checks]
+        results = (results if cached else []) + [list(f.result()) for f in futures]
+
+    for (label, _), (ok, detail) in zip(PREREQ_CHECKS + LIVE_CHECKS, results):
+        print("[*] Checking %s... %s" % (label, detail))
+
+    static = results[:len(PREREQ_CHECKS)]
+    if not cached and all(ok for ok, _ in static):
+        _save_prereq_cache(fingerprint, static)
+    if all(ok for ok, _ in results):
         print("\n[OK] All prerequisites met.\n")
         return True
     else:
@@ -225,30 +354,210 @@ def find_container_dir():
     return None
 
 
-def download_container_files():
-    """Download container build files from GitHub into a temp directory."""
-    print("[*] Downloading container files from GitHub...")
+def _sha256_file(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(65536), b""):
+            h.update(chunk)
+    return h.hexdigest()
 
-    build_dir = tempfile.mkdtemp(prefix="corelink-build-")
 
+def _atomic_write(path, data):
+    tmp = "%s.%d.tmp" % (path, threading.get_ident())
+    with open(tmp, "wb") as fh:
+        fh.write(data)
+    os.replace(tmp, path)
+
+
+def parse_manifest(text):
+    """Parse sha256sum-style lines into {rel_path: hex_digest}."""
+    manifest = {}
+    for line in text.splitlines():
+        parts = line.strip().split(None, 1)
+        if len(parts) == 2 and re.match(r"^[0-9a-f]{64}$", parts[0]):
+            manifest[parts[1].lstrip("*")] = parts[0]
+    return manifest
+
+
+def write_manifest(repo_root):
+    """Regenerate MANIFEST.sha256 for CONTAINER_FILES (maintainer helper)."""
+    lines = []
+    for rel_path in CONTAINER_FILES:
+        path = os.path.join(repo_root, rel_path)
+        if not os.path.isfile(path):
+            print("[FAIL] Missing %s" % rel_path)
+            return False
+        lines.append("%s  %s\n" % (_sha256_file(path), rel_path))
+    dest = os.path.join(repo_root, MANIFEST_NAME)
+    with open(dest, "w") as fh:
+        fh.writelines(lines)
+    print("[OK] Wrote %s (%d files)" % (dest, len(lines)))
+    return True
+
+
+class _Fetcher:
+    """Keep-alive GETs against one base URL, with retries.
+
+    Each download thread owns one fetcher, so every thread reuses a single
+    HTTP(S) connection for all of its files.  When a proxy is configured
+    for the scheme, requests go through urllib instead (no reuse).
+    """
+
+    def __init__(self, base_url, timeout=30):
+        parts = urllib.parse.urlsplit(base_url)
+        self._base_url = base_url.rstrip("/")
+        self._prefix = parts.path.rstrip("/")
+        self._host = parts.netloc
+        self._timeout = timeout
+        self._conn_cls = (http.client.HTTPSConnection if parts.scheme == "https"
+                          else http.client.HTTPConnection)
+        self._proxied = (parts.scheme in urllib.request.getproxies()
+                         and not urllib.request.proxy_bypass(parts.hostname or ""))
+        self._conn = None
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _get_once(self, rel_path):
+        path = urllib.parse.quote(rel_path)
+        if self._proxied:
+            try:
+                with urllib.request.urlopen("%s/%s" % (self._base_url, path),
+                                            timeout=self._timeout) as resp:
+                    return resp.status, resp.read()
+            except urllib.error.HTTPError as exc:
+                return exc.code, b""
+        if self._conn is None:
+            self._conn = self._conn_cls(self._host, timeout=self._timeout)
+        self._conn.request("GET", "%s/%s" % (self._prefix, path),
+                           headers={"User-Agent": "corelink/%s" % VERSION})
+        resp = self._conn.getresponse()
+        return resp.status, resp.read()
+
+    def get(self, rel_path):
+        """Return the file body; raise FileNotFoundError on 404, IOError otherwise."""
+        error = None
+        for attempt in range(DOWNLOAD_RETRIES):
+            if attempt:
+                time.sleep(0.5 * 2 ** (attempt - 1))
+            try:
+                status, body = self._get_once(rel_path)
+            except (OSError, http.client.HTTPException) as exc:
+                self.close()  # stale keep-alive or network error: reconnect
+                error = exc
+                continue
+            if status == 200:
+                return body
+            if status == 404:
+                raise FileNotFoundError(rel_path)
+            error = "HTTP %d" % status
+            if status < 500 and status != 429:
+                break
+        raise IOError("%s: %s" % (rel_path, error))
+
+
+def download_container_files(base_url=None, cache_dir=None):
+    """Download container build files into a temp directory.
+
+    MANIFEST.sha256 is fetched first; files whose hash is already in the
+    content-addressed cache (~/.corelink/cache) are copied from there,
+    the rest are fetched concurrently over reused connections, verified
+    against the manifest, and added to the cache.  Without a manifest
+    every file is fetched and nothing is verified or cached.
+    """
+    base_url = base_url or REPO_RAW_URL
+    cache_dir = cache_dir or DOWNLOAD_CACHE_DIR
+    print("[*] Downloading container files from %s ..." % base_url)
+
+    fetcher = _Fetcher(base_url)
+    try:
+        manifest = parse_manifest(fetcher.get(MANIFEST_NAME).decode("utf-8"))
+    except FileNotFoundError:
+        print("  [!] No %s found; files will not be verified." % MANIFEST_NAME)
+        manifest = {}
+    except (IOError, UnicodeDecodeError) as exc:
+        print("  [!] Failed to download %s: %s" % (MANIFEST_NAME, exc))
+        return None
+    finally:
+        fetcher.close()
+
+    if manifest:
+        missing = [p for p in CONTAINER_FILES if p not in manifest]
+        if missing:
+            print("  [!] %s does not list: %s" % (MANIFEST_NAME, ", ".join(missing)))
+            return None
+        os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+
+    build_dir = tempfile.mkdtemp(prefix="corelink-build-")
+    pending = queue.Queue()
     for rel_path in CONTAINER_FILES:
-        url = "%s/%s" % (REPO_RAW_URL, rel_path)
         dest = os.path.join(build_dir, rel_path)
         os.makedirs(os.path.dirname(dest), exist_ok=True)
-
+        digest = manifest.get(rel_path)
+        cached = os.path.join(cache_dir, digest) if digest else None
+        if cached and os.path.isfile(cached) and _sha256_file(cached) == digest:
+            shutil.copyfile(cached, dest)
+        else:
+            pending.put(rel_path)
+    to_fetch = pending.qsize()
+
+    errors = []
+
+    def worker():
+        fetcher = _Fetcher(base_url)
         try:
-            urllib.request.urlretrieve(url, dest)
-        except urllib.error.URLError as exc:
-            print("  [!] Failed to download %s: %s" % (rel_path, exc))
-            shutil.rmtree(build_dir, ignore_errors=True)
-            return None
+            while True:
+                try:
+                    rel_path = pending.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    body = fetcher.get(rel_path)
+                except IOError as exc:
+                    errors.append(str(exc))
+                    continue
+                digest = hashlib.sha256(body).hexdigest()
+                if manifest and digest != manifest[rel_path]:
+                    errors.append("%s: sha256 mismatch" % rel_path)
+                    continue
+                _atomic_write(os.path.join(build_dir, rel_path), body)
+                if manifest:
+                    _atomic_write(os.path.join(cache_dir, digest), body)
+        finally:
+            fetcher.close()
+
+    workers = min(DOWNLOAD_WORKERS, to_fetch)
+    if workers:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for _ in range(workers):
+                pool.submit(worker)
+
+    if errors:
+        for err in sorted(errors):
+            print("  [!] Failed to download %s" % err)
+        shutil.rmtree(build_dir, ignore_errors=True)
+        return None
+
+    # Drop cache entries no longer referenced by the manifest
+    if manifest:
+        keep = set(manifest.values())
+        for name in os.listdir(cache_dir):
+            if name not in keep:
+                try:
+                    os.remove(os.path.join(cache_dir, name))
+                except OSError:
+                    pass
 
     # Make entrypoint executable
     entrypoint = os.path.join(build_dir, "container", "entrypoint.sh")
     if os.path.isfile(entrypoint):
         os.chmod(entrypoint, 0o755)
 
-    print("  Downloaded %d files to %s" % (len(CONTAINER_FILES), build_dir))
+    print("  %d files in %s (%d downloaded, %d from cache)"
+          % (len(CONTAINER_FILES), build_dir, to_fetch,
+             len(CONTAINER_FILES) - to_fetch))
     return os.path.join(build_dir, "container")
 
 
@@ -256,6 +565,31 @@ def download_container_files():
 # TLS certificate management (local CA)
 # ---------------------------------------------------------------------------
 
+def _openssl(args, input=None, timeout=30):
+    """Run openssl with an argument list (no shell); return result or None."""
+    try:
+        result = subprocess.run(
+            ["openssl"] + args, input=input, capture_output=True,
+            text=True, timeout=timeout,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return result if result.returncode == 0 else None
+
+
+def _newkey_options():
+    """Yield openssl -newkey arguments, preferred key type first.
+
+    ECDSA P-256 keys are generated in milliseconds (RSA-2048 takes tens
+    to hundreds) and are accepted by every current browser; Ed25519 is
+    not, so it is not used for TLS.  Set CORELINK_CERT_KEY=rsa to force
+    RSA.
+    """
+    if os.environ.get("CORELINK_CERT_KEY", "ec").lower() != "rsa":
+        yield ["-newkey", "ec", "-pkeyopt", "ec_paramgen_curve:prime256v1"]
+    yield ["-newkey", "rsa:2048"]
+
+
 def ensure_ca():
     """Create a local CA root cert + key if not already present."""
     if os.path.isfile(CA_CERT_PATH) and os.path.isfile(CA_KEY_PATH):
@@ -265,24 +599,22 @@ def ensure_ca():
     os.makedirs(CA_DIR, mode=0o700, exist_ok=True)
     print("[*] Generating CoreLink local CA...")
 
-    result = run_cmd(
-        'openssl genrsa -out "%s" 4096' % CA_KEY_PATH, timeout=30
-    )
-    if result is None:
-        print("[FAIL] Could not generate CA key.")
-        return False
-    os.chmod(CA_KEY_PATH, 0o600)
-
-    result = run_cmd(
-        'openssl req -x509 -new -nodes '
-        '-key "%s" -sha256 -days 3650 '
-        '-subj "/CN=CoreLink Local CA/O=CoreLink" '
-        '-out "%s"' % (CA_KEY_PATH, CA_CERT_PATH),
-        timeout=30,
-    )
+    # Key and self-signed root in one openssl call
+    result = None
+    for newkey in _newkey_options():
+        result = _openssl(
+            ["req", "-x509", "-new", "-nodes"] + newkey + [
+                "-keyout", CA_KEY_PATH, "-sha256", "-days", "3650",
+                "-subj", "/CN=CoreLink Local CA/O=CoreLink",
+                "-out", CA_CERT_PATH,
+            ]
+        )
+        if result is not None:
+            break
     if result is None:
         print("[FAIL] Could not generate CA certificate.")
         return False
+    os.chmod(CA_KEY_PATH, 0o600)
     os.chmod(CA_CERT_PATH, 0o644)
 
     print("[OK] CA certificate: %s" % CA_CERT_PATH)
@@ -313,18 +645,29 @@ def get_host_ips():
     return sorted(ips)
 
 
-def generate_node_cert(hostname, ips):
+def node_cert_paths(hostname):
+    """Return (cert_path, key_path) for *hostname* under ~/.corelink/nodes."""
+    node_dir = os.path.join(
+        os.path.expanduser("~"), ".corelink", "nodes", hostname
+    )
+    return os.path.join(node_dir, "cert.pem"), os.path.join(node_dir, "key.pem")
+
+
+def generate_node_cert(hostname, ips, verbose=True):
     """Generate a server cert signed by the local CA with SANs.
 
+    Two openssl calls: one creates the key and CSR (CSR on stdout), one
+    signs it.  A random serial replaces -CAcreateserial so concurrent
+    batch issuing does not race on ca.srl.
+
     Returns (cert_path, key_path) on success, (None, None) on failure.
     """
-    node_dir = os.path.join(
-        os.path.expanduser("~"), ".corelink", "nodes", hostname
-    )
-    cert_path = os.path.join(node_dir, "cert.pem")
-    key_path = os.path.join(node_dir, "key.pem")
+    if not HOSTNAME_RE.match(hostname):
+        print("[FAIL] Invalid hostname: %r" % hostname)
+        return None, None
 
-    os.makedirs(node_dir, mode=0o700, exist_ok=True)
+    cert_path, key_path = node_cert_paths(hostname)
+    os.makedirs(os.path.dirname(cert_path), mode=0o700, exist_ok=True)
 
     # Build SAN list
     sans = [
@@ -337,86 +680,223 @@ def generate_node_cert(hostname, ips):
         sans.append("IP:%s" % ip)
     san_string = ",".join(sans)
 
-    print("[*] Generating node certificate for %s..." % hostname)
-    print("    SANs: %s" % san_string)
-
-    # Generate node private key
-    result = run_cmd('openssl genrsa -out "%s" 2048' % key_path, timeout=30)
-    if result is None:
-        print("[FAIL] Could not generate node key.")
+    if verbose:
+        print("[*] Generating node certificate for %s..." % hostname)
+        print("    SANs: %s" % san_string)
+
+    # Node private key + CSR
+    csr = None
+    for newkey in _newkey_options():
+        csr = _openssl(
+            ["req", "-new", "-nodes"] + newkey + [
+                "-keyout", key_path, "-subj", "/CN=%s/O=CoreLink" % hostname,
+            ]
+        )
+        if csr is not None:
+            break
+    if csr is None:
+        print("[FAIL] Could not generate node key for %s." % hostname)
         return None, None
     os.chmod(key_path, 0o600)
 
-    # Generate CSR
-    csr_path = os.path.join(node_dir, "node.csr")
-    result = run_cmd(
-        'openssl req -new -key "%s" '
-        '-subj "/CN=%s/O=CoreLink" '
-        '-out "%s"' % (key_path, hostname, csr_path),
-        timeout=30,
-    )
+    # Sign with CA (CSR on stdin, extensions from a throwaway file)
+    with tempfile.NamedTemporaryFile("w", suffix=".ext") as ext:
+        ext.write("authorityKeyIdentifier=keyid,issuer\n")
+        ext.write("basicConstraints=CA:FALSE\n")
+        # keyEncipherment is RSA key transport; EC keys only sign
+        if newkey[1] == "ec":
+            ext.write("keyUsage=digitalSignature\n")
+        else:
+            ext.write("keyUsage=digitalSignature,keyEncipherment\n")
+        ext.write("extendedKeyUsage=serverAuth\n")
+        ext.write("subjectAltName=%s\n" % san_string)
+        ext.flush()
+        result = _openssl(
+            ["x509", "-req", "-in", "/dev/stdin",
+             "-CA", CA_CERT_PATH, "-CAkey", CA_KEY_PATH,
+             "-set_serial", "0x%x" % secrets.randbits(63),
+             "-out", cert_path, "-days", "825", "-sha256",
+             "-extfile", ext.name],
+            input=csr.stdout,
+        )
     if result is None:
-        print("[FAIL] Could not generate CSR.")
+        print("[FAIL] Could not sign node certificate for %s." % hostname)
         return None, None
 
-    # Create SAN extension file
-    ext_path = os.path.join(node_dir, "san.ext")
-    with open(ext_path, "w") as fh:
-        fh.write("authorityKeyIdentifier=keyid,issuer\n")
-        fh.write("basicConstraints=CA:FALSE\n")
-        fh.write("keyUsage=digitalSignature,keyEncipherment\n")
-        fh.write("extendedKeyUsage=serverAuth\n")
-        fh.write("subjectAltName=%s\n" % san_string)
+    # Freshly signed by our CA: record it as verified
+    info = read_cert_info(cert_path)
+    if info is not None:
+        _record_verified(cert_path, info["sha256"])
+
+    if verbose:
+        print("[OK] Node certificate generated: %s" % cert_path)
+    return cert_path, key_path
+
+
+def issue_certs(specs):
+    """Batch-issue node certs for ``[(hostname, [ip, ...]), ...]``.
+
+    Hosts are signed in parallel; returns the number of failures.
+    """
+    invalid = [host for host, _ in specs if not HOSTNAME_RE.match(host)]
+    for host in invalid:
+        print("[FAIL] Invalid hostname: %r" % host)
+    specs = [spec for spec in specs if spec[0] not in invalid]
+    if not specs or not ensure_ca():
+        return len(specs) + len(invalid)
+    failures = len(invalid)
+    workers = min(len(specs), os.cpu_count() or 4) or 1
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [(host, ips, pool.submit(generate_node_cert, host, ips, False))
+                   for host, ips in specs]
+        for host, ips, future in futures:
+            cert_path, _ = future.result()
+            if cert_path is None:
+                failures += 1
+            else:
+                print("[OK] %s -> %s%s" % (
+                    host, cert_path, " (%s)" % ", ".join(ips) if ips else ""))
+    print("%d issued, %d failed" % (len(specs) + len(invalid) - failures, failures))
+    return failures
+
+
+# ---- In-process certificate inspection (minimal DER reader) ----
+
+_SAN_OID = b"\x06\x03\x55\x1d\x11"  # 2.5.29.17 subjectAltName
+
+
+def _der_element(data, pos):
+    """Return (tag, content_start, content_end) of the element at *pos*."""
+    tag = data[pos]
+    length = data[pos + 1]
+    pos += 2
+    if length & 0x80:
+        count = length & 0x7F
+        length = int.from_bytes(data[pos:pos + count], "big")
+        pos += count
+    return tag, pos, pos + length
+
+
+def _der_children(data, start, end):
+    children = []
+    while start < end:
+        child = _der_element(data, start)
+        children.append(child)
+        start = child[2]
+    return children
+
+
+def _der_time(data, tag, start, end):
+    text = data[start:end].decode("ascii").rstrip("Z")
+    if tag == 0x17:  # UTCTime: YYMMDDHHMMSS
+        year = int(text[:2])
+        text = ("19" if year >= 50 else "20") + text
+    return calendar.timegm(time.strptime(text[:14], "%Y%m%d%H%M%S"))
+
+
+def parse_cert_der(der):
+    """Extract expiry and SANs from a DER certificate without openssl.
+
+    Returns {"sha256", "not_after", "dns": [...], "ips": [...]}.
+    Raises ValueError (or IndexError) on malformed input.
+    """
+    _, start, end = _der_element(der, 0)
+    _, tbs_start, tbs_end = _der_children(der, start, end)[0]
+    tbs = _der_children(der, tbs_start, tbs_end)
+    if tbs[0][0] == 0xA0:  # explicit version
+        tbs = tbs[1:]
+    # serial, signature, issuer, validity, subject, spki, [1], [2], [3]
+    validity = _der_children(der, tbs[3][1], tbs[3][2])
+    not_after = _der_time(der, *validity[1])
+
+    dns, ips = [], []
+    for tag, ext_start, ext_end in tbs[6:]:
+        if tag != 0xA3:
+            continue
+        _, seq_start, seq_end = _der_element(der, ext_start)
+        for _, e_start, e_end in _der_children(der, seq_start, seq_end):
+            if der[e_start:e_start + len(_SAN_OID)] != _SAN_OID:
+                continue
+            value = _der_children(der, e_start, e_end)[-1]  # OCTET STRING
+            _, n_start, n_end = _der_element(der, value[1])
+            for n_tag, v_start, v_end in _der_children(der, n_start, n_end):
+                raw = der[v_start:v_end]
+                if n_tag == 0x82:
+                    dns.append(raw.decode("ascii"))
+                elif n_tag == 0x87 and len(raw) in (4, 16):
+                    ips.append(str(ipaddress.ip_address(raw)))
+
+    return {
+        "sha256": hashlib.sha256(der).hexdigest(),
+        "not_after": not_after,
+        "dns": dns,
+        "ips": ips,
+    }
+
+
+def read_cert_info(cert_path):
+    """Parse the PEM at *cert_path* once; None if missing or unreadable."""
+    try:
+        with open(cert_path) as fh:
+            der = ssl.PEM_cert_to_DER_cert(fh.read())
+        return parse_cert_der(der)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _load_verified():
+    try:
+        with open(CERT_VERIFY_CACHE) as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
 
-    # Sign with CA
-    result = run_cmd(
-        'openssl x509 -req -in "%s" '
-        '-CA "%s" -CAkey "%s" -CAcreateserial '
-        '-out "%s" -days 825 -sha256 '
-        '-extfile "%s"' % (csr_path, CA_CERT_PATH, CA_KEY_PATH,
-                           cert_path, ext_path),
-        timeout=30,
-    )
-    if result is None:
-        print("[FAIL] Could not sign node certificate.")
-        return None, None
 
-    # Clean up temp files
-    for tmp in (csr_path, ext_path):
+def _record_verified(cert_path, cert_sha256):
+    """Remember that *cert_path* (by fingerprint) chains to the current CA."""
+    with _verify_lock:
+        cache = _load_verified()
         try:
-            os.remove(tmp)
+            cache[cert_path] = [cert_sha256, _sha256_file(CA_CERT_PATH)]
+            _atomic_write(CERT_VERIFY_CACHE, json.dumps(cache).encode("utf-8"))
         except OSError:
             pass
 
-    print("[OK] Node certificate generated: %s" % cert_path)
-    return cert_path, key_path
+
+def _chain_verified(cert_path, cert_sha256):
+    """True if the cert chains to the CA; openssl only runs on a cache miss."""
+    try:
+        ca_sha256 = _sha256_file(CA_CERT_PATH)
+    except OSError:
+        return False
+    if _load_verified().get(cert_path) == [cert_sha256, ca_sha256]:
+        return True
+    result = _openssl(["verify", "-CAfile", CA_CERT_PATH, cert_path])
+    if result is None or "OK" not in result.stdout:
+        return False
+    _record_verified(cert_path, cert_sha256)
+    return True
 
 
 def needs_cert_regen(cert_path):
-    """Check if the existing cert needs regeneration."""
-    if not os.path.isfile(cert_path):
-        return True
+    """Check if the existing cert needs regeneration.
 
-    # Verify cert against CA
-    result = run_cmd(
-        'openssl verify -CAfile "%s" "%s"' % (CA_CERT_PATH, cert_path)
-    )
-    if result is None or "OK" not in result.stdout:
+    The PEM is parsed in-process for expiry and SAN IPs; the CA chain is
+    checked with openssl only when the cert or CA fingerprint changed
+    since the last successful check.
+    """
+    info = read_cert_info(cert_path)
+    if info is None:
         return True
 
-    # Check SANs include current IPs
-    result = run_cmd(
-        'openssl x509 -in "%s" -noout -ext subjectAltName' % cert_path
-    )
-    if result is None:
+    if info["not_after"] - time.time() < CERT_RENEW_DAYS * 86400:
         return True
 
-    current_ips = get_host_ips()
-    for ip in current_ips:
-        if ("IP Address:%s" % ip) not in result.stdout:
+    for ip in get_host_ips():
+        if ip not in info["ips"]:
             return True
 
-    return False
+    return not _chain_verified(cert_path, info["sha256"])
 
 
 def get_ca_command():
@@ -482,38 +962,52 @@ def image_exists():
     return result is not None and result.stdout.strip() != ""
 
 
-def start_container(port=443, regen_cert=False):
-    """Start the CoreLink container."""
-    # Already running?
-    result = run_cmd("docker ps -q -f name=^/%s$" % CONTAINER_NAME)
-    if result and result.stdout.strip():
+def container_state():
+    """Return "running", "stopped", or None if the container does not exist."""
+    result = run_cmd(
+        "docker inspect --type container -f '{{.State.Running}}' %s"
+        % CONTAINER_NAME
+    )
+    if result is None:
+        return None
+    return "running" if result.stdout.strip() == "true" else "stopped"
+
+
+def start_container(port=443, regen_cert=False, state=None, timer=None):
+    """Start the CoreLink container.
+
+    *state* may carry a container_state() result the caller already
+    fetched (e.g. concurrently with the prerequisite checks).
+    """
+    timer = timer or StepTimer()
+    if state is None:
+        state = container_state()
+    if state == "running":
         print("[!] Container '%s' is already running." % CONTAINER_NAME)
         print("    Use --stop first, or --restart.")
         return False
 
     # Remove stopped container with the same name
-    run_cmd("docker rm %s" % CONTAINER_NAME, check=False)
+    if state == "stopped":
+        run_cmd("docker rm %s" % CONTAINER_NAME, check=False)
 
     hostname = platform.node()
 
     # --- CA + node cert management ---
-    if not ensure_ca():
-        return False
+    with timer.step("certs"):
+        if not ensure_ca():
+            return False
 
-    ips = get_host_ips()
-    node_dir = os.path.join(
-        os.path.expanduser("~"), ".corelink", "nodes", hostname
-    )
-    cert_path = os.path.join(node_dir, "cert.pem")
-    key_path = os.path.join(node_dir, "key.pem")
+        ips = get_host_ips()
+        cert_path, key_path = node_cert_paths(hostname)
 
-    if regen_cert or needs_cert_regen(cert_path):
-        cert_path, key_path = generate_node_cert(hostname, ips)
-        if cert_path is None:
-            print("[FAIL] Could not generate node certificate.")
-            return False
-    else:
-        print("[*] Node certificate is current: %s" % cert_path)
+        if regen_cert or needs_cert_regen(cert_path):
+            cert_path, key_path = generate_node_cert(hostname, ips)
+            if cert_path is None:
+                print("[FAIL] Could not generate node certificate.")
+                return False
+        else:
+            print("[*] Node certificate is current: %s" % cert_path)
 
     cmd = [
         "docker", "run", "-d",
@@ -530,12 +1024,16 @@ def start_container(port=443, regen_cert=False):
         "-v", "/var/run/docker.sock:/var/run/docker.sock",
         "-e", "CORELINK_PORT=%d" % port,
         "-e", "CORELINK_HOSTNAME=%s" % hostname,
-        "--restart", "unless-stopped",
-        IMAGE_NAME,
     ]
+    # Node grouping and network test settings, if set on the host
+    for name in ("CORELINK_GROUP", "CORELINK_GROUPS", "CORELINK_NETTEST_MAX_MBPS"):
+        if os.environ.get(name):
+            cmd += ["-e", "%s=%s" % (name, os.environ[name])]
+    cmd += ["--restart", "unless-stopped", IMAGE_NAME]
 
     print("[*] Starting container '%s' on port %d ..." % (CONTAINER_NAME, port))
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    with timer.step("docker run"):
+        result = subprocess.run(cmd, capture_output=True, text=True)
 
     if result.returncode != 0:
         print("[FAIL] %s" % result.stderr.strip())
@@ -598,6 +1096,8 @@ def main():
   %(prog)s --status           Show container status
   %(prog)s --logs             Show container logs
   %(prog)s --start --port 8443  Start on a custom port
+  %(prog)s --issue-certs gpu1=10.0.0.11 gpu2=10.0.0.12
+                              Pre-issue certs for other hosts
 
 Remote one-liner:
   python3 <(curl -sL https://raw.githubusercontent.com/MachoDrone/CoreLink/main/corelink.py) --start
@@ -626,6 +1126,12 @@ Remote one-liner:
                         help="Show CA certificate location and install instructions")
     parser.add_argument("--regen-cert", action="store_true",
                         help="Force regeneration of this node's TLS certificate")
+    parser.add_argument("--issue-certs", nargs="+", metavar="HOST[=IP,...]",
+                        help="Batch-issue CA-signed certs for other hosts "
+                        "into ~/.corelink/nodes/")
+    parser.add_argument("--write-manifest", action="store_true",
+                        help="Regenerate %s from local files (maintainers)"
+                        % MANIFEST_NAME)
     parser.add_argument("--version", action="version",
                         version="CoreLink v%s" % VERSION)
 
@@ -636,16 +1142,35 @@ Remote one-liner:
     action_flags = [
         args.check, args.build, args.start, args.stop,
         args.restart, args.status, args.logs, args.logs_follow,
-        args.get_ca, args.regen_cert,
+        args.get_ca, args.regen_cert, args.write_manifest, args.issue_certs,
     ]
     if not any(action_flags):
         parser.print_help()
         return 0
 
+    if args.write_manifest:
+        container_dir = find_container_dir()
+        if container_dir is None:
+            print("[FAIL] Run from a CoreLink checkout.")
+            return 1
+        return 0 if write_manifest(os.path.dirname(container_dir)) else 1
+
     # Quick actions that don't need prereq checks
     if args.get_ca:
         return get_ca_command()
 
+    if args.issue_certs:
+        specs = []
+        for item in args.issue_certs:
+            host, _, ips = item.partition("=")
+            try:
+                ips = [str(ipaddress.ip_address(ip)) for ip in ips.split(",") if ip]
+            except ValueError as exc:
+                print("[FAIL] %s" % exc)
+                return 1
+            specs.append((host, ips))
+        return 1 if issue_certs(specs) else 0
+
     if args.status:
         show_status()
         return 0
@@ -661,13 +1186,29 @@ Remote one-liner:
     if args.regen_cert and not args.start and not args.restart:
         args.start = True
 
+    timer = StepTimer()
+
     if args.restart:
-        stop_container()
+        with timer.step("stop"):
+            stop_container()
         args.start = True
 
-    # Actions that need prereq checks
+    # Actions that need prereq checks.  --check always re-runs them; the
+    # start path reuses a cached result and queries the image and
+    # container state while the checks run.
+    has_image = None
+    state = None
     if args.check or args.build or args.start:
-        if not check_prerequisites():
+        with timer.step("prereqs"), ThreadPoolExecutor(max_workers=2) as pool:
+            image_future = state_future = None
+            if args.start and not args.build:
+                image_future = pool.submit(image_exists)
+            if args.start:
+                state_future = pool.submit(container_state)
+            ok = check_prerequisites(use_cache=not args.check)
+            has_image = image_future.result() if image_future else None
+            state = state_future.result() if state_future else None
+        if not ok:
             return 1
 
     if args.check:
@@ -675,21 +1216,25 @@ Remote one-liner:
 
     # Build image if requested or if image doesn't exist and we're starting
     if args.build or args.start:
-        need_build = args.build or not image_exists()
+        need_build = args.build or not has_image
 
         if need_build:
-            container_dir = find_container_dir()
-            if container_dir is None:
-                container_dir = download_container_files()
+            with timer.step("build"):
+                container_dir = find_container_dir()
                 if container_dir is None:
-                    print("[FAIL] Cannot find or download container files.")
-                    return 1
+                    container_dir = download_container_files()
+                    if container_dir is None:
+                        print("[FAIL] Cannot find or download container files.")
+                        return 1
 
-            if not build_image(container_dir):
-                return 1
+                if not build_image(container_dir):
+                    return 1
 
     if args.start:
-        if not start_container(port=args.port, regen_cert=args.regen_cert):
+        ok = start_container(port=args.port, regen_cert=args.regen_cert,
+                             state=state, timer=timer)
+        timer.report()
+        if not ok:
             return 1
 
     return 0
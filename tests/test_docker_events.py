@@ -0,0 +1,190 @@
+"""DockerEventWatcher against a fake Docker daemon on a Unix socket."""
+
+import http.server
+import json
+import os
+import queue
+import shutil
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "container", "app"))
+
+import nosana  # noqa: E402
+from nosana import DockerEventWatcher  # noqa: E402
+
+
+class FakeDocker:
+    """Serves /containers/json and a line-delimited /events stream.
+
+    Put event dicts on ``events``; None ends the current stream (the
+    watcher then reconnects).  The stream is chunked HTTP/1.1 like dockerd,
+    or an HTTP/1.0 body delimited by connection close with *chunked* False.
+    """
+
+    def __init__(self, sock_path, chunked=True):
+        self.containers = []
+        self.requests = []
+        self.events = queue.Queue()
+        fake = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1" if chunked else "HTTP/1.0"
+
+            def do_GET(self):
+                path = self.path.split("?", 1)[0]
+                fake.requests.append(path)
+                if path == "/containers/json":
+                    body = json.dumps(fake.containers).encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                elif path == "/events":
+                    # Chunked, one JSON object per line, like dockerd
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    if chunked:
+                        self.send_header("Transfer-Encoding", "chunked")
+                    self.end_headers()
+                    self.wfile.flush()
+                    while True:
+                        event = fake.events.get()
+                        if event is None:
+                            if chunked:
+                                self.wfile.write(b"0\r\n\r\n")
+                            self.close_connection = True
+                            return
+                        line = json.dumps(event).encode("utf-8") + b"\n"
+                        if chunked:
+                            line = b"%x\r\n%s\r\n" % (len(line), line)
+                        self.wfile.write(line)
+                        self.wfile.flush()
+                else:
+                    self.send_error(404)
+
+            def log_message(self, *args):
+                pass
+
+        class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+            daemon_threads = True
+
+        self.server = Server(sock_path, Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.events.put(None)
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _container(cid, image, name):
+    return {"Id": cid, "Image": image, "Names": ["/" + name]}
+
+
+def _event(action, cid, image, name="n"):
+    return {"Type": "container", "Action": action,
+            "Actor": {"ID": cid, "Attributes": {"image": image, "name": name}}}
+
+
+def _wait(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+class DockerEventWatcherTest(unittest.TestCase):
+
+    chunked = True
+
+    def setUp(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        self.docker = FakeDocker(os.path.join(tmp, "docker.sock"), self.chunked)
+        self.docker.containers = [
+            _container("a1", "nosana/nosana-node:latest", "nosana-a"),
+            _container("b1", "postgres:16", "db"),
+        ]
+        patcher = mock.patch.object(nosana, "EVENTS_RETRY", 0.1)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.watcher = DockerEventWatcher(os.path.join(tmp, "docker.sock"))
+        self.watcher.start()
+        self.addCleanup(self.docker.close)
+        self.addCleanup(self.watcher.stop)
+        self.assertTrue(_wait(lambda: self.watcher.synced))
+
+    def _ids(self):
+        return sorted(c["Id"] for c in self.watcher.containers())
+
+    def test_seeds_from_container_list_after_subscribing(self):
+        self.assertEqual(self.docker.requests[:2], ["/events", "/containers/json"])
+        self.assertEqual(self._ids(), ["a1"])
+        self.assertTrue(self.watcher.consume_change())
+        self.assertFalse(self.watcher.consume_change())
+
+    def test_start_die_stop_events(self):
+        self.watcher.consume_change()
+
+        self.docker.events.put(_event("start", "a2", "nosana/nosana-node", "nosana-b"))
+        self.assertTrue(_wait(lambda: "a2" in self._ids()))
+        self.assertTrue(self.watcher.consume_change())
+        names = {c["Id"]: c["Names"] for c in self.watcher.containers()}
+        self.assertEqual(names["a2"], ["/nosana-b"])
+
+        # Other images and repeated starts are not changes
+        self.docker.events.put(_event("start", "c1", "redis:7"))
+        self.docker.events.put(_event("start", "a2", "nosana/nosana-node", "nosana-b"))
+        self.docker.events.put(_event("die", "a1", "nosana/nosana-node"))
+        self.assertTrue(_wait(lambda: "a1" not in self._ids()))
+        self.assertEqual(self._ids(), ["a2"])
+        self.assertTrue(self.watcher.consume_change())
+
+        self.docker.events.put(_event("stop", "a2", "nosana/nosana-node"))
+        self.assertTrue(_wait(lambda: self._ids() == []))
+        self.assertTrue(self.watcher.consume_change())
+
+        self.docker.events.put(_event("stop", "zz", "nosana/nosana-node"))
+        self.docker.events.put(_event("start", "a3", "nosana/nosana-node"))
+        self.assertTrue(_wait(lambda: "a3" in self._ids()))
+        self.watcher.consume_change()
+        self.assertFalse(self.watcher.consume_change())
+
+    def test_reconnects_and_reseeds_after_stream_ends(self):
+        self.watcher.consume_change()
+        # Changes made while the stream is down are picked up by the reseed
+        self.docker.containers.append(_container("a9", "nosana/nosana-node", "late"))
+        self.docker.events.put(None)
+        self.assertTrue(_wait(lambda: self.docker.requests.count("/events") == 2))
+        self.assertTrue(_wait(lambda: self._ids() == ["a1", "a9"]))
+        self.assertTrue(self.watcher.synced)
+        self.assertTrue(self.watcher.consume_change())
+
+        # The new stream delivers events
+        self.docker.events.put(_event("die", "a9", "nosana/nosana-node"))
+        self.assertTrue(_wait(lambda: self._ids() == ["a1"]))
+
+    def test_stop_wakes_thread_on_quiet_stream(self):
+        self.watcher.stop()
+        self.watcher._thread.join(2.0)
+        self.assertFalse(self.watcher._thread.is_alive())
+        self.assertEqual(self.docker.requests.count("/events"), 1)
+
+
+class CloseDelimitedStreamTest(DockerEventWatcherTest):
+    """Same paths with an HTTP/1.0 events stream that ends at close."""
+
+    chunked = False
+
+
+if __name__ == "__main__":
+    unittest.main()
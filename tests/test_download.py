@@ -0,0 +1,124 @@
+"""corelink.download_container_files against a loopback http.server stand-in."""
+
+import contextlib
+import http.server
+import io
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, REPO_ROOT)
+
+import corelink  # noqa: E402
+
+
+class RepoServer:
+    """Serves the repo's container files and manifest over loopback HTTP.
+
+    ``files`` maps a path to its body (missing paths are 404) and
+    ``failures`` maps a path to status codes returned before the body.
+    """
+
+    def __init__(self):
+        self.files = {}
+        for rel_path in corelink.CONTAINER_FILES + [corelink.MANIFEST_NAME]:
+            with open(os.path.join(REPO_ROOT, rel_path), "rb") as fh:
+                self.files["/" + rel_path] = fh.read()
+        self.failures = {}
+        self.requests = []
+        repo = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"   # keep-alive, like the raw host
+
+            def do_GET(self):
+                repo.requests.append(self.path)
+                pending = repo.failures.get(self.path)
+                if pending:
+                    self._reply(pending.pop(0), b"unavailable")
+                elif self.path in repo.files:
+                    self._reply(200, repo.files[self.path])
+                else:
+                    self._reply(404, b"not found")
+
+            def _reply(self, status, body):
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = "http://127.0.0.1:%d" % self.server.server_address[1]
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class DownloadTest(unittest.TestCase):
+
+    def setUp(self):
+        self.repo = RepoServer()
+        self.addCleanup(self.repo.close)
+        self.cache = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache, True)
+        patcher = mock.patch.object(corelink.urllib.request, "getproxies", return_value={})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _download(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = corelink.download_container_files(self.repo.url, self.cache)
+        if result is not None:
+            self.addCleanup(shutil.rmtree, os.path.dirname(result), True)
+        return result
+
+    def _assert_matches_repo(self, container_dir):
+        build_dir = os.path.dirname(container_dir)
+        for rel_path in corelink.CONTAINER_FILES:
+            with open(os.path.join(build_dir, rel_path), "rb") as fh:
+                self.assertEqual(fh.read(), self.repo.files["/" + rel_path], rel_path)
+
+    def test_second_download_is_served_from_cache(self):
+        self._assert_matches_repo(self._download())
+        self.assertEqual(len(os.listdir(self.cache)), len(corelink.CONTAINER_FILES))
+
+        self.repo.requests = []
+        self._assert_matches_repo(self._download())
+        self.assertEqual(self.repo.requests, ["/" + corelink.MANIFEST_NAME])
+
+    def test_hash_mismatch_fails_and_is_not_cached(self):
+        self.repo.files["/container/app/gpu.py"] += b"# tampered\n"
+        self.assertIsNone(self._download())
+        tampered = corelink.hashlib.sha256(self.repo.files["/container/app/gpu.py"]).hexdigest()
+        self.assertNotIn(tampered, os.listdir(self.cache))
+
+    def test_missing_manifest_downloads_unverified(self):
+        del self.repo.files["/" + corelink.MANIFEST_NAME]
+        self._assert_matches_repo(self._download())
+        self.assertEqual(os.listdir(self.cache), [])
+
+    def test_server_error_is_retried(self):
+        self.repo.failures["/container/app/gpu.py"] = [503]
+        self._assert_matches_repo(self._download())
+        self.assertEqual(self.repo.requests.count("/container/app/gpu.py"), 2)
+
+    def test_persistent_server_error_fails(self):
+        self.repo.failures["/container/app/gpu.py"] = [503] * corelink.DOWNLOAD_RETRIES
+        self.assertIsNone(self._download())
+        self.assertEqual(self.repo.requests.count("/container/app/gpu.py"),
+                         corelink.DOWNLOAD_RETRIES)
+
+
+if __name__ == "__main__":
+    unittest.main()
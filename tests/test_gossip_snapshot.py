@@ -0,0 +1,58 @@
+"""Gossip snapshot restore: unverified status and malformed files."""
+
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "container", "app"))
+
+from gossip import GossipNode, NODE_TIMEOUT, SEQ_RESUME_MARGIN, SNAPSHOT_VERSION  # noqa: E402
+
+
+class SnapshotRestoreTest(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        self.addCleanup(os.unlink, self.path)
+
+    def _load(self, data):
+        with open(self.path, "w") as fh:
+            fh.write(data if isinstance(data, str) else json.dumps(data))
+        node = GossipNode("me", [], snapshot_path=self.path)
+        node._load_snapshot()
+        return node
+
+    def _snapshot(self, nodes, seq=7):
+        return {"v": SNAPSHOT_VERSION, "node_id": "me", "seq": seq,
+                "saved": time.time(), "nodes": nodes}
+
+    def test_restored_peer_is_unverified_not_stale(self):
+        seen = time.time() - NODE_TIMEOUT - 5
+        node = self._load(self._snapshot({
+            "peer": {"gpus": [], "timestamp": "", "seq": 3, "last_seen": seen},
+        }))
+        self.assertEqual(node.seq, 7 + SEQ_RESUME_MARGIN)
+        states = {n["node_id"]: n["status"] for n in node.get_cluster_state()}
+        self.assertEqual(states["peer"], "unverified")
+
+    def test_malformed_snapshots_are_discarded(self):
+        good = {"gpus": [], "timestamp": "", "seq": 1, "last_seen": time.time()}
+        for data in (
+            "[]",
+            json.dumps(self._snapshot([good])),
+            json.dumps(self._snapshot({"peer": "x"})),
+            json.dumps(self._snapshot({"peer": dict(good, seq="1")})),
+            json.dumps(self._snapshot({"peer": dict(good, gpus={})})),
+            json.dumps(self._snapshot({"peer": good}, seq="7")),
+        ):
+            node = self._load(data)
+            self.assertEqual(node.seq, 0, data)
+            self.assertNotIn("peer", [n["node_id"] for n in node.get_cluster_state()], data)
+
+
+if __name__ == "__main__":
+    unittest.main()
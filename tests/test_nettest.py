@@ -0,0 +1,99 @@
+"""Loopback tests for nettest: two NetTestServers on different ports."""
+
+import os
+import socket
+import sys
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "container", "app"))
+
+import nettest  # noqa: E402
+from nettest import NetTestServer, delegate  # noqa: E402
+
+
+def _free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class _Gossip:
+    """Membership view: the only GossipNode calls nettest makes."""
+
+    def __init__(self, hostname, nodes):
+        self.hostname = hostname
+        self.nodes = nodes
+
+    def get_cluster_state(self):
+        return [dict(n) for n in self.nodes]
+
+    def get_nodes(self, ids):
+        return [dict(n) for n in self.nodes if n["node_id"] in ids]
+
+
+def _cluster(names, ip="127.0.0.1", max_mbps=200):
+    """Start one server per name, all sharing one loopback membership view."""
+    nodes = [{"node_id": name, "ip": ip, "nettest_port": _free_port()} for name in names]
+    servers = {}
+    for node in nodes:
+        server = NetTestServer(node["nettest_port"], _Gossip(node["node_id"], nodes), max_mbps)
+        server.start()
+        servers[node["node_id"]] = server
+    return servers
+
+
+class NetTestLoopbackTest(unittest.TestCase):
+
+    def test_pair_test_between_two_instances(self):
+        servers = _cluster(["a", "b"])
+        result = servers["a"].run("b", secs=0.5)
+        self.assertNotIn("error", result)
+        self.assertGreater(result["bytes"], 0)
+        self.assertIsNotNone(result["rtt_ms"])
+        self.assertLess(result["mbps"], 200 * 1.25)   # sender cap honoured
+
+    def test_delegated_run_from_member(self):
+        servers = _cluster(["a", "b"])
+        result = delegate("127.0.0.1", servers["a"].port, "b", 0.5)
+        self.assertNotIn("error", result)
+        self.assertGreater(result["mbps"], 0)
+
+    def test_run_refused_from_non_member(self):
+        servers = _cluster(["a", "b"], ip="192.0.2.1")
+        result = delegate("127.0.0.1", servers["a"].port, "b", 0.5)
+        self.assertEqual(result, {"error": "not a cluster member"})
+
+    def test_same_target_cooldown(self):
+        servers = _cluster(["a", "b"])
+        self.assertNotIn("error", servers["a"].run("b", secs=0.5))
+        self.assertIn("cooling down", servers["a"].run("b", secs=0.5)["error"])
+
+    def test_run_budget(self):
+        servers = _cluster(["a", "b", "c"])
+        with mock.patch.object(nettest, "RUN_BUDGET", 1):
+            self.assertNotIn("error", servers["a"].run("b", secs=0.5))
+            self.assertIn("budget", servers["a"].run("c", secs=0.5)["error"])
+
+    def test_rate_cap_is_always_finite(self):
+        server = NetTestServer(_free_port(), _Gossip("a", []), max_mbps=0)
+        self.assertEqual(server.max_mbps, nettest.DEFAULT_MAX_MBPS)
+
+    def test_connection_cap(self):
+        servers = _cluster(["a"])
+        port = servers["a"].port
+        idle = [socket.create_connection(("127.0.0.1", port))
+                for _ in range(nettest.MAX_CONNECTIONS)]
+        try:
+            time.sleep(0.3)
+            with socket.create_connection(("127.0.0.1", port)) as extra:
+                extra.settimeout(5)
+                self.assertEqual(extra.recv(1), b"")
+        finally:
+            for conn in idle:
+                conn.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+"""corelink.check_prerequisites result caching."""
+
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, REPO_ROOT)
+
+import corelink  # noqa: E402
+
+
+class PrereqCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp, True)
+        self.calls = []
+        self.daemon_ok = True
+        for name, value in (
+                ("PREREQ_CACHE_PATH", os.path.join(tmp, "prereqs.json")),
+                ("PREREQ_CHECKS", [("Docker", self._check("static", True))]),
+                ("LIVE_CHECKS", [("Docker daemon", self._daemon)]),
+                ("prereq_fingerprint", lambda: "fp")):
+            patcher = mock.patch.object(corelink, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _check(self, name, ok):
+        def check():
+            self.calls.append(name)
+            return ok, "OK" if ok else "FAIL"
+        return check
+
+    def _daemon(self):
+        self.calls.append("daemon")
+        return self.daemon_ok, "OK" if self.daemon_ok else "FAIL"
+
+    def _run(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return corelink.check_prerequisites()
+
+    def test_cached_run_still_probes_daemon(self):
+        self.assertTrue(self._run())
+        self.assertEqual(sorted(self.calls), ["daemon", "static"])
+
+        self.calls = []
+        self.daemon_ok = False
+        self.assertFalse(self._run())
+        self.assertEqual(self.calls, ["daemon"])
+
+    def test_unreachable_daemon_keeps_static_cache(self):
+        self.daemon_ok = False
+        self.assertFalse(self._run())
+
+        self.calls = []
+        self.daemon_ok = True
+        self.assertTrue(self._run())
+        self.assertEqual(self.calls, ["daemon"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+"""StageTimers histograms and TimedLock acquire accounting."""
+
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "container", "app"))
+
+from profiling import StageTimers, TimedLock  # noqa: E402
+
+
+class TimedLockTest(unittest.TestCase):
+
+    def test_counts_uncontended_and_contended_acquires(self):
+        timers = StageTimers()
+        lock = TimedLock(timers, "test.lock_wait")
+        for _ in range(3):
+            with lock:
+                pass
+
+        lock.acquire()
+        waiter = threading.Thread(target=lambda: (lock.acquire(), lock.release()))
+        waiter.start()
+        time.sleep(0.05)
+        lock.release()
+        waiter.join()
+
+        snap = timers.snapshot()
+        self.assertEqual(snap["locks"]["test.lock_wait"], {"acquires": 5, "contended": 1})
+        self.assertEqual(snap["stages"]["test.lock_wait"]["count"], 1)
+        self.assertGreaterEqual(snap["stages"]["test.lock_wait"]["max_ms"], 40)
+
+    def test_failed_non_blocking_acquire_is_not_counted(self):
+        timers = StageTimers()
+        lock = TimedLock(timers, "test.lock_wait")
+        lock.acquire()
+        self.assertFalse(lock.acquire(blocking=False))
+        lock.release()
+        self.assertEqual(timers.snapshot()["locks"]["test.lock_wait"],
+                         {"acquires": 1, "contended": 0})
+
+
+if __name__ == "__main__":
+    unittest.main()